@@ -75,23 +75,30 @@ The `clig.run()` function also accepts
 from __future__ import annotations
 
 import inspect
+import os
 import re
 import sys
+from importlib import import_module
 from argparse import ArgumentParser, FileType, HelpFormatter, Action, BooleanOptionalAction, Namespace
-from argparse import HelpFormatter, RawTextHelpFormatter, _SubParsersAction
-from argparse import _ArgumentGroup, _MutuallyExclusiveGroup
-from dataclasses import KW_ONLY, dataclass, field
+from argparse import HelpFormatter, RawTextHelpFormatter, SUPPRESS, _SubParsersAction, _VersionAction
+from argparse import ArgumentTypeError, _ArgumentGroup, _MutuallyExclusiveGroup, _UNRECOGNIZED_ARGS_ATTR
+from argparse import ArgumentError, OPTIONAL, ZERO_OR_MORE, ONE_OR_MORE, PARSER, _get_action_name
+from dataclasses import KW_ONLY, dataclass, field, fields, is_dataclass
+from functools import lru_cache
+from gettext import gettext
 from inspect import Parameter
 from inspect import _ParameterKind
+from os import PathLike
 from types import UnionType, EllipsisType
 from collections import OrderedDict
-from collections.abc import Sequence
-from typing import get_args, get_origin, Union, Annotated, TextIO
-from typing import Any, Callable, Iterable, Literal, Mapping, Self, TypedDict, Unpack, overload
+from contextvars import ContextVar
+from collections.abc import Iterable, Iterator, Sequence
+from typing import get_args, get_origin, Union, Annotated, BinaryIO, TextIO, TYPE_CHECKING
+from typing import Any, Callable, Literal, Mapping, Self, TypedDict, Unpack, overload
 from enum import Enum, StrEnum
-from importlib.metadata import PackageNotFoundError
-from importlib.metadata import distributions as pkg_distributions
-from importlib.metadata import version as pkg_metadata_version
+
+if TYPE_CHECKING:
+    from asyncio import AbstractEventLoop, Runner
 
 Kind = _ParameterKind
 Arg = Annotated
@@ -249,6 +256,31 @@ DOCSTRING_TEMPLATES = [
 
 SUBPARSERS_DEST = "subcommand_"
 
+_SUBCOMMAND_NAMESPACE_DEST = "subcommand_namespace_"
+"""The attribute holding the namespace of the selected subcommand, in the `single_pass` mode"""
+
+_JOBS_DEST = "jobs_"
+"""The attribute holding the number of workers given by `--jobs`, for commands with a `parallel` argument"""
+
+_CONCURRENCY_DEST = "concurrency_"
+"""The attribute holding the limit given by `--concurrency`, in `async` commands with a `parallel` argument"""
+
+_DEFAULT_CONCURRENCY = 100
+"""The default limit of concurrent calls of `async` commands with a `parallel` argument"""
+
+_COMPLETE_ENV = "CLIG_COMPLETE"
+"""The environment variable requesting the completions of the command line (see `Command.completion_index`)"""
+
+_DOCSTRING_SEPARATOR = "################################" * 30
+
+_DOCSTRING_TEMPLATES_CACHE_SIZE = 512
+"""Maximum number of compiled docstring templates (one per template and number of parameters) kept in
+memory, evicting the least recently used ones."""
+
+_RESPONSE_FILES_CACHE_SIZE = 64
+"""Maximum number of response files (one per path, modification time and size) whose arguments are kept in
+memory, evicting the least recently used ones."""
+
 
 class DocStr(StrEnum):
     """Built-in docstring templates to use in inferring function/argument information."""
@@ -270,6 +302,37 @@ class DocStr(StrEnum):
     GOOGLE_DOCSTRING_NOTYPES = GOOGLE_DOCSTRING_NOTYPES
 
 
+_BUILTIN_DOCSTRING_FORMATS: dict[str, tuple[bool, str | None]] = {
+    DESCRIPTION_DOCSTRING: (False, None),
+    DESCRIPTION_EPILOG_DOCSTRING: (True, None),
+    NUMPY_DOCSTRING_WITH_EPILOG: (True, "numpy"),
+    NUMPY_DOCSTRING_WITH_EPILOG_NOTYPES: (True, "numpy_notypes"),
+    SPHINX_DOCSTRING_WITH_EPILOG: (True, "sphinx"),
+    SPHINX_DOCSTRING_WITH_EPILOG_NOTYPES: (True, "sphinx_notypes"),
+    GOOGLE_DOCSTRING_WITH_EPILOG: (True, "google"),
+    GOOGLE_DOCSTRING_WITH_EPILOG_NOTYPES: (True, "google_notypes"),
+    CLIG_DOCSTRING_WITH_EPILOG: (True, "clig"),
+    NUMPY_DOCSTRING: (False, "numpy"),
+    SPHINX_DOCSTRING: (False, "sphinx"),
+    GOOGLE_DOCSTRING: (False, "google"),
+    GOOGLE_DOCSTRING_NOTYPES: (False, "google_notypes"),
+    CLIG_DOCSTRING: (False, "clig"),
+    CLIG_DOCSTRING_SHORT: (False, "clig_short"),
+}
+"""The built-in templates parsed by the line oriented parser: `template: (has epilog, parameters style)`"""
+
+_DOCSTRING_SECTION_HEADERS: dict[str, list[str]] = {
+    "numpy": ["Parameters", "----------"],
+    "numpy_notypes": ["Parameters", "----------"],
+    "clig": ["Parameters", "----------"],
+    "clig_short": ["Parameters", "----------"],
+    "google": ["Args:"],
+    "google_notypes": ["Args:"],
+    "sphinx": [],
+    "sphinx_notypes": [],
+}
+
+
 ##############################################################################################################
 # %%          MAIN CLASS
 ##############################################################################################################
@@ -279,8 +342,10 @@ class DocStr(StrEnum):
 class Command[ReturnType]:
     """The base class to create commands from functions."""
 
-    func: Callable[..., ReturnType] | None = None
-    """The function that will be turned into a command."""
+    func: Callable[..., ReturnType] | str | None = None
+    """The function that will be turned into a command. It can also be an import string in the form
+    `"package.module:function"`, in which case the module is imported (and the function inspected) only
+    when the command is dispatched or its help is requested."""
 
     # Arguments for `ArgumentParser` object, see: https://docs.python.org/3/library/argparse.html#argumentparser-objects
 
@@ -505,7 +570,8 @@ class Command[ReturnType]:
 
     version: bool | str = False
     """Whether to add version information to the command. Defaults to `False`.
-    If `True`, tries to find the version from the function's package.
+    If `True`, tries to find the version from the function's package (only when the version option is
+    given in the command line).
     If it is a string, use the string as the version information."""
 
     versionmodifier: Callable[[str], str] | None = None
@@ -523,6 +589,113 @@ class Command[ReturnType]:
     Defaults to `"show program's version number and exit"`.
     """
 
+    lazy_parsers: bool = False
+    """Whether to build the parsers of the subcommands only when they are selected in the command line.
+    Defaults to `False`. When `True`, only a cheap "shell" parser with the name, aliases and help of each
+    subcommand is created at first, and its arguments (and the shells of its own subcommands) are added the
+    moment the subcommand is selected, so the startup cost scales with the depth of the invoked command
+    rather than with the size of the whole command tree. Applies to all subcommands nested below this
+    command.
+    """
+
+    single_pass: bool = False
+    """Whether to parse the command line only once when subcommands are invoked. Defaults to `False`.
+    By default, the command line is parsed by the main command and parsed again by each selected subcommand,
+    from the first occurrence of its name on. When `True`, the values of each command are collected from a
+    single parse and the functions of all selected commands are invoked in order. Extra arguments (not
+    recognized by any parser) are given to the deepest selected command accepting `*args` or `**kwargs`.
+    Applies to all subcommands nested below this command.
+    """
+
+    native_parsing: bool = False
+    """Whether to parse the command line with the native engine of `clig` instead of `argparse`. Defaults to
+    `False`. The engine handles the common subset of command lines (options given by their name or an
+    abbreviation, with `--option=value` or with a fixed, `?`, `*` or `+` number of values, flags,
+    positionals with a fixed number of values and subcommands) in a single linear pass with dictionary
+    lookups of the options. Anything else (combined short flags, `--`, positionals with a variable number
+    of values, mutually exclusive groups, errors and extra arguments) is left to `argparse`, so the parsed
+    values and the error messages are the same. Applies to all subcommands nested below this command.
+    """
+
+    allow_subcommand_abbrev: bool = False
+    """Whether a subcommand can be selected by an unambiguous abbreviation of its name or of an alias (e.g.
+    `bu` for `build`). Defaults to `False`. An ambiguous abbreviation is reported with the subcommands it
+    could match. A misspelled subcommand name is reported with the closest name, with or without this
+    option. Applies to all subcommands nested below this command.
+    """
+
+    spec_cache: str | PathLike[str] | None = None
+    """The path of a file used to cache the specification of the command tree between runs. Defaults to
+    `None` (no cache). When given, the data introspected from the functions (signatures and docstrings) and
+    the arguments generated for `add_argument()` are saved to this file, so later runs build the parsers
+    straight from it. The version found for `version=True` is saved as well. The cache is discarded
+    automatically when any contributing source file (the modules of the functions, of their annotations,
+    converters and `Enum` defaults, the `__main__` script or `clig` itself) changes. Entries that cannot be
+    pickled (e.g. locally defined converters) or that use argument groups are always built normally. The
+    file is read with `pickle`, so it must be in a trusted location. Applies to all subcommands added to
+    this command.
+    """
+
+    loop_factory: Callable[[], AbstractEventLoop] | None = None
+    """The factory of the event loop used to run `async` functions (e.g. `uvloop.new_event_loop`). Defaults
+    to `None` (the default loop of `asyncio`). The coroutines returned by the functions of the command and
+    of all subcommands are awaited with one `asyncio.Runner`, shared by all commands invoked in a call to
+    `run` (or `run_many`) and closed at its end. Applies to all subcommands nested below this command.
+    """
+
+    batch: bool = False
+    """Whether to add the `--batch FILE` and `--batch0 FILE` options to the command. Defaults to `False`.
+    When one of them is given as the first argument, the command is run once for each shell-quoted line of
+    `FILE` (or each NUL-delimited record, with `--batch0`), all against the same parser (see `run_many`).
+    Use `-` to read the standard input. Errors of each record are reported without stopping the batch, and
+    the program exits with status `1` at the end if any record failed.
+    """
+
+    response_files: bool = False
+    """Whether to read the files given with `fromfile_prefix_chars` (e.g. `@args.txt`) as response files.
+    Defaults to `False` (one argument per line, as in `argparse`). When `True`, the arguments in the files are
+    split as in a shell, with quotes and `#` comments, and each file is read only once for all parsers (and
+    cached, until it is modified). The response files given in a response file are read as well, unless
+    quoted (e.g. `'@name'` is the argument `@name`). An argument with a doubled prefix (e.g. `@@items.txt`)
+    is not expanded: given to an `Iterable[T]` parameter, the items are read lazily from the response file
+    instead of the command line. Applies to all subcommands nested below this command.
+    """
+
+    parallel_executor: Literal["process", "thread"] = "process"
+    """The pool of workers calling the function once for each item of its `parallel` argument (see `data`):
+    `"process"` (a `ProcessPoolExecutor`, for CPU-bound functions) or `"thread"` (a `ThreadPoolExecutor`, for
+    I/O-bound functions). Defaults to `"process"`. With processes, the function and the values of its
+    arguments must be picklable (e.g. a function defined at module level). The number of workers is given by
+    the `--jobs N` option, added to commands with a `parallel` argument (by default, the number of
+    processors); `--jobs 1` calls the function in this process, one item after the other. Not used by `async`
+    functions, whose calls are awaited on the event loop, at most `--concurrency N` at a time (by default,
+    100).
+    """
+
+    parallel_ordered: bool = True
+    """Whether the results of the calls for the items of the `parallel` argument are returned in the order
+    of the items. Defaults to `True`. When `False`, they are returned in the order the calls finish.
+    """
+
+    on_result: Callable[[Any], Any] | None = None
+    """A function called with the result of each call for an item of the `parallel` argument, as soon as the
+    call finishes (e.g. to print or save the results while the others are still running). Defaults to `None`.
+    """
+
+    completion_index: str | PathLike[str] | None = None
+    """The path of a JSON file used to cache the completion index of the command tree between runs.
+    Defaults to `None` (the index is made again for each completion). When the environment variable
+    `CLIG_COMPLETE` is set (to any non-empty value), `run` does not parse the arguments: they are taken as
+    the words of a command line being completed, the last one (possibly empty) being the word under the
+    cursor, and the possible completions of that word (names and aliases of subcommands, flags and choices
+    of `Literal` and `Enum` arguments) are printed one per line, before exiting. The index holding them is
+    made from the parsers of the whole command tree (importing the lazily registered subcommands), so with
+    this file later completions are answered straight from it, without importing any subcommand or
+    building any parser. It is made again automatically when any contributing source file (the modules of
+    the functions, of their annotations, converters and `Enum` defaults, the `__main__` script or `clig`
+    itself) changes. Only used by the main command.
+    """
+
     # Extra arguments of this library not initialized
 
     subcommands: OrderedDict[str, Command] = field(init=False, default_factory=OrderedDict)
@@ -548,26 +721,27 @@ class Command[ReturnType]:
 
         self.parameters: Mapping[str, Parameter] = {}
         """A dict with `name: Parameter`, where `Parameter` comes from stdlib `inspect`
-        ref: https://docs.python.org/3/library/inspect.html#inspect.Parameter"""
-
-        if self.func:
-            self.name = self.name or self.func.__name__.replace("_", "-")
-            self.parameters = inspect.signature(self.func).parameters
+        ref: https://docs.python.org/3/library/inspect.html#inspect.Parameter
+        It is left empty when the command is restored from the `spec_cache`."""
 
-        self.docstring_data: _DocstringData | None = self._get_data_from_docstring()
-        self.argument_data: list[_ArgumentData] = self.__generate_argument_data_list()
-        if self.docstring_data:
-            self.description = self.description or self.docstring_data.description
-            self.epilog = self.epilog or self.docstring_data.epilog
+        self.import_path: str | None = None
+        """The import string `"package.module:function"` of a lazily registered command. It is `None` when
+        the command was created directly from a function."""
 
-        if self.descriptionmodifier:
-            self.description = self.descriptionmodifier(self.description or "")
+        self.docstring_data: _DocstringData | None = None
+        self.argument_data: list[_ArgumentData] = []
+        self._spec_cache: _SpecCache | None = _get_spec_cache(self.spec_cache) if self.spec_cache else None
 
-        if self.epilogmodifier:
-            self.epilog = self.epilogmodifier(self.epilog or "")
+        if isinstance(self.func, str):
+            self.import_path, self.func = self.func, None
+            self.name = self.name or _get_import_path_name(self.import_path)
+        else:
+            self.__inspect_function()
 
         self.subcommands: OrderedDict[str, Command] = OrderedDict()
-        self.sub_commands_group: _SubParsersAction | None = None
+        self.sub_commands_group: _SubCommandsAction | None = None
+        self._arguments_added: bool = False
+        self._runner: Runner | None = None
         self.longstartflags: str = f"{self.prefix_chars}" * 2
 
         self._argument_groups: list[ArgumentGroup] = []
@@ -594,10 +768,10 @@ class Command[ReturnType]:
 
     def subcommand[**P, T](
         self,
-        func: Callable[P, T] | None = None,
+        func: Callable[P, T] | str | None = None,
         parent: Command | Callable | str | None = None,
         **kwargs: Unpack[CompleteCommandArguments],
-    ) -> Callable[P, T] | Callable[[Callable[P, T]], Callable[P, T]]:
+    ) -> Callable[P, T] | str | Callable[[Callable[P, T]], Callable[P, T]]:
         """Add a subcommand and return the input function unchanged. Suitable to use as decorator.
 
         Registers `func` as a subcommand of `parent` (defaulting to the calling `Command` itself when `parent`
@@ -609,8 +783,9 @@ class Command[ReturnType]:
 
         Parameters
         ----------
-        - `func` (`Callable[P, T] | None`, optional): Defaults to `None`.
-            The function that will be turned into a new subcommand. When `None`, the method is being used as a
+        - `func` (`Callable[P, T] | str | None`, optional): Defaults to `None`.
+            The function that will be turned into a new subcommand, or its import string
+            `"package.module:function"` (see `new_subcommand`). When `None`, the method is being used as a
             decorator with parentheses (e.g. `@cmd.subcommand(...)`), and `func` is supplied by the decorator
             machinery on the next call.
 
@@ -622,12 +797,11 @@ class Command[ReturnType]:
         - `**kwargs` (`Unpack[CompleteCommandArguments]`, variadic):
             Keyword arguments forwarded to `new_subcommand` (e.g. `name`, `help`, `aliases`, `description`,
             `epilog`, `make_flags`). See :class:`~clig.Command` and :class:`~clig.CompleteCommandArguments`
-            for the full list of accepted options. Only used when `func` is `None` (i.e. the
-            decorator-with-parentheses form).
+            for the full list of accepted options.
 
         Returns
         -------
-        `Callable[P, T] | Callable[[Callable[P, T]], Callable[P, T]]`:
+        `Callable[P, T] | str | Callable[[Callable[P, T]], Callable[P, T]]`:
             The original `func` unchanged, when called directly or as a bare decorator. When used as
             `@cmd.subcommand(...)`, returns a decorator that itself returns the original function unchanged
             once applied.
@@ -647,7 +821,7 @@ class Command[ReturnType]:
         assert isinstance(parent, Command), "\n\n\nThe `parent` argument must be a `Command`\n\n"
 
         if func is not None:
-            parent.new_subcommand(func)
+            parent.new_subcommand(func, **kwargs)
             return func
 
         def wrap(func):
@@ -658,7 +832,7 @@ class Command[ReturnType]:
 
     def add_subcommand(
         self,
-        func: Callable[..., Any],
+        func: Callable[..., Any] | str,
         *args: Any,
         **kwargs: Unpack[CompleteCommandArguments],
     ) -> Self:
@@ -671,8 +845,9 @@ class Command[ReturnType]:
 
         Parameters
         ----------
-        - `func` (`Callable[..., Any]`):
-            The function that will be turned into a new subcommand.
+        - `func` (`Callable[..., Any] | str`):
+            The function that will be turned into a new subcommand, or its import string
+            `"package.module:function"` (see `new_subcommand`).
 
         - `*args` (`Any`, variadic):
             Additional positional arguments forwarded to `new_subcommand`.
@@ -694,7 +869,7 @@ class Command[ReturnType]:
 
     def end_subcommand(
         self,
-        func: Callable[..., Any],
+        func: Callable[..., Any] | str,
         *args: Any,
         **kwargs: Unpack[CompleteCommandArguments],
     ) -> Command:
@@ -707,8 +882,9 @@ class Command[ReturnType]:
 
         Parameters
         ----------
-        - `func` (`Callable[..., Any]`):
-            The function that will be turned into a new subcommand.
+        - `func` (`Callable[..., Any] | str`):
+            The function that will be turned into a new subcommand, or its import string
+            `"package.module:function"` (see `new_subcommand`).
 
         - `*args` (`Any`, variadic):
             Additional positional arguments forwarded to `new_subcommand`.
@@ -739,7 +915,7 @@ class Command[ReturnType]:
 
     def new_subcommand(
         self,
-        func: Callable[..., Any],
+        func: Callable[..., Any] | str,
         name: str | None = None,
         help: str | None | EllipsisType = ...,
         aliases: Sequence[str] | None = None,
@@ -753,17 +929,23 @@ class Command[ReturnType]:
         `add_subcommand`, and `end_subcommand` all delegate to; use it directly when you need a reference to
         the newly created `Command` itself (e.g. to register further nested subcommands on it).
 
+        `func` can also be given as an import string `"package.module:function"`. In this case, the module is
+        not imported at registration: it is imported (and the function inspected) only when the subcommand is
+        selected in the command line or its help is requested. Provide `name` and `help` up front, since they
+        are shown in the parent command's help without importing the module.
+
         See: https://docs.python.org/3/library/argparse.html#sub-commands
 
         Parameters
         ----------
-        - `func` (`Callable[..., Any]`):
-            The function that will be turned into a new subcommand.
+        - `func` (`Callable[..., Any] | str`):
+            The function that will be turned into a new subcommand, or its import string
+            `"package.module:function"`.
 
         - `name` (`str | None`, optional): Defaults to `None`.
             The name used to invoke this subcommand on the command line. When
-            `None`, derived from `func.__name__` with underscores replaced by
-            hyphens.
+            `None`, derived from `func.__name__` (or the function name in the import string)
+            with underscores replaced by hyphens.
 
         - `help` (`str | None`, optional): Defaults to `...` (Ellipsis).
             A short help message for the subcommand, shown next to its name in the
@@ -796,8 +978,10 @@ class Command[ReturnType]:
         while parent_parser:
             count += 1
             parent_parser = parent_parser.parent
+        if self.spec_cache is not None:
+            kwargs.setdefault("spec_cache", self.spec_cache)
         cmd: Command = Command(func, *args, **kwargs)  # type: ignore
-        cmd.name = name or func.__name__.replace("_", "-")
+        cmd.name = name or cmd.name
         if not hasattr(self, "subparsers_dest"):
             self.subparsers_dest: str = ""
         self.subparsers_dest = ",".join(
@@ -828,6 +1012,7 @@ class Command[ReturnType]:
         """
         if self.parser is None:
             self._add_parsers()
+        self._complete_parser()
         assert self.parser is not None
         self.parser.print_help(file)
 
@@ -851,45 +1036,216 @@ class Command[ReturnType]:
         # TODO: treat "positional only"?
         if args == None:
             args = sys.argv[1:]
+        return self._run_command_line(args)
+
+    def run_many(self, argvs: Iterable[Sequence[str]]) -> list[BatchResult[ReturnType]]:
+        """Run the `Command` once for each argument list, all against the same parser.
+
+        Each run behaves as `run`, but a `SystemExit` (raised by `argparse` on invalid arguments, `--help`,
+        `--version` or by the function itself) or an exception raised by the function does not stop the
+        batch: it is recorded in the result of that run, and the next one goes on.
+
+        Parameters
+        ----------
+        - `argvs` (`Iterable[Sequence[str]]`):
+            The argument lists to parse, one for each run.
+
+        Returns
+        -------
+        `list[BatchResult[ReturnType]]`:
+            The result of each run, in the same order of `argvs`.
+
+        -------
+        """
+        if self.parser is None:
+            self._add_parsers()
+        self._complete_parser()
+        root = self._get_root()
+        runner_owner = root._runner is None
+        try:
+            return [self._run_batch_item(args) for args in argvs]
+        finally:
+            if runner_owner:
+                root._close_runner()
+
+    def serve(self, socket_path: str | PathLike[str]) -> None:
+        """Serve the invocations of the `Command` made with `run_client`, over a Unix domain socket.
+
+        The functions of all commands are imported and all parsers are built once, then the server waits for
+        connections on `socket_path` (only the current user can connect). Each invocation is run as by `run`
+        (including the completions of `CLIG_COMPLETE` and the `batch` option) in a forked copy of the server,
+        with the arguments, working directory, environment variables and standard streams of the client, and
+        its exit status is sent back to the client. Only available on Unix. Runs until interrupted (e.g. with
+        `Ctrl+C`), removing the socket file at the end.
+
+        Parameters
+        ----------
+        - `socket_path` (`str | PathLike[str]`):
+            The path of the socket file to create. A stale socket file left by a previous server is replaced.
+
+        Raises
+        ------
+        `OSError`:
+            If another server is already listening on `socket_path`.
+
+        -------
+        """
+        import socket
+
+        if self.parser is None:
+            self._add_parsers()
+        self._complete_tree()
+        path = os.fspath(socket_path)
+        _remove_stale_socket(path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o177)  # the socket file is created readable and writable only by the owner
+        try:
+            server.bind(path)
+        finally:
+            os.umask(umask)
+        server.listen()
+        try:
+            while True:
+                connection, _ = server.accept()
+                sys.stdout.flush()
+                sys.stderr.flush()
+                if os.fork() == 0:
+                    try:
+                        server.close()
+                        self._serve_client(connection)
+                    finally:
+                        os._exit(0)
+                connection.close()
+                _reap_children()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            os.unlink(path)
+
+    def completion_script(
+        self, shell: Literal["bash", "zsh", "fish"], path: str | PathLike[str] | None = None
+    ) -> str:
+        """Generate a completion script of the command tree for the shell, which completes the command line
+        without starting Python.
+
+        The script completes the names and aliases of the subcommands, the flags, and the choices of the
+        `Literal` and `Enum` arguments, from the same completion index used by the `CLIG_COMPLETE` protocol
+        (see `completion_index`), so it is generated without building any parser when that index is up to
+        date. Unlike the dynamic completion, the choices of all positional arguments of a command are
+        offered at any position. The script is completely determined by the command tree (in the order
+        the subcommands and arguments were added), so it can be shipped with the package and compared
+        between versions.
+
+        Parameters
+        ----------
+        - `shell` (`Literal["bash", "zsh", "fish"]`):
+            The shell of the script. The `bash` and `zsh` scripts are loaded with `source`; the `zsh` one can
+            also be placed in a folder of `$fpath` as `_prog`, and the `fish` one in
+            `~/.config/fish/completions/prog.fish` (where `prog` is the name of the command).
+
+        - `path` (`str | PathLike[str] | None`, optional): Defaults to `None`.
+            A file to write the script to. It is written only if its content changes, so the modification
+            time of an up-to-date script is kept.
+
+        Returns
+        -------
+        `str`:
+            The completion script.
+
+        -------
+        """
+        if shell not in _COMPLETION_SCRIPT_GENERATORS:
+            raise ValueError(
+                f"\n\n\nUnsupported shell '{shell}' for completion scripts. "
+                f"Use one of: {', '.join(_COMPLETION_SCRIPT_GENERATORS)}.\n\n"
+            )
+        prog = self.prog or self.name or ""
+        script = _COMPLETION_SCRIPT_GENERATORS[shell](prog, self._get_completion_index()["command"])
+        if path is not None:
+            _write_if_changed(path, script)
+        return script
+
+    def freeze(self, path: str | PathLike[str] | None = None) -> str:
+        """Generate the source of a Python module running the command tree without `Command` objects.
+
+        The module builds the parsers with literal `ArgumentParser`, `add_argument()` and `add_parser()`
+        calls (with the help texts already collected from the docstrings), and dispatches the parsed
+        arguments through a table of the functions to invoke (by import string), so running it does no
+        signature inspection, docstring parsing or type annotation analysis. The functions of the selected
+        commands are invoked in order, as in `single_pass`, and the result of the last one is returned.
+
+        The module defines `build_parser()`, `run(args=None)` (also called when it is run as a script) and
+        `check()`, which returns the functions whose signature or docstring changed since the module was
+        generated, or whose arguments depend on a module whose source changed (e.g. the module of an `Enum`
+        giving the choices of an argument), and all of them when the version of `clig` changed (an empty
+        list when it is in sync). Changes in the settings of the commands are found by comparing the module
+        with a newly generated one, which is identical when nothing changed.
+
+        The functions must be importable by name (not defined in `__main__` nor locally), and so must be
+        the types, converters and defaults of the arguments. Commands with `batch`, argument groups,
+        `parallel`, `*args`, `**kwargs` or `Context` parameters cannot be frozen.
+
+        Parameters
+        ----------
+        - `path` (`str | PathLike[str] | None`, optional): Defaults to `None`.
+            A file to write the module to. It is written only if its content changes, so the modification
+            time of an up-to-date module is kept.
+
+        Returns
+        -------
+        `str`:
+            The source of the module.
+
+        Raises
+        ------
+        `ValueError`:
+            If a command or a value of the tree cannot be frozen.
+
+        -------
+        """
         if self.parser is None:
             self._add_parsers()
+        self._complete_tree()
+        source = _FrozenModuleWriter().write(self)
+        if path is not None:
+            _write_if_changed(path, source)
+        return source
+
+    ##########################################################################################################
+    # %:          PRIVATE METHODS
+    ##########################################################################################################
+
+    def _run(self, args: Sequence[str]) -> ReturnType | None:
+        """Parse the arguments and invoke the function (see `run`), once the parser is complete."""
         assert self.parser is not None
+        if (
+            self.fromfile_prefix_chars
+            and self._get_response_file_prefix_chars() is not None
+            and not _RESPONSE_FILES_EXPANDED.get()
+        ):
+            assert isinstance(self.parser, _ArgumentParser)
+            # once for all parsers of chained commands, which get the arguments already expanded
+            args = self.parser._expand_response_files((arg, False) for arg in args)
+            token = _RESPONSE_FILES_EXPANDED.set(True)
+            try:
+                return self._run(args)
+            finally:
+                _RESPONSE_FILES_EXPANDED.reset(token)
+        if self._is_single_pass():
+            return self._run_single_pass(args)
         namespace: Namespace
         rest: list[str] = []
         starargs: list[str] = []
         starkwargs: dict[str, str] = {}
-        if any([argdata.kind in [Kind.VAR_POSITIONAL, Kind.VAR_KEYWORD] for argdata in self.argument_data]):
+        if self._has_variadic_arguments():
             namespace, rest = self.parser.parse_known_args(args)
             starargs, starkwargs = self._get_unknown_args(rest)
         else:
             namespace: Namespace = self.parser.parse_args(args)
-        # TODO Enum decoverter
-        for arg in self.argument_data:
-            annotation = arg.typeannotation
-            if get_origin(annotation) in [Union, UnionType]:
-                annotation = [t for t in get_args(annotation) if t is not type(None)][0]
-            if isinstance(annotation, type) and issubclass(annotation, Enum):
-                setattr(namespace, arg.name, annotation[getattr(namespace, arg.name)])
-            if get_origin(annotation) is Literal:
-                types = get_args(annotation)
-                for t in types:
-                    choice_type = type(t)
-                    if issubclass(choice_type, Enum):
-                        try:
-                            setattr(namespace, arg.name, choice_type[getattr(namespace, arg.name)])
-                        except:
-                            continue
-            if (
-                get_origin(annotation) is tuple
-                or (isinstance(annotation, type) and issubclass(annotation, tuple))
-            ) and (
-                arg.kwargs.get("default") is EMPTY
-                or arg.kwargs.get("default") != getattr(namespace, arg.name)
-            ):
-                try:
-                    setattr(namespace, arg.name, tuple(getattr(namespace, arg.name)))
-                except TypeError:
-                    setattr(namespace, arg.name, (getattr(namespace, arg.name)))
+        if self._spec_cache:
+            self._spec_cache.save()
+        self._convert_namespace(namespace)
         subcommand_name = (
             getattr(namespace, self.subparsers_dest) if hasattr(self, "subparsers_dest") else None
         )
@@ -899,25 +1255,15 @@ class Command[ReturnType]:
             self.context = self.parent.context
         result = None
         if self.func:
-            result = self.func(
-                *self._get_pos_parameters(namespace, starargs),
-                **self._get_kw_parameters(namespace, starkwargs),
-            )
+            result = self._invoke(namespace, starargs, starkwargs)
         if subcommand_name is not None:
-            args = args[args.index(subcommand_name) + 1 :]
-            if subcommand_name not in self.subcommands:
-                for c in self.subcommands:
-                    if subcommand_name in self.subcommands[c].aliases:
-                        subcommand_name = self.subcommands[c].name
-                        break
-            assert subcommand_name is not None
-            return self.subcommands[subcommand_name].run(args)
+            assert self.sub_commands_group is not None
+            args = args[args.index(self.sub_commands_group.selected_as or subcommand_name) + 1 :]
+            subcommand = self._get_subcommand(subcommand_name)
+            assert subcommand is not None
+            return subcommand.run(args)
         return result
 
-    ##########################################################################################################
-    # %:          PRIVATE METHODS
-    ##########################################################################################################
-
     def __repr__(self, indent: int = 0) -> str:
         return (
             f"{''.ljust(indent)}{'Sub' if self.parent is not None else ''}Command("
@@ -931,6 +1277,459 @@ class Command[ReturnType]:
             + f"{"\n".ljust(indent+1)})"
         )
 
+    def __inspect_function(self) -> None:
+        cached = None
+        if self.func:
+            self.name = self.name or self.func.__name__.replace("_", "-")
+            if self._spec_cache:
+                cached = self._spec_cache.get_function(self.func, self.docstring_template)
+
+        if cached is not None:
+            self.docstring_data, self.argument_data = cached
+        else:
+            if self.func:
+                self.parameters = inspect.signature(self.func).parameters
+            self.docstring_data = self._get_data_from_docstring()
+            self.argument_data = self.__generate_argument_data_list()
+            if self.func and self._spec_cache:
+                self._spec_cache.set_function(
+                    self.func, self.docstring_template, self.docstring_data, self.argument_data
+                )
+        if self.docstring_data:
+            self.description = self.description or self.docstring_data.description
+            self.epilog = self.epilog or self.docstring_data.epilog
+
+        if self.descriptionmodifier:
+            self.description = self.descriptionmodifier(self.description or "")
+
+        if self.epilogmodifier:
+            self.epilog = self.epilogmodifier(self.epilog or "")
+
+    def _materialize(self) -> None:
+        """Import and inspect the function of a lazily registered command."""
+        if self.import_path is None or self.func is not None:
+            return
+        self.func = _import_from_path(self.import_path)
+        self.__inspect_function()
+        self.__sanitize_argument_data_names()
+        for cmd in self.subcommands.values():
+            cmd.__sanitize_argument_data_names()
+        if self.parser is not None:
+            self.parser.description = self.description
+            self.parser.epilog = self.epilog
+
+    def _complete_parser(self) -> None:
+        """Materialize the command and add its arguments, if its parser was created only as a shell."""
+        self._materialize()
+        if self.parser is not None and not self._arguments_added:
+            self._add_arguments()
+
+    def _get_version(self) -> str:
+        """Find the version of the package of the function, when it is not given as string."""
+        assert self.func is not None
+        if not isinstance(self.version, str):
+            version = self._spec_cache.get_version(self.func) if self._spec_cache else None
+            if version is None:
+                version = _get_pkg_version(self.func)
+                if self._spec_cache:
+                    self._spec_cache.set_version(self.func, version)
+                    self._spec_cache.save()
+            self.version = self.versionmodifier(version) if self.versionmodifier else version
+        return self.version
+
+    def _run_single_pass(self, args: Sequence[str]) -> ReturnType | None:
+        """Parse the command line once and invoke the functions of all commands selected in it."""
+        assert self.parser is not None
+        namespace, rest = self.parser.parse_known_args(args)
+        if self._spec_cache:
+            self._spec_cache.save()
+        levels: list[tuple[Command, Namespace]] = [(self, namespace)]
+        while hasattr(namespace, _SUBCOMMAND_NAMESPACE_DEST):
+            cmd = levels[-1][0]._get_subcommand(getattr(namespace, levels[-1][0].subparsers_dest))
+            assert cmd is not None
+            namespace = getattr(namespace, _SUBCOMMAND_NAMESPACE_DEST)
+            delattr(levels[-1][1], _SUBCOMMAND_NAMESPACE_DEST)
+            levels.append((cmd, namespace))
+        variadic_commands = [cmd for cmd, _ in levels if cmd._has_variadic_arguments()]
+        if rest and not variadic_commands:
+            self.parser.error(gettext("unrecognized arguments: %s") % " ".join(rest))
+        merged_namespace = Namespace()
+        for _, namespace in levels:
+            merged_namespace.__dict__.update(vars(namespace))
+        if self.parent is None:
+            self.context = Context(namespace=merged_namespace, command=self)
+        else:
+            self.context = self.parent.context
+        result = None
+        for cmd, namespace in levels:
+            starargs, starkwargs = [], {}
+            if variadic_commands and cmd is variadic_commands[-1]:
+                starargs, starkwargs = cmd._get_unknown_args(rest)
+            cmd._convert_namespace(namespace)
+            cmd.context = self.context
+            result = None
+            if cmd.func:
+                result = cmd._invoke(namespace, starargs, starkwargs)
+        return result
+
+    def _run_command_line(self, args: Sequence[str]) -> ReturnType | None:
+        """Run the arguments of `run`: print their completions if `CLIG_COMPLETE` is set, run the batch file
+        of the `batch` option, or parse them and invoke the function. Closes the event loop runner at the
+        end, if it was created during the run."""
+        if self.parent is None and os.environ.get(_COMPLETE_ENV):
+            self._complete(args)
+        if self.parser is None:
+            self._add_parsers()
+        self._complete_parser()
+        assert self.parser is not None
+        root = self._get_root()
+        runner_owner = root._runner is None
+        try:
+            if self.batch and args and (batch_file := self._get_batch_file(args)) is not None:
+                return self._run_batch(*batch_file)  # type: ignore
+            return self._run(args)
+        finally:
+            if runner_owner:
+                root._close_runner()
+
+    def _run_batch_item(self, args: Sequence[str], command_line: bool = False) -> BatchResult[ReturnType]:
+        """Run the command with one argument list of a batch, recording its result or error. With
+        `command_line`, the arguments are run as by `run` (see `_run_command_line`)."""
+        item: BatchResult[ReturnType] = BatchResult(list(args))
+        try:
+            if command_line:
+                item.result = self._run_command_line(item.args)
+            else:
+                item.result = self._run(item.args)
+        except SystemExit as e:
+            # same exit status as the interpreter gives to `sys.exit(code)`
+            if isinstance(e.code, int) or e.code is None:
+                item.exit_code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                item.exit_code = 1
+            if item.exit_code:
+                item.error = e
+        except Exception as e:
+            item.exit_code = 1
+            item.error = e
+        return item
+
+    def _serve_client(self, connection: Any) -> None:
+        """Run one invocation received by `serve`, in the forked process, and send its exit status."""
+        import json
+        import socket
+
+        with connection:
+            data, fds, _, _ = socket.recv_fds(connection, _DAEMON_BUFFER_SIZE, 3)
+            while len(data) < 4 or len(data) < 4 + int.from_bytes(data[:4]):
+                chunk = connection.recv(_DAEMON_BUFFER_SIZE)
+                if not chunk:
+                    raise ConnectionError("\n\n\nThe client closed the connection before its request.\n\n")
+                data += chunk
+            request = json.loads(data[4:])
+            for target, fd in enumerate(fds):
+                os.dup2(fd, target)
+                os.close(fd)
+            os.chdir(request["cwd"])
+            os.environ.clear()
+            os.environ.update(request["env"])
+            item = self._run_batch_item(request["argv"], command_line=True)
+            if item.error is not None and not isinstance(item.error, SystemExit):
+                import traceback
+
+                traceback.print_exception(item.error)
+            sys.stdout.flush()
+            sys.stderr.flush()
+            connection.sendall(item.exit_code.to_bytes(4, signed=True))
+
+    def _complete_tree(self) -> None:
+        """Complete the parsers of this command and of all subcommands nested below it."""
+        self._complete_parser()
+        for cmd in self.subcommands.values():
+            cmd._complete_tree()
+
+    def _complete(self, args: Sequence[str]) -> None:
+        """Print the completions of the last argument, from the completion index (see `completion_index`),
+        and exit."""
+        for candidate in _get_completions(self._get_completion_index()["command"], list(args) or [""]):
+            print(candidate)
+        sys.exit(0)
+
+    def _get_completion_index(self) -> dict[str, Any]:
+        """The completion index of the command tree, loaded from the `completion_index` file when it is up to
+        date, or made from the complete parsers (and saved to the file) otherwise."""
+        path = os.fspath(self.completion_index) if self.completion_index is not None else None
+        index = _load_completion_index(path) if path else None
+        if index is None:
+            if self.parser is None:
+                self._add_parsers()
+            self._complete_tree()
+            sources: dict[str, tuple[int, int]] = {}
+            index = {"format": _COMPLETION_INDEX_FORMAT, "command": self._get_completion_node(sources)}
+            for module in [sys.modules[__name__], sys.modules.get("__main__")]:
+                _add_completion_source(sources, module)
+            index["sources"] = sources
+            if path:
+                _save_completion_index(path, index)
+        return index
+
+    def _get_completion_node(self, sources: dict[str, tuple[int, int]]) -> dict[str, Any]:
+        """The completions of this command and of its subcommands, taken from their complete parsers. The
+        files of the modules of their functions (and of the annotations of their arguments, see
+        `_get_source_modules`) are added to `sources`."""
+        assert self.parser is not None
+        if self.func is not None:
+            for module in _get_source_modules(self.func, _get_argument_objects(self.argument_data)):
+                _add_completion_source(sources, sys.modules.get(module))
+        options: dict[str, tuple[list[str], Any]] = {}
+        positionals: list[tuple[list[str], Any]] = []
+        for action in self.parser._actions:
+            if isinstance(action, _SubParsersAction) or action.help == SUPPRESS:
+                continue
+            choices = [str(choice) for choice in action.choices] if action.choices else []
+            if action.option_strings:
+                options.update({flag: (choices, action.nargs) for flag in action.option_strings})
+            else:
+                positionals.append((choices, action.nargs))
+        return {
+            "prefix_chars": self.prefix_chars,
+            "options": options,
+            "positionals": positionals,
+            "subcommands": {
+                name: cmd._get_completion_node(sources) for name, cmd in self.subcommands.items()
+            },
+            "aliases": {alias: name for name, cmd in self.subcommands.items() for alias in cmd.aliases},
+        }
+
+    def _get_batch_file(self, args: Sequence[str]) -> tuple[str, str] | None:
+        """The file and the record delimiter of a batch, if the arguments start with a batch option (see
+        `batch`). Returns `None` otherwise, leaving the option (if any) to be reported by the parser."""
+        assert self.parser is not None
+        option, separator, path = args[0].partition("=")
+        delimiters = {f"{self.longstartflags}batch": "\n", f"{self.longstartflags}batch0": "\0"}
+        if option not in delimiters or (not separator and len(args) < 2):
+            return None
+        rest = list(args[1:] if separator else args[2:])
+        if rest:
+            self.parser.error(gettext("unrecognized arguments: %s") % " ".join(rest))
+        return (path if separator else args[1]), delimiters[option]
+
+    def _run_batch(self, path: str, delimiter: str) -> list[BatchResult[ReturnType]]:
+        """Run the command for each record of a batch file (see `batch`), reporting the errors."""
+        import shlex
+
+        assert self.parser is not None
+        results: list[BatchResult[ReturnType]] = []
+        file = sys.stdin if path == "-" else open(path)
+        try:
+            for number, record in enumerate(_get_records(file, delimiter), start=1):
+                try:
+                    args = shlex.split(record, comments=delimiter == "\n")
+                except ValueError as e:
+                    item: BatchResult[ReturnType] = BatchResult([], exit_code=2, error=e)
+                else:
+                    if not args:
+                        continue
+                    item = self._run_batch_item(args)
+                results.append(item)
+                if item.error is not None and not isinstance(item.error, SystemExit):
+                    print(f"{self.parser.prog}: record {number}: {item.error!r}", file=sys.stderr)
+        finally:
+            if file is not sys.stdin:
+                file.close()
+        if any(item.exit_code for item in results):
+            self.parser.exit(1)
+        return results
+
+    def _invoke(self, namespace: Namespace, starargs: list[str], starkwargs: dict[str, Any]) -> Any:
+        """Call the function with the values of the namespace, running it on the event loop if it is `async`.
+        With a `parallel` argument, the function is called once for each item and the results are listed.
+        The `MappedFile` and `CompressedFile` arguments are closed when the function returns."""
+        assert self.func is not None
+        positional, keywords = self._binder.bind(namespace, self.context, starargs, starkwargs)
+        try:
+            if self._binder.parallel is not None:
+                calls = self._binder.fan_out(positional, keywords)
+                return self._invoke_parallel(calls, namespace)
+            result = self.func(*positional, **keywords)
+            if inspect.iscoroutine(result):
+                result = self._run_coroutine(result)
+            return result
+        finally:
+            _close_argument_values([*positional, *keywords.values()])
+
+    def _invoke_parallel(
+        self, calls: list[tuple[list[Any], dict[str, Any]]], namespace: Namespace
+    ) -> list[Any]:
+        """Call the function for each item of the `parallel` argument, in a pool of `--jobs` workers or, for
+        `async` functions, on the event loop with at most `--concurrency` calls at a time."""
+        assert self.func is not None and self.parser is not None
+        if inspect.iscoroutinefunction(self.func):
+            concurrency = getattr(namespace, _CONCURRENCY_DEST)
+            if concurrency < 1:
+                self.parser.error(f"argument {self.longstartflags}concurrency: must be a positive integer")
+            return self._run_coroutine(self._invoke_concurrently(calls, concurrency))
+        jobs = getattr(namespace, _JOBS_DEST, None)
+        if jobs is not None and jobs < 1:
+            self.parser.error(f"argument {self.longstartflags}jobs: must be a positive integer")
+        if jobs == 1 or len(calls) <= 1:
+            return [self._report_result(self.func(*args, **kwargs)) for args, kwargs in calls]
+        from concurrent import futures
+
+        pool = {"process": futures.ProcessPoolExecutor, "thread": futures.ThreadPoolExecutor}
+        with pool[self.parallel_executor](jobs) as executor:
+            submitted = [executor.submit(self.func, *args, **kwargs) for args, kwargs in calls]
+            try:
+                finished = [
+                    self._report_result(future.result()) for future in futures.as_completed(submitted)
+                ]
+            except BaseException:
+                executor.shutdown(cancel_futures=True)
+                raise
+        return [future.result() for future in submitted] if self.parallel_ordered else finished
+
+    async def _invoke_concurrently(
+        self, calls: list[tuple[list[Any], dict[str, Any]]], concurrency: int
+    ) -> list[Any]:
+        """Await the calls of an `async` function, with `concurrency` workers taking the next call as soon as
+        their current one finishes."""
+        import asyncio
+
+        assert self.func is not None
+        results: list[Any] = [None] * len(calls)
+        finished: list[Any] = []
+        pending = iter(enumerate(calls))
+
+        async def worker() -> None:
+            for index, (args, kwargs) in pending:
+                results[index] = self._report_result(await self.func(*args, **kwargs))  # type: ignore
+                finished.append(results[index])
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(concurrency, len(calls)))]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            raise
+        return results if self.parallel_ordered else finished
+
+    def _report_result(self, result: Any) -> Any:
+        """Give the result of the call for one item of the `parallel` argument to `on_result`."""
+        if self.on_result is not None:
+            self.on_result(result)
+        return result
+
+    def _run_coroutine(self, coroutine: Any) -> Any:
+        """Run the coroutine returned by an `async` function on the event loop shared by the command tree."""
+        root = self._get_root()
+        if root._runner is None:
+            import asyncio
+
+            root._runner = asyncio.Runner(loop_factory=self._get_loop_factory())
+        return root._runner.run(coroutine)
+
+    def _close_runner(self) -> None:
+        """Close the event loop used to run the `async` functions, if any was created."""
+        if self._runner is not None:
+            runner, self._runner = self._runner, None
+            runner.close()
+
+    def _convert_namespace(self, namespace: Namespace) -> None:
+        """Convert the parsed values of Enum, Literal (with Enum members) and tuple arguments, in place,
+        using the conversion plan made when the arguments were added to the parser."""
+        for name, converter in self._conversion_plan:
+            setattr(namespace, name, converter(getattr(namespace, name)))
+
+    def _has_variadic_arguments(self) -> bool:
+        return any(argdata.kind in [Kind.VAR_POSITIONAL, Kind.VAR_KEYWORD] for argdata in self.argument_data)
+
+    def _is_single_pass(self) -> bool:
+        """Whether the command line is parsed only once (see `single_pass`)."""
+        cmd: Command | None = self
+        while cmd is not None:
+            if cmd.single_pass:
+                return True
+            cmd = cmd.parent
+        return False
+
+    def _get_root(self) -> Command:
+        """The main command of the tree of this command."""
+        cmd: Command = self
+        while cmd.parent is not None:
+            cmd = cmd.parent
+        return cmd
+
+    def _get_loop_factory(self) -> Callable[[], AbstractEventLoop] | None:
+        """The `loop_factory` of this command or of the nearest parent command defining it."""
+        cmd: Command | None = self
+        while cmd is not None:
+            if cmd.loop_factory is not None:
+                return cmd.loop_factory
+            cmd = cmd.parent
+        return None
+
+    def _get_response_file_prefix_chars(self) -> str | None:
+        """The `fromfile_prefix_chars` of the nearest command with `response_files`, if any."""
+        cmd: Command | None = self
+        while cmd is not None:
+            if cmd.response_files:
+                return cmd.fromfile_prefix_chars
+            cmd = cmd.parent
+        return None
+
+    def _allows_subcommand_abbrev(self) -> bool:
+        """Whether the subcommands can be selected by abbreviations (see `allow_subcommand_abbrev`)."""
+        cmd: Command | None = self
+        while cmd is not None:
+            if cmd.allow_subcommand_abbrev:
+                return True
+            cmd = cmd.parent
+        return False
+
+    def _uses_native_parsing(self) -> bool:
+        """Whether the parser of this command uses the native engine (see `native_parsing`)."""
+        cmd: Command | None = self
+        while cmd is not None:
+            if cmd.native_parsing:
+                return True
+            cmd = cmd.parent
+        return False
+
+    def _has_lazy_parsers(self) -> bool:
+        """Whether the parser of this command must be created as a shell by its parent."""
+        cmd: Command | None = self.parent
+        while cmd is not None:
+            if cmd.lazy_parsers:
+                return True
+            cmd = cmd.parent
+        return False
+
+    def _get_subcommand(self, name: str) -> Command | None:
+        """Return the subcommand registered with the given name or alias."""
+        if name in self.subcommands:
+            return self.subcommands[name]
+        for cmd in self.subcommands.values():
+            if name in cmd.aliases:
+                return cmd
+        return None
+
+    def _get_command_path(self) -> tuple[str, ...]:
+        """The names of the commands from the main command down to this one."""
+        path: list[str] = []
+        cmd: Command | None = self
+        while cmd is not None:
+            path.insert(0, cmd.name or "")
+            cmd = cmd.parent
+        return tuple(path)
+
+    def _get_spec_fingerprint(self) -> str:
+        """A representation of everything (besides the function) that affects the arguments of the parser."""
+        values = [_get_spec_repr(getattr(self, f.name)) for f in fields(self) if f.init and f.name != "func"]
+        values += [_get_spec_repr(self.func), self.import_path, [arg.name for arg in self.argument_data]]
+        return repr(values)
+
     def __generate_argument_data_list(self) -> list[_ArgumentData]:
         argument_data: list[_ArgumentData] = []
         for par in self.parameters:
@@ -947,48 +1746,6 @@ class Command[ReturnType]:
                 if arg.name.strip() in strip_names:
                     arg.name = names[strip_names.index(arg.name.strip())] + " "
 
-    def _get_pos_parameters(self, namespace: Namespace, starargs: list[str]) -> list[Any]:
-        args = []
-        for argdata in self.argument_data:
-            if argdata.kind not in [
-                Kind.POSITIONAL_OR_KEYWORD,
-                Kind.POSITIONAL_ONLY,
-            ]:
-                break
-            if _is_context_annotation(argdata.typeannotation):
-                args.append(self.context)
-            else:
-                args.append(_getattr_with_spaces(namespace, argdata.name))
-        t = str
-        for argdata in self.argument_data:
-            if argdata.kind in [Kind.VAR_POSITIONAL]:
-                t = argdata.typeannotation if callable(argdata.typeannotation) else str
-                break
-        args.extend([t(v) for v in starargs])
-        return args
-
-    def _get_kw_parameters(self, namespace: Namespace, starkwargs: dict[str, Any]) -> OrderedDict:
-        kwargs = OrderedDict(
-            {
-                argdata.name.strip(): _getattr_with_spaces(namespace, argdata.name)
-                for argdata in self.argument_data
-                if argdata.kind in [Kind.KEYWORD_ONLY]
-                and not (_is_context_annotation(argdata.typeannotation))
-            }
-        )
-        t = str
-        for argdata in self.argument_data:
-            if isinstance(argdata.typeannotation, type) and issubclass(argdata.typeannotation, Context):
-                if argdata.kind in [Kind.KEYWORD_ONLY]:
-                    kwargs.update({argdata.name: self.context})
-            if argdata.kind in [Kind.VAR_KEYWORD]:
-                t = argdata.typeannotation if callable(argdata.typeannotation) else str
-                break
-        kwargs.update(
-            {k: [t(item) for item in v] if isinstance(v, list) else t(v) for k, v in starkwargs.items()}  # type: ignore
-        )
-        return kwargs
-
     def _get_unknown_args(self, args: list[str]) -> tuple[list[str], dict[str, Any]]:
         pos = []
         i = 0
@@ -1019,22 +1776,24 @@ class Command[ReturnType]:
         return pos, opts
 
     def _get_data_from_docstring(self) -> _DocstringData | None:
+        docstring = _normalize_docstring(self.func.__doc__)
         if self.docstring_template:
-            return self._collect_docstring_data_using_template(self.docstring_template)
+            return self._collect_docstring_data_using_template(self.docstring_template, docstring)
+        if not docstring:
+            return None
         for template in DOCSTRING_TEMPLATES:
-            data: _DocstringData | None = self._collect_docstring_data_using_template(template)
+            data: _DocstringData | None = self._collect_docstring_data_using_template(template, docstring)
             if data:
                 return data
-        docstring = _normalize_docstring(self.func.__doc__)
-        if docstring:
-            return _DocstringData(description=docstring, epilog=None)
-        return None
+        return _DocstringData(description=docstring, epilog=None)
 
-    def _collect_docstring_data_using_template(self, template: str | None = None) -> _DocstringData | None:
-        docstring = _normalize_docstring(self.func.__doc__)
+    def _collect_docstring_data_using_template(
+        self, template: str | None = None, docstring: str | None = None
+    ) -> _DocstringData | None:
+        if docstring is None:
+            docstring = _normalize_docstring(self.func.__doc__)
         if not docstring:
             return None
-        separator: str = "################################" * 30
         template = template or self.docstring_template
         parameter_number = len(
             [
@@ -1043,57 +1802,10 @@ class Command[ReturnType]:
                 if self.parameters[par].kind not in [Kind.VAR_KEYWORD, Kind.VAR_POSITIONAL]
             ]
         )
-        # escape for regex match, but not "{" and "}"
-        template = re.escape(_normalize_docstring(template) + "\n").replace(r"\{", "{").replace(r"\}", "}")
-        place_holders: dict[str, list[int]] = {
-            "description": [],
-            "epilog": [],
-            "parameter_name": [],
-            "parameter_type": [],
-            "parameter_description": [],
-        }
-        detected_place_holders: list[str] = re.findall(r"{{.*?}}", template)
-        order_counter = 0
-        for word in detected_place_holders:
-            word = word.removeprefix("{{").removesuffix("}}")
-            if word in place_holders:
-                place_holders[word].append(order_counter)
-                order_counter += 1
-        parameter_section_init_index: int = 0
-        for i, line in enumerate(template.splitlines()):
-            if any([f"{{{{{key}}}}}" in line for key in place_holders if key.startswith("parameter")]):
-                parameter_section_init_index = i
-                break
-        parameter_section_length = sum(
-            [template.count(f"{{{{{key}}}}}") for key in place_holders if key.startswith("parameter")]
-        )
-        if parameter_number > 0 and not parameter_section_length:
-            return None
-        if parameter_section_length:
-            parameter_section = "\n".join(template.splitlines()[parameter_section_init_index:])
-            for _ in range(parameter_number - 1):
-                template += f"{parameter_section}\n"
-        else:
-            docstring = docstring.rstrip() + f"\n{separator}"
-            template = template.rstrip() + f"\n{re.escape(separator)}\n"
-        for place_holder in place_holders:
-            template = template.replace(f"{{{{{place_holder}}}}}", "(?! )(.*?)")
-        docstring += "\n"
-        template += "(?!\\s)(.*?)"
-        match = re.match(template, docstring, re.DOTALL)
-        if match:
-            matches: tuple[str, ...] = match.groups()
-            description = matches[place_holders["description"][0]] if place_holders["description"] else None
-            epilog = matches[place_holders["epilog"][0]] if place_holders["epilog"] else None
-            docstring_data = _DocstringData(description=description, epilog=epilog)
-            for i in range(parameter_number):
-                docstring_data.helps[
-                    matches[place_holders["parameter_name"][0] + parameter_section_length * i]
-                ] = _normalize_docstring(
-                    matches[place_holders["parameter_description"][0] + parameter_section_length * i].strip()
-                )
-            return docstring_data
-        return None
+        builtin_format = _BUILTIN_DOCSTRING_FORMATS.get(template or "")
+        if builtin_format is not None:
+            return _parse_builtin_docstring(docstring, *builtin_format, parameter_number)
+        return _match_docstring_template(docstring, template, parameter_number)
 
     def __make_argflagged(self, name: str) -> str:
         return f"{self.longstartflags}{name.replace("_","-")}"
@@ -1238,7 +1950,8 @@ class Command[ReturnType]:
 
     def _add_parsers(self) -> None:
         if self.parent is None:
-            self.parser = ArgumentParser(
+            self._materialize()
+            self.parser = _ArgumentParser(
                 prog=self.prog or self.name if self.func else None,
                 usage=self.usage,
                 description=self.description,
@@ -1252,10 +1965,15 @@ class Command[ReturnType]:
                 add_help=self.add_help,
                 allow_abbrev=self.allow_abbrev,
                 exit_on_error=self.exit_on_error,
+                response_files=self._get_response_file_prefix_chars() is not None,
+                native_parsing=self._uses_native_parsing(),
             )
         else:
             if self.parent.parser is None:
                 self.parent._add_parsers()
+            if not self.parent._arguments_added:
+                self.parent._complete_parser()
+            if self.parser is not None:
                 return
             assert self.parent.sub_commands_group and self.name
             self.parser = self.parent.sub_commands_group.add_parser(
@@ -1275,26 +1993,64 @@ class Command[ReturnType]:
                 add_help=self.add_help,
                 allow_abbrev=self.allow_abbrev,
                 exit_on_error=self.exit_on_error,
+                response_files=self._get_response_file_prefix_chars() is not None,
+                native_parsing=self._uses_native_parsing(),
             )
+            if (self.func is None and self.import_path is not None) or self._has_lazy_parsers():
+                return  # arguments are added by `_complete_parser()` when the subcommand is selected
+        self._add_arguments()
+
+    def _add_arguments(self) -> None:
+        self._arguments_added = True
         self.arguments: list[Action] = []
         assert self.parser is not None
         if (self.help_flags or self.help_msg) and not self.add_help:
             self.help_msg = self.help_msg or "show this help message and exit"
             self.parser.add_argument(*self.help_flags, action="help", help=self.help_msg)
         if self.version and self.func is not None:
-            if not isinstance(self.version, str):
-                self.version = _get_pkg_version(self.func)
-            self.version = self.versionmodifier(self.version) if self.versionmodifier else self.version
-            self.parser.add_argument(
-                *self.version_flags, action="version", version=self.version, help=self.versionhelp
+            if isinstance(self.version, str):
+                self.version = self.versionmodifier(self.version) if self.versionmodifier else self.version
+                self.parser.add_argument(
+                    *self.version_flags, action="version", version=self.version, help=self.versionhelp
+                )
+            else:
+                version_action = self.parser.add_argument(
+                    *self.version_flags, action=_PackageVersionAction, help=self.versionhelp
+                )
+                version_action.command = self  # type: ignore
+        if self.batch:
+            for suffix, help in [("", "shell-quoted line"), ("0", "NUL-delimited record")]:
+                self.parser.add_argument(
+                    f"{self.longstartflags}batch{suffix}",
+                    action=_BatchAction,
+                    dest=SUPPRESS,
+                    default=SUPPRESS,
+                    metavar="FILE",
+                    help=f"run the command once for each {help} of FILE ('-' for the standard input)",
+                )
+        cached_arguments = None
+        if self._spec_cache and not any(argdata.group for argdata in self.argument_data):
+            cached_arguments = self._spec_cache.get_arguments(
+                self._get_command_path(), self._get_spec_fingerprint()
             )
+        generated_arguments: list[tuple[tuple[str, ...], _CompleteKeywordArguments]] = []
         for argdata in self.argument_data:
             argdata.make_flag = self._set_argumentdata_makeflag(argdata)
             if argdata.kind in [Kind.VAR_KEYWORD, Kind.VAR_POSITIONAL]:
                 continue
             if _is_context_annotation(argdata.typeannotation):
                 continue
-            flags, kwargs = self._generate_args_for_add_argument(argdata)
+            if cached_arguments is not None:
+                flags, kwargs = cached_arguments[len(generated_arguments)]
+            else:
+                flags, kwargs = self._generate_args_for_add_argument(argdata)
+            generated_arguments.append((flags, kwargs.copy()))
+            nargs = kwargs.get("nargs")
+            if argdata.parallel and nargs not in ["*", "+"] and not isinstance(nargs, int):
+                raise ValueError(
+                    f"\n\n\nThe `parallel` argument '{argdata.name.strip()}' must take a list of values "
+                    "(e.g. annotated with `list[T]`) or be `*args`.\n\n"
+                )
             handler = self.parser
             if argdata.group is not None:
                 group = argdata.group
@@ -1314,6 +2070,43 @@ class Command[ReturnType]:
 
             self.arguments.append(handler.add_argument(*flags, **kwargs))  # type: ignore
 
+        self._conversion_plan: list[tuple[str, Callable[[Any], Any]]] = [
+            (argdata.name, converter)
+            for argdata in self.argument_data
+            if argdata.kind not in [Kind.VAR_KEYWORD, Kind.VAR_POSITIONAL]
+            and not _is_context_annotation(argdata.typeannotation)
+            and (converter := _get_argument_converter(argdata, self._get_response_file_prefix_chars()))
+            is not None
+        ]
+        self._binder: _InvocationBinder = _make_invocation_binder(self.argument_data)
+        if self._binder.parallel is not None and inspect.iscoroutinefunction(self.func):
+            self.parser.add_argument(
+                f"{self.longstartflags}concurrency",
+                dest=_CONCURRENCY_DEST,
+                type=int,
+                default=_DEFAULT_CONCURRENCY,
+                metavar="N",
+                help=f"maximum number of concurrent calls (defaults to {_DEFAULT_CONCURRENCY})",
+            )
+        elif self._binder.parallel is not None:
+            self.parser.add_argument(
+                f"{self.longstartflags}jobs",
+                dest=_JOBS_DEST,
+                type=int,
+                metavar="N",
+                help="number of parallel workers (defaults to the number of processors)",
+            )
+
+        if (
+            self._spec_cache
+            and self.func
+            and cached_arguments is None
+            and not any(argdata.group for argdata in self.argument_data)
+        ):
+            self._spec_cache.set_arguments(
+                self.func, self._get_command_path(), self._get_spec_fingerprint(), generated_arguments
+            )
+
         if self.subcommands and not self.sub_commands_group:
             title: _TitleDict = {"title": self.subcommands_title}  # type: ignore
             description: _DescriptionDict = {"description": self.subcommands_description}  # type: ignore
@@ -1325,7 +2118,7 @@ class Command[ReturnType]:
                 title["title"] = "subcommands"
 
             # ref: https://docs.python.org/3/library/argparse.html#argparse.ArgumentParser.add_subparsers
-            self.sub_commands_group = self.parser.add_subparsers(
+            self.sub_commands_group = self.parser.add_subparsers(  # type: ignore
                 **title,
                 **description,
                 prog=self.subcommands_prog,  # I corrected this, see https://github.com/python/typeshed/issues/13162
@@ -1333,7 +2126,9 @@ class Command[ReturnType]:
                 help=self.subcommands_help,
                 metavar=self.subcommands_metavar,
                 dest=self.subparsers_dest,
+                action=_SubCommandsAction,
             )
+            self.sub_commands_group.command = self
 
         for cmd in self.subcommands:
             self.subcommands[cmd]._add_parsers()
@@ -1364,6 +2159,183 @@ class Command[ReturnType]:
         return self.parent is None
 
 
+##############################################################################################################
+# %%          PRIVATE CLASSES: argparse actions
+##############################################################################################################
+
+
+class _ArgumentParser(ArgumentParser):
+    """The parser used by `Command`. With `response_files`, the files given with `fromfile_prefix_chars` are
+    read by `_get_response_file_arguments`, once before parsing (see `parse_known_args`), and the arguments
+    with a doubled prefix are kept as they are.
+    With `native_parsing`, the arguments are parsed by `_parse_known_args_natively` when possible. The
+    abbreviations of the options and of the subcommands are found in prefix trees."""
+
+    def __init__(self, *args, response_files: bool = False, native_parsing: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.response_files = response_files
+        self.native_parsing = native_parsing
+        self._option_trie: _PrefixTrie | None = None
+
+    def _get_option_tuples(self, option_string):
+        chars = self.prefix_chars
+        # with the "resolve" conflict handler, the options may be reordered: the order of the trie is wrong
+        if self.conflict_handler != "error" or len(option_string) < 2 or option_string[0] not in chars:
+            return super()._get_option_tuples(option_string)
+        # the options `argparse` can match start with the part before "=" or are a short option (e.g. `-x`
+        # in `-x1`): `argparse` looks only at them, instead of all options
+        actions = self._option_string_actions
+        if self._option_trie is None or len(self._option_trie.words) != len(actions):
+            self._option_trie = _PrefixTrie.from_words(actions)
+        candidates = self._option_trie.get_words(option_string.split("=", 1)[0])
+        if option_string[1] not in chars and option_string[:2] in actions:
+            candidates = self._option_trie.sort([option_string[:2], *candidates])
+        self._option_string_actions = {candidate: actions[candidate] for candidate in candidates}
+        try:
+            return super()._get_option_tuples(option_string)
+        finally:
+            self._option_string_actions = actions
+
+    def _get_values(self, action, arg_strings):
+        if isinstance(action, _SubCommandsAction) and arg_strings:
+            action.selected_as = arg_strings[0]
+            arg_strings = [action.get_name(arg_strings[0]), *arg_strings[1:]]
+        return super()._get_values(action, arg_strings)
+
+    def _check_value(self, action, value):
+        if isinstance(action, _SubCommandsAction) and value not in action.choices:
+            matches = action.get_matches(value)
+            if len(matches) > 1:
+                message = gettext("ambiguous choice: %(value)r could match %(matches)s")
+                matches_text = ", ".join(map(repr, matches))
+                raise ArgumentError(action, message % {"value": value, "matches": matches_text})
+            closest = action.get_trie().get_closest(value, max(1, len(value) * 2 // 5))
+            if closest is not None:
+                message = gettext("invalid choice: %(value)r, maybe you meant %(closest)r?")
+                raise ArgumentError(action, message % {"value": value, "closest": closest})
+        super()._check_value(action, value)
+
+    def _parse_known_args(self, arg_strings, namespace, *args, **kwargs):
+        # the extra arguments of later versions of Python (e.g. `intermixed`) are left to `argparse`
+        if self.native_parsing and not any(args) and not any(kwargs.values()):
+            expanded = arg_strings
+            if self.fromfile_prefix_chars is not None:
+                expanded = self._read_args_from_files(arg_strings)
+            parsed = _parse_known_args_natively(self, expanded, namespace)
+            if parsed is not None:
+                return parsed
+        return super()._parse_known_args(arg_strings, namespace, *args, **kwargs)
+
+    def parse_known_args(self, args=None, namespace=None):
+        if not self.response_files or self.fromfile_prefix_chars is None or _RESPONSE_FILES_EXPANDED.get():
+            return super().parse_known_args(args, namespace)
+        # the parsers of the subcommands get the arguments already expanded: the arguments read from the
+        # files are not read again as response files
+        args = sys.argv[1:] if args is None else args
+        expanded = self._expand_response_files((arg, False) for arg in args)
+        token = _RESPONSE_FILES_EXPANDED.set(True)
+        try:
+            return super().parse_known_args(expanded, namespace)
+        finally:
+            _RESPONSE_FILES_EXPANDED.reset(token)
+
+    def _read_args_from_files(self, arg_strings):
+        # with `response_files`, the files are read by `parse_known_args`, before parsing
+        return arg_strings if self.response_files else super()._read_args_from_files(arg_strings)
+
+    def _expand_response_files(self, arguments: Iterable[tuple[str, bool]]) -> list[str]:
+        """The arguments, given with whether each one was quoted in a response file, with the response files
+        replaced by their arguments (recursively). The arguments with a doubled prefix or quoted (e.g.
+        `'@name'` in a response file) are kept as they are."""
+        assert self.fromfile_prefix_chars is not None
+        expanded: list[str] = []
+        for argument, quoted in arguments:
+            prefix = argument[:1]
+            if quoted or not prefix or prefix not in self.fromfile_prefix_chars or argument[1:2] == prefix:
+                expanded.append(argument)
+                continue
+            try:
+                file_arguments = _get_response_file_arguments(argument[1:])
+            except OSError as err:
+                self.error(str(err))
+            expanded.extend(self._expand_response_files(file_arguments))
+        return expanded
+
+
+class _SubCommandsAction(_SubParsersAction):
+    """The subparsers action used by `Command`. Completes the parser of a lazily registered subcommand
+    (see `Command.new_subcommand` and `Command.lazy_parsers`) right before the remaining arguments are
+    parsed by it. Abbreviations of the names are found in a prefix tree (see
+    `Command.allow_subcommand_abbrev`)."""
+
+    command: Command
+    selected_as: str | None = None
+    """The name, alias or abbreviation of the subcommand selected in the last parsed command line"""
+
+    _trie: _PrefixTrie | None = None
+
+    def get_trie(self) -> _PrefixTrie:
+        """The prefix tree of the names and aliases of the subcommands."""
+        if self._trie is None or len(self._trie.words) != len(self._name_parser_map):
+            self._trie = _PrefixTrie.from_words(self._name_parser_map)
+        return self._trie
+
+    def get_name(self, name: str) -> str:
+        """The name (or alias) of the subcommand selected by `name`, which can be an abbreviation. Returns
+        `name` itself if it selects no subcommand or more than one."""
+        if name in self._name_parser_map:
+            return name
+        matches = self.get_matches(name)
+        return matches[0] if len(matches) == 1 else name
+
+    def get_matches(self, name: str) -> list[str]:
+        """The names (or aliases) of the subcommands abbreviated by `name`, one for each subcommand. Empty
+        without `Command.allow_subcommand_abbrev`."""
+        if not self.command._allows_subcommand_abbrev():
+            return []
+        matches: dict[ArgumentParser, str] = {}
+        for match in self.get_trie().get_words(name):
+            matches.setdefault(self._name_parser_map[match], match)
+        return list(matches.values())
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        subcommand = self.command._get_subcommand(values[0])
+        if subcommand is not None:
+            subcommand._complete_parser()
+        if not self.command._is_single_pass():
+            super().__call__(parser, namespace, values, option_string)
+            return
+        # keep the values of the subcommand in their own namespace, instead of mixing with the parent's ones
+        subnamespace = Namespace()
+        super().__call__(parser, subnamespace, values, option_string)
+        setattr(namespace, self.dest, vars(subnamespace).pop(self.dest))
+        if hasattr(subnamespace, _UNRECOGNIZED_ARGS_ATTR):
+            vars(namespace).setdefault(_UNRECOGNIZED_ARGS_ATTR, [])
+            getattr(namespace, _UNRECOGNIZED_ARGS_ATTR).extend(
+                vars(subnamespace).pop(_UNRECOGNIZED_ARGS_ATTR)
+            )
+        setattr(namespace, _SUBCOMMAND_NAMESPACE_DEST, subnamespace)
+
+
+class _PackageVersionAction(_VersionAction):
+    """The version action used by `Command` when `version=True`. The version is searched in the package
+    metadata (see `_get_pkg_version`) only when the option is given in the command line."""
+
+    command: Command
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        self.version = self.command._get_version()
+        super().__call__(parser, namespace, values, option_string)
+
+
+class _BatchAction(Action):
+    """The action of the `--batch` and `--batch0` options (see `Command.batch`). The options are handled by
+    `Command.run` before parsing, so reaching the parser means they were not given as the first argument."""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        parser.error(f"argument {option_string}: must be the first argument")
+
+
 ##############################################################################################################
 # %%          PRIVATE CLASSES: Typed dict
 ##############################################################################################################
@@ -1838,6 +2810,15 @@ class _DocstringData:
     helps: dict[str, str] = field(default_factory=dict)
 
 
+@dataclass
+class _CompiledDocstringTemplate:
+    """A docstring template compiled to a regex for a given number of parameters"""
+
+    pattern: re.Pattern[str]
+    place_holders: dict[str, list[int]]
+    parameter_section_length: int
+
+
 @dataclass
 class _ArgumentData:
     """A proxy dataclass to store info that came from `inspect.Parameter` objects
@@ -1861,6 +2842,8 @@ class _ArgumentData:
     - `parser` (`Any`, optional): Defaults to `None`. Not used in `clig` (maybe in `dataparsers`?)
     - `help` (`str | None`, optional): Defaults to `None`. Help string
     - `help_modifier` (`Callable[[str], str] | None`, optional): Defaults to `None`. Argument help modifier.
+    - `parallel` (`bool`, optional): Defaults to `False`. Whether the function is called once for each item.
+    - `delimiter` (`str`, optional): Defaults to `"\\n"`. Delimiter of the items read by `Iterable` arguments.
     """
 
     name: str
@@ -1874,18 +2857,595 @@ class _ArgumentData:
     parser: Any = None
     help: str | None = None
     helpmodifier: Callable[[str], str] | None | None = None
+    parallel: bool = False
+    delimiter: str = "\n"
 
 
-##############################################################################################################
-# %%          PUBLIC CLASSES: Command arguments
-##############################################################################################################
+@dataclass
+class _TokenStartReader:
+    """Reads a response file for `shlex` (see `_get_response_file_tokens`), keeping the first character of the
+    current argument, after the blanks and comments."""
 
+    file: TextIO
+    start: str | None = None
 
-class CommandArguments(TypedDict, total=False):
-    """Arguments passed to `Command`. Include the arguments of `argparse.ArgumentParser`, described in
+    def read(self, size: int) -> str:
+        text = self.file.read(size)
+        if self.start is None and text and not text.isspace() and text != "#":
+            self.start = text[0]
+        return text
 
-    https://docs.python.org/3/library/argparse.html#argumentparser-objects
-    """
+    def readline(self) -> str:
+        return self.file.readline()
+
+
+@dataclass
+class _PrefixTrie:
+    """A prefix tree of words (the option strings or the subcommand names of a parser), to find the words
+    starting with a prefix in the time of its length, and the closest word to a misspelled one."""
+
+    children: dict[str, _PrefixTrie] = field(default_factory=dict)
+    words: list[str] = field(default_factory=list)
+    """The words starting with the prefix of this node, in the order they were added"""
+
+    index: int | None = None
+    """The position of the word ending at this node among the words of the tree, if any"""
+
+    @classmethod
+    def from_words(cls, words: Iterable[str]) -> _PrefixTrie:
+        trie = cls()
+        for word in words:
+            trie.add(word)
+        return trie
+
+    def add(self, word: str) -> None:
+        node = self
+        index = len(self.words)
+        node.words.append(word)
+        for char in word:
+            node = node.children.setdefault(char, _PrefixTrie())
+            node.words.append(word)
+        node.index = index
+
+    def get_words(self, prefix: str) -> list[str]:
+        """The words starting with the prefix, in the order they were added."""
+        node: _PrefixTrie | None = self
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.words
+
+    def sort(self, words: Iterable[str]) -> list[str]:
+        """The words of the tree, without duplicates, in the order they were added."""
+        return sorted(set(words), key=lambda word: self._get_node(word).index)  # type: ignore
+
+    def get_closest(self, word: str, max_distance: int) -> str | None:
+        """The word of the tree with the fewest edits (insertions, deletions, substitutions and transpositions
+        of adjacent characters) from the given word, if any has at most `max_distance`. The distances are
+        computed along the branches of the tree, skipping the branches already too far from the word."""
+        closest: tuple[int, int, str] | None = None
+        # the nodes to visit, with their character and the last two rows of the table of distances
+        stack: list[tuple[_PrefixTrie, str, list[int], list[int] | None]] = [
+            (self, "", list(range(len(word) + 1)), None)
+        ]
+        while stack:
+            node, previous_char, previous_row, before_row = stack.pop()
+            for char, child in node.children.items():
+                row = [previous_row[0] + 1]
+                for i in range(1, len(word) + 1):
+                    distance = min(row[i - 1], previous_row[i]) + 1
+                    distance = min(distance, previous_row[i - 1] + (word[i - 1] != char))
+                    transposed = i > 1 and (word[i - 2], word[i - 1]) == (char, previous_char)
+                    if transposed and before_row is not None:
+                        distance = min(distance, before_row[i - 2] + 1)
+                    row.append(distance)
+                if child.index is not None and row[-1] <= max_distance:
+                    candidate = (row[-1], child.index, self.words[child.index])
+                    closest = candidate if closest is None else min(closest, candidate)
+                if min(row) <= max_distance:
+                    stack.append((child, char, row, previous_row))
+        return closest[2] if closest is not None else None
+
+    def _get_node(self, word: str) -> _PrefixTrie | None:
+        node: _PrefixTrie | None = self
+        for char in word:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+
+@dataclass
+class _InvocationBinder:
+    """Binds the parsed namespace of a command to the arguments of its function. Made once for each command
+    (see `_make_invocation_binder`), so each call only looks up the values in the namespace."""
+
+    positional: list[str | None]
+    """The destinations of the positional arguments in the namespace (`None` where the `Context` goes)"""
+
+    keyword: list[tuple[str, str | None]]
+    """The names of the keyword only parameters and their destinations (`None` where the `Context` goes)"""
+
+    varargs_type: Callable[[str], Any] = str
+    """The converter of the extra positional arguments given to `*args`"""
+
+    varkwargs_type: Callable[[str], Any] = str
+    """The converter of the values of the extra options given to `**kwargs`"""
+
+    parallel: int | str | None = None
+    """The argument to fan out (see `data(parallel=True)`): the index of a positional argument, the name of a
+    keyword only argument or `"*"` for `*args`. `None` when the function is called only once."""
+
+    def bind(
+        self, namespace: Namespace, context: Any, starargs: list[str], starkwargs: dict[str, Any]
+    ) -> tuple[list[Any], dict[str, Any]]:
+        values = vars(namespace)
+
+        def get_value(dest: str | None) -> Any:
+            if dest is None:
+                return context
+            if dest in values:
+                return values[dest]
+            return _getattr_with_spaces(namespace, dest)
+
+        args = [get_value(dest) for dest in self.positional]
+        kwargs = {name: get_value(dest) for name, dest in self.keyword}
+        if starargs:
+            args.extend(self.varargs_type(value) for value in starargs)
+        for name, value in starkwargs.items():
+            t = self.varkwargs_type
+            kwargs[name] = [t(item) for item in value] if isinstance(value, list) else t(value)
+        return args, kwargs
+
+    def fan_out(self, args: list[Any], kwargs: dict[str, Any]) -> list[tuple[list[Any], dict[str, Any]]]:
+        """The arguments of each call of the function, one for each item of the `parallel` argument."""
+        if self.parallel is None:
+            return [(args, kwargs)]
+        if self.parallel == "*":
+            head = args[: len(self.positional)]
+            return [(head + [item], kwargs) for item in args[len(self.positional) :]]
+        if isinstance(self.parallel, int):
+            index = self.parallel
+            return [(args[:index] + [item] + args[index + 1 :], kwargs) for item in args[index] or []]
+        return [(args, {**kwargs, self.parallel: item}) for item in kwargs[self.parallel] or []]
+
+
+@dataclass
+class _SpecCache:
+    """The on-disk cache of the specification of a command tree (see `Command.spec_cache`).
+
+    The entries are kept pickled, so each `Command` gets its own copy of the cached objects. The whole cache
+    is discarded when any of the `sources` files changes.
+    """
+
+    path: str
+    sources: dict[str, tuple[int, int]] = field(default_factory=dict)
+    functions: dict[tuple[str, str, str | None], bytes] = field(default_factory=dict)
+    arguments: dict[tuple[str, ...], tuple[str, bytes]] = field(default_factory=dict)
+    versions: dict[str, str] = field(default_factory=dict)
+    dirty: bool = False
+
+    @classmethod
+    def load(cls, path: str) -> _SpecCache:
+        import pickle
+
+        cache = cls(path)
+        try:
+            with open(path, "rb") as file:
+                header, sources, functions, arguments, versions = pickle.load(file)
+        except Exception:
+            return cache
+        if header != _get_spec_cache_header():
+            return cache
+        if any(_get_source_stamp(source) != stamp for source, stamp in sources.items()):
+            return cache
+        cache.sources, cache.functions, cache.arguments, cache.versions = (
+            sources,
+            functions,
+            arguments,
+            versions,
+        )
+        return cache
+
+    def save(self) -> None:
+        import pickle
+
+        if not self.dirty:
+            return
+        for module in [sys.modules[__name__], sys.modules.get("__main__")]:
+            self._add_source(getattr(module, "__file__", None))
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "wb") as file:
+                pickle.dump(
+                    (_get_spec_cache_header(), self.sources, self.functions, self.arguments, self.versions),
+                    file,
+                )
+            os.replace(temporary, self.path)
+        except OSError:
+            return
+        self.dirty = False
+
+    def get_function(
+        self, func: Callable[..., Any], template: str | None
+    ) -> tuple[_DocstringData | None, list[_ArgumentData]] | None:
+        key = _get_function_key(func, template)
+        return self._load_entry(self.functions.get(key)) if key else None
+
+    def set_function(
+        self,
+        func: Callable[..., Any],
+        template: str | None,
+        docstring_data: _DocstringData | None,
+        argument_data: list[_ArgumentData],
+    ) -> None:
+        key = _get_function_key(func, template)
+        if key is None or any(arg.group for arg in argument_data):
+            return
+        entry = self._dump_entry((docstring_data, argument_data))
+        if entry is not None and self._add_sources(func, _get_argument_objects(argument_data)):
+            self.functions[key] = entry
+            self.dirty = True
+
+    def get_arguments(
+        self, path: tuple[str, ...], fingerprint: str
+    ) -> list[tuple[tuple[str, ...], _CompleteKeywordArguments]] | None:
+        cached_fingerprint, entry = self.arguments.get(path, ("", None))
+        return self._load_entry(entry) if cached_fingerprint == fingerprint else None
+
+    def set_arguments(
+        self,
+        func: Callable[..., Any],
+        path: tuple[str, ...],
+        fingerprint: str,
+        arguments: list[tuple[tuple[str, ...], _CompleteKeywordArguments]],
+    ) -> None:
+        if _get_function_key(func, None) is None:
+            return
+        entry = self._dump_entry(arguments)
+        objects = [value for _, kwargs in arguments for value in kwargs.values()]
+        if entry is not None and self._add_sources(func, objects):
+            self.arguments[path] = (fingerprint, entry)
+            self.dirty = True
+
+    def get_version(self, func: Callable[..., Any]) -> str | None:
+        return self.versions.get(func.__module__)
+
+    def set_version(self, func: Callable[..., Any], version: str) -> None:
+        if self._add_source(getattr(sys.modules.get(func.__module__), "__file__", None)):
+            self.versions[func.__module__] = version
+            self.dirty = True
+
+    def _add_sources(self, func: Callable[..., Any], objects: Iterable[Any]) -> bool:
+        """Adds the files of the modules an entry of the function depends on (see `_get_source_modules`).
+        Returns whether the module of the function itself has a file, as entries are not cached otherwise."""
+        module, *others = _get_source_modules(func, objects)
+        for other in others:
+            self._add_source(getattr(sys.modules.get(other), "__file__", None))
+        return self._add_source(getattr(sys.modules.get(module), "__file__", None))
+
+    def _add_source(self, source: str | None) -> bool:
+        stamp = _get_source_stamp(source) if source else None
+        if source is None or stamp is None:
+            return False
+        self.sources[source] = stamp
+        return True
+
+    def _dump_entry(self, entry: Any) -> bytes | None:
+        import pickle
+
+        try:
+            return pickle.dumps(entry)
+        except Exception:
+            return None
+
+    def _load_entry(self, entry: bytes | None) -> Any:
+        import pickle
+
+        if entry is None:
+            return None
+        try:
+            return pickle.loads(entry)
+        except Exception:
+            return None
+
+
+@dataclass
+class _FrozenCommand:
+    """A command of a frozen module (see `Command.freeze`), with what `_run_frozen` needs to invoke its
+    function without inspecting it."""
+
+    function: str | None
+    """The import string of the function"""
+
+    binder: _InvocationBinder
+    conversion_plan: list[tuple[str, Callable[[Any], Any]]] = field(default_factory=list)
+    subparsers_dest: str | None = None
+    subcommands: dict[str, _FrozenCommand] = field(default_factory=dict)
+    """The subcommands, by name and by alias"""
+
+
+@dataclass
+class _FrozenModuleWriter:
+    """Writes the source of a frozen module (see `Command.freeze`)."""
+
+    imports: dict[str, str] = field(default_factory=dict)
+    """The aliases of the modules imported by the frozen module, by module name"""
+
+    lines: list[str] = field(default_factory=list)
+    signatures: dict[str, tuple[str, str, dict[str, str]]] = field(default_factory=dict)
+    """The signatures, docstring digests and digests of the modules of the annotations of the functions, by
+    import string (see `_check_frozen`)"""
+
+    parsers: int = 0
+    commands: int = 0
+
+    def write(self, cmd: Command) -> str:
+        clig = self.get_module(__name__)
+        self.lines += ["", "", "def build_parser():", '    """The parser of the command line."""']
+        self.add_parser(cmd, None)
+        self.lines += [
+            "    return parser_0",
+            "",
+            "",
+            "def get_command():",
+            '    """The main command, with the functions to invoke and the conversions of the arguments."""',
+        ]
+        root = self.add_command(cmd)
+        self.lines += [
+            f"    return {root}",
+            "",
+            "",
+            "def run(args=None):",
+            '    """Parse the arguments (by default, `sys.argv[1:]`) and invoke the selected commands."""',
+            f"    return {clig}._run_frozen(build_parser(), get_command(), args)",
+            "",
+            "",
+            "def check():",
+            '    """The functions changed since this module was generated (all of them if clig changed)."""',
+            f"    return {clig}._check_frozen(SIGNATURES, __clig_version__)",
+            "",
+            "",
+            'if __name__ == "__main__":',
+            "    run()",
+        ]
+        signatures: list[str] = []
+        for key, value in self.signatures.items():
+            signatures += self.get_lines(value, f"    {key!r}: ", ",")
+        header = [
+            f'"""Frozen command line of `{cmd.parser.prog if cmd.parser else cmd.name}`, generated by clig. '
+            "Do not edit.",
+            "",
+            "Generated by `Command.freeze`. Generate it again when the commands change: `check()` lists the",
+            "functions changed since then.",
+            '"""',
+            "",
+            *[f"import {module} as {alias}" for module, alias in sorted(self.imports.items())],
+            "",
+            f"__clig_version__ = {_get_clig_version()!r}",
+            "",
+            "SIGNATURES = {",
+            *signatures,
+            "}",
+        ]
+        return "\n".join(header + self.lines) + "\n"
+
+    def add_parser(self, cmd: Command, subparsers: str | None) -> None:
+        """Add the lines making the parser of the command (and of its subcommands)."""
+        parser = cmd.parser
+        assert parser is not None and cmd.name is not None
+        variable = f"parser_{self.parsers}"
+        self.parsers += 1
+        arguments: list[str] = []
+        if subparsers is not None:
+            assert cmd.parent is not None and cmd.parent.sub_commands_group is not None
+            arguments.append(self.render(cmd.name))
+            if cmd.aliases:
+                arguments.append(f"aliases={self.render(list(cmd.aliases))}")
+            for choice in cmd.parent.sub_commands_group._choices_actions:
+                if choice.dest == cmd.name:
+                    arguments.append(f"help={self.render(choice.help)}")
+        arguments += self.get_keyword_arguments(ArgumentParser.__init__, parser, ["parents", "add_help"])
+        arguments.append("add_help=False")  # the help action is added as the other actions
+        if isinstance(parser, _ArgumentParser) and parser.response_files:
+            arguments.append("response_files=True")
+        if isinstance(parser, _ArgumentParser) and parser.native_parsing:
+            arguments.append("native_parsing=True")
+        function = f"{subparsers}.add_parser" if subparsers else self.reference(type(parser))
+        self.add_call(f"{variable} = {function}", arguments)
+        registry = {cls: name for name, cls in parser._registries["action"].items() if name is not None}
+        for action in parser._actions:
+            if isinstance(action, _SubParsersAction):
+                self.add_subparsers(cmd, variable, action)
+            else:
+                self.add_call(f"{variable}.add_argument", self.get_action_arguments(action, registry))
+
+    def add_subparsers(self, cmd: Command, parser: str, action: _SubParsersAction) -> None:
+        assert cmd.parser is not None
+        variable = parser.replace("parser_", "subparsers_")
+        arguments: list[str] = []
+        group = cmd.parser._subparsers
+        if group is not None and group is not cmd.parser._positionals:
+            arguments.append(f"title={self.render(group.title)}")
+            arguments.append(f"description={self.render(group.description)}")
+        arguments.append(f"prog={self.render(action._prog_prefix)}")
+        for name in ["dest", "required", "help", "metavar"]:
+            arguments.append(f"{name}={self.render(getattr(action, name))}")
+        self.add_call(f"{variable} = {parser}.add_subparsers", arguments)
+        for subcommand in cmd.subcommands.values():
+            self.add_parser(subcommand, variable)
+
+    def add_command(self, cmd: Command) -> str:
+        """Add the lines making the frozen command (after the ones of its subcommands), returning its
+        variable."""
+        reason = _get_freeze_error(cmd)
+        if reason is not None:
+            raise ValueError(f"\n\n\nThe command '{cmd.name}' cannot be frozen: {reason}.\n\n")
+        subcommands = {name: self.add_command(subcommand) for name, subcommand in cmd.subcommands.items()}
+        for name, subcommand in cmd.subcommands.items():
+            subcommands.update({alias: subcommands[name] for alias in subcommand.aliases})
+        function = None
+        if cmd.func is not None:
+            self.reference(cmd.func)  # checks that it is importable
+            function = f"{cmd.func.__module__}:{cmd.func.__qualname__}"
+            modules = _get_frozen_modules(_get_argument_objects(cmd.argument_data))
+            self.signatures[function] = (*_get_frozen_signature(cmd.func), modules)
+        variable = f"command_{self.commands}"
+        self.commands += 1
+        arguments: list[str | tuple[str, Any]] = [
+            f"function={self.render(function)}",
+            ("binder=", cmd._binder),
+            ("conversion_plan=", cmd._conversion_plan),
+            f"subparsers_dest={self.render(getattr(cmd, 'subparsers_dest', None))}",
+            "subcommands={" + ", ".join(f"{name!r}: {sub}" for name, sub in subcommands.items()) + "}",
+        ]
+        self.add_call(f"{variable} = {self.reference(_FrozenCommand)}", arguments)
+        return variable
+
+    def add_call(self, function: str, arguments: list[str | tuple[str, Any]]) -> None:
+        """Add the line of a call (split into one line for each argument, when too long). Each argument is
+        its source, or a keyword and a value to render (split into more lines too, see `get_lines`)."""
+        sources = [a if isinstance(a, str) else f"{a[0]}{self.render(a[1])}" for a in arguments]
+        line = f"    {function}({', '.join(sources)})"
+        if len(line) <= _FROZEN_LINE_LENGTH:
+            self.lines.append(line)
+            return
+        self.lines.append(f"    {function}(")
+        for argument in arguments:
+            if isinstance(argument, str):
+                self.lines.append(f"        {argument},")
+            else:
+                self.lines += self.get_lines(argument[1], f"        {argument[0]}", ",")
+        self.lines.append("    )")
+
+    def get_lines(self, value: Any, prefix: str, suffix: str) -> list[str]:
+        """The lines of the expression remaking the value (see `render`), between `prefix` (starting with
+        the indentation) and `suffix`. Lists, tuples, dicts and dataclasses are split into one line for each
+        item when too long."""
+        line = f"{prefix}{self.render(value)}{suffix}"
+        parts = self.get_parts(value)
+        if len(line) <= _FROZEN_LINE_LENGTH or parts is None:
+            return [line]
+        opening, items, closing = parts
+        indent = prefix[: len(prefix) - len(prefix.lstrip())] + "    "
+        lines = [f"{prefix}{opening}"]
+        for key, item in items:
+            lines += self.get_lines(item, f"{indent}{key}", ",")
+        return lines + [f"{indent[:-4]}{closing}{suffix}"]
+
+    def get_parts(self, value: Any) -> tuple[str, list[tuple[str, Any]], str] | None:
+        """The opening, the items (with their keys) and the closing of the expression remaking a list, a
+        tuple, a dict or a dataclass (see `render`). `None` for other values."""
+        if isinstance(value, list):
+            return "[", [("", item) for item in value], "]"
+        if isinstance(value, tuple):
+            return "(", [("", item) for item in value], ")"
+        if isinstance(value, dict):
+            return "{", [(f"{self.render(k)}: ", v) for k, v in value.items()], "}"
+        if is_dataclass(value) and not isinstance(value, type) and not hasattr(value, "_clig_recipe"):
+            items = [(f"{f.name}=", getattr(value, f.name)) for f in fields(value) if f.init]
+            return f"{self.reference(type(value))}(", items, ")"
+        return None
+
+    def get_action_arguments(self, action: Action, registry: dict[type, str]) -> list[str]:
+        """The arguments of the `add_argument()` call remaking the action."""
+        cls: type[Action] = type(action)
+        options = list(action.option_strings)
+        if isinstance(action, BooleanOptionalAction):  # the negative options are added by the action itself
+            options = [o for o in options if not (o.startswith("--no-") and f"--{o[5:]}" in options)]
+        if isinstance(action, _PackageVersionAction):
+            cls = _VersionAction
+            action.version = action.command._get_version()
+        arguments = [self.render(option) for option in options] or [self.render(action.dest)]
+        if registry.get(cls, "store") != "store":
+            arguments.append(f"action={self.render(registry[cls])}")
+        elif cls not in registry:
+            arguments.append(f"action={self.reference(cls)}")
+        skip = ["option_strings"] + ([] if options else ["dest", "required"])
+        arguments += self.get_keyword_arguments(cls.__init__, action, skip)
+        return arguments
+
+    def get_keyword_arguments(self, function: Callable[..., Any], obj: Any, skip: list[str]) -> list[str]:
+        """The keyword arguments remaking the object with its current attributes, skipping the ones equal to
+        the defaults of the parameters of `function`."""
+        arguments: list[str] = []
+        for name, parameter in list(inspect.signature(function).parameters.items())[1:]:
+            if name in skip or parameter.kind in [Kind.VAR_POSITIONAL, Kind.VAR_KEYWORD]:
+                continue
+            value = getattr(obj, name, parameter.default)
+            default = parameter.default
+            if value is default or (type(value) is type(default) and value == default):
+                continue
+            if value is None and type(default) is object:  # a sentinel of `argparse`
+                continue
+            arguments.append(f"{name}={self.render(value)}")
+        return arguments
+
+    def get_module(self, name: str) -> str:
+        """The alias of the module in the frozen module, importing it."""
+        return self.imports.setdefault(name, "_" + name.replace(".", "_"))
+
+    def reference(self, obj: Any) -> str:
+        """The expression referring to an object importable by name in the frozen module."""
+        module, qualname = getattr(obj, "__module__", None), getattr(obj, "__qualname__", None)
+        if not module or not qualname or module == "__main__" or "<" in qualname:
+            raise ValueError(
+                f"\n\n\nCannot freeze {obj!r}: it is not importable by name (it is defined in `__main__` or "
+                "locally).\n\n"
+            )
+        try:
+            found = _import_from_path(f"{module}:{qualname}")
+        except (ImportError, AttributeError):
+            found = None
+        if found is not obj:
+            raise ValueError(f"\n\n\nCannot freeze {obj!r}: it is not found at `{module}.{qualname}`.\n\n")
+        return qualname if module == "builtins" else f"{self.get_module(module)}.{qualname}"
+
+    def render(self, value: Any) -> str:
+        """The expression remaking the value in the frozen module."""
+        if value is None or value is ... or isinstance(value, (bool, int, float, str, bytes)):
+            return repr(value)
+        if isinstance(value, Enum):
+            return f"{self.reference(type(value))}.{value.name}"
+        if isinstance(value, list):
+            return "[" + ", ".join(self.render(item) for item in value) + "]"
+        if isinstance(value, tuple):
+            items = ", ".join(self.render(item) for item in value)
+            return f"({items},)" if len(value) == 1 else f"({items})"
+        if isinstance(value, dict):
+            return "{" + ", ".join(f"{self.render(k)}: {self.render(v)}" for k, v in value.items()) + "}"
+        recipe = getattr(value, "_clig_recipe", None)
+        if recipe is not None:
+            factory, arguments = recipe
+            rendered = ", ".join(self.render(argument) for argument in arguments)
+            return f"{self.get_module(__name__)}.{factory.__name__}({rendered})"
+        if is_dataclass(value) and not isinstance(value, type):
+            arguments = [f"{f.name}={self.render(getattr(value, f.name))}" for f in fields(value) if f.init]
+            return f"{self.reference(type(value))}({', '.join(arguments)})"
+        if inspect.ismethod(value):
+            return f"{self.render(value.__self__)}.{value.__name__}"
+        origin = get_origin(value)
+        if origin is Literal:
+            values = ", ".join(self.render(a) for a in get_args(value))
+            return f"{self.get_module('typing')}.Literal[{values}]"
+        if origin in [Union, UnionType]:
+            return " | ".join(self.render(a) for a in get_args(value))
+        if origin is not None and get_args(value):
+            return f"{self.render(origin)}[{', '.join(self.render(a) for a in get_args(value))}]"
+        return self.reference(value)
+
+
+##############################################################################################################
+# %%          PUBLIC CLASSES: Command arguments
+##############################################################################################################
+
+
+class CommandArguments(TypedDict, total=False):
+    """Arguments passed to `Command`. Include the arguments of `argparse.ArgumentParser`, described in
+
+    https://docs.python.org/3/library/argparse.html#argumentparser-objects
+    """
 
     # Arguments for `ArgumentParser` object, see: https://docs.python.org/3/library/argparse.html#argumentparser-objects
 
@@ -2099,7 +3659,8 @@ class CommandArguments(TypedDict, total=False):
 
     version: bool | str
     """Whether to add version information to the command. Defaults to `False`.
-    If `True`, tries to find the version from the function's package.
+    If `True`, tries to find the version from the function's package (only when the version option is
+    given in the command line).
     If it is a string, use the string as the version information."""
 
     versionmodifier: Callable[[str], str] | None
@@ -2117,6 +3678,113 @@ class CommandArguments(TypedDict, total=False):
     Defaults to `"show program's version number and exit"`.
     """
 
+    lazy_parsers: bool
+    """Whether to build the parsers of the subcommands only when they are selected in the command line.
+    Defaults to `False`. When `True`, only a cheap "shell" parser with the name, aliases and help of each
+    subcommand is created at first, and its arguments (and the shells of its own subcommands) are added the
+    moment the subcommand is selected, so the startup cost scales with the depth of the invoked command
+    rather than with the size of the whole command tree. Applies to all subcommands nested below this
+    command.
+    """
+
+    single_pass: bool
+    """Whether to parse the command line only once when subcommands are invoked. Defaults to `False`.
+    By default, the command line is parsed by the main command and parsed again by each selected subcommand,
+    from the first occurrence of its name on. When `True`, the values of each command are collected from a
+    single parse and the functions of all selected commands are invoked in order. Extra arguments (not
+    recognized by any parser) are given to the deepest selected command accepting `*args` or `**kwargs`.
+    Applies to all subcommands nested below this command.
+    """
+
+    native_parsing: bool
+    """Whether to parse the command line with the native engine of `clig` instead of `argparse`. Defaults to
+    `False`. The engine handles the common subset of command lines (options given by their name or an
+    abbreviation, with `--option=value` or with a fixed, `?`, `*` or `+` number of values, flags,
+    positionals with a fixed number of values and subcommands) in a single linear pass with dictionary
+    lookups of the options. Anything else (combined short flags, `--`, positionals with a variable number
+    of values, mutually exclusive groups, errors and extra arguments) is left to `argparse`, so the parsed
+    values and the error messages are the same. Applies to all subcommands nested below this command.
+    """
+
+    allow_subcommand_abbrev: bool
+    """Whether a subcommand can be selected by an unambiguous abbreviation of its name or of an alias (e.g.
+    `bu` for `build`). Defaults to `False`. An ambiguous abbreviation is reported with the subcommands it
+    could match. A misspelled subcommand name is reported with the closest name, with or without this
+    option. Applies to all subcommands nested below this command.
+    """
+
+    spec_cache: str | PathLike[str] | None
+    """The path of a file used to cache the specification of the command tree between runs. Defaults to
+    `None` (no cache). When given, the data introspected from the functions (signatures and docstrings) and
+    the arguments generated for `add_argument()` are saved to this file, so later runs build the parsers
+    straight from it. The version found for `version=True` is saved as well. The cache is discarded
+    automatically when any contributing source file (the modules of the functions, of their annotations,
+    converters and `Enum` defaults, the `__main__` script or `clig` itself) changes. Entries that cannot be
+    pickled (e.g. locally defined converters) or that use argument groups are always built normally. The
+    file is read with `pickle`, so it must be in a trusted location. Applies to all subcommands added to
+    this command.
+    """
+
+    loop_factory: Callable[[], AbstractEventLoop] | None
+    """The factory of the event loop used to run `async` functions (e.g. `uvloop.new_event_loop`). Defaults
+    to `None` (the default loop of `asyncio`). The coroutines returned by the functions of the command and
+    of all subcommands are awaited with one `asyncio.Runner`, shared by all commands invoked in a call to
+    `run` (or `run_many`) and closed at its end. Applies to all subcommands nested below this command.
+    """
+
+    batch: bool
+    """Whether to add the `--batch FILE` and `--batch0 FILE` options to the command. Defaults to `False`.
+    When one of them is given as the first argument, the command is run once for each shell-quoted line of
+    `FILE` (or each NUL-delimited record, with `--batch0`), all against the same parser (see `run_many`).
+    Use `-` to read the standard input. Errors of each record are reported without stopping the batch, and
+    the program exits with status `1` at the end if any record failed.
+    """
+
+    response_files: bool
+    """Whether to read the files given with `fromfile_prefix_chars` (e.g. `@args.txt`) as response files.
+    Defaults to `False` (one argument per line, as in `argparse`). When `True`, the arguments in the files are
+    split as in a shell, with quotes and `#` comments, and each file is read only once for all parsers (and
+    cached, until it is modified). The response files given in a response file are read as well, unless
+    quoted (e.g. `'@name'` is the argument `@name`). An argument with a doubled prefix (e.g. `@@items.txt`)
+    is not expanded: given to an `Iterable[T]` parameter, the items are read lazily from the response file
+    instead of the command line. Applies to all subcommands nested below this command.
+    """
+
+    parallel_executor: Literal["process", "thread"]
+    """The pool of workers calling the function once for each item of its `parallel` argument (see `data`):
+    `"process"` (a `ProcessPoolExecutor`, for CPU-bound functions) or `"thread"` (a `ThreadPoolExecutor`, for
+    I/O-bound functions). Defaults to `"process"`. With processes, the function and the values of its
+    arguments must be picklable (e.g. a function defined at module level). The number of workers is given by
+    the `--jobs N` option, added to commands with a `parallel` argument (by default, the number of
+    processors); `--jobs 1` calls the function in this process, one item after the other. Not used by `async`
+    functions, whose calls are awaited on the event loop, at most `--concurrency N` at a time (by default,
+    100).
+    """
+
+    parallel_ordered: bool
+    """Whether the results of the calls for the items of the `parallel` argument are returned in the order
+    of the items. Defaults to `True`. When `False`, they are returned in the order the calls finish.
+    """
+
+    on_result: Callable[[Any], Any] | None
+    """A function called with the result of each call for an item of the `parallel` argument, as soon as the
+    call finishes (e.g. to print or save the results while the others are still running). Defaults to `None`.
+    """
+
+    completion_index: str | PathLike[str] | None
+    """The path of a JSON file used to cache the completion index of the command tree between runs.
+    Defaults to `None` (the index is made again for each completion). When the environment variable
+    `CLIG_COMPLETE` is set (to any non-empty value), `run` does not parse the arguments: they are taken as
+    the words of a command line being completed, the last one (possibly empty) being the word under the
+    cursor, and the possible completions of that word (names and aliases of subcommands, flags and choices
+    of `Literal` and `Enum` arguments) are printed one per line, before exiting. The index holding them is
+    made from the parsers of the whole command tree (importing the lazily registered subcommands), so with
+    this file later completions are answered straight from it, without importing any subcommand or
+    building any parser. It is made again automatically when any contributing source file (the modules of
+    the functions, of their annotations, converters and `Enum` defaults, the `__main__` script or `clig`
+    itself) changes. Only used by the main command.
+    """
+
 
 class CompleteCommandArguments(CommandArguments, total=False):
     """All arguments passed to `Command`. Include all arguments of :class:`clig.CommandArguments` and
@@ -2162,6 +3830,206 @@ class Context[T]:
     invocation, this still refers to the top-level (parent) command."""
 
 
+@dataclass
+class BatchResult[T]:
+    """The outcome of one run of a batch (see `Command.run_many` and `Command.batch`).
+
+    A failed run does not stop the batch: the `SystemExit` raised by `argparse` (or by
+    the function) and the exceptions raised by the function are stored in `error`,
+    and the exit status the program would have returned is stored in `exit_code`."""
+
+    args: list[str]
+    """The argument list of this run."""
+
+    result: T | None = None
+    """The return value of the function invoked by this run (of the last
+    subcommand, if any), or `None` if the run failed."""
+
+    exit_code: int = 0
+    """The exit status of this run: `0` on success, the code of the `SystemExit`
+    raised, or `1` when the function raised an exception."""
+
+    error: BaseException | None = None
+    """The `SystemExit` or exception that stopped this run, if it failed."""
+
+
+@dataclass
+class MappedFile:
+    """A read-only memory map of a file, to annotate parameters receiving large inputs.
+
+    When used as the type of a parameter (e.g. `data: clig.MappedFile` or
+    `files: list[clig.MappedFile]`), the path given in the command line is checked
+    while parsing, but the file is mapped only on the first access to its contents,
+    and it is closed right after the function returns. The object supports the buffer
+    protocol (e.g. `memoryview(data)`, `bytes(data[:10])`, `re.search(pattern, data)`)
+    and the methods of `mmap.mmap` (e.g. `data.find(b"x")`, `data.readline()`).
+    Views taken from it must be released before the function returns; otherwise
+    the memory is unmapped only when the last view is garbage collected."""
+
+    path: str
+    """The path of the file, as given in the command line."""
+
+    def __post_init__(self):
+        self.path = os.fspath(self.path)
+        try:
+            with open(self.path, "rb"):
+                pass
+        except OSError as e:
+            message = gettext("can't open '%(filename)s': %(error)s")
+            raise ArgumentTypeError(message % {"filename": self.path, "error": e})
+        self._file: BinaryIO | None = None
+        self._mmap: Any = None
+
+    @property
+    def closed(self) -> bool:
+        """Whether the file is not mapped (not accessed yet, or already closed)."""
+        return self._mmap is None
+
+    def close(self) -> None:
+        """Unmap the file. It is mapped again on the next access to its contents."""
+        mapping, file, self._mmap, self._file = self._mmap, self._file, None, None
+        if file is not None:
+            file.close()
+        if mapping is not None and not isinstance(mapping, bytes):
+            try:
+                mapping.close()
+            except BufferError:
+                pass  # views are still exported: unmapped when the last one is garbage collected
+
+    def _open(self) -> Any:
+        if self._mmap is None:
+            import mmap
+
+            self._file = open(self.path, "rb")
+            if os.fstat(self._file.fileno()).st_size == 0:
+                self._mmap = b""  # empty files cannot be mapped
+            else:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._open(), name)
+
+    def __buffer__(self, flags: int) -> memoryview:
+        return memoryview(self._open())
+
+    def __len__(self) -> int:
+        return len(self._open())
+
+    def __getitem__(self, index: int | slice) -> Any:
+        return self._open()[index]
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"path": self.path, "_file": None, "_mmap": None}
+
+
+@dataclass
+class CompressedFile:
+    """A streaming reader of a file that may be compressed, to annotate parameters receiving file inputs.
+
+    When used as the type of a parameter (e.g. `log: clig.CompressedFile`), the path
+    given in the command line (or `-` for the standard input) is checked while parsing,
+    but the file is opened only on the first access to its contents, and it is closed
+    right after the function returns. The compression (`gzip`, `bz2` or `xz`) is detected
+    by the first bytes of the file, not by its extension, and the contents are
+    decompressed while they are read (other files are read as they are). The object has
+    the methods of a buffered binary file (e.g. `log.read(n)`, `log.readline()`) and
+    iterates over lines. To set the options, give a factory as the type of the argument,
+    e.g. `Arg[CompressedFile, data(type=lambda path: CompressedFile(path, encoding="utf-8"))]`."""
+
+    path: str
+    """The path of the file, as given in the command line (`-` for the standard input)."""
+
+    _: KW_ONLY
+
+    buffer_size: int = 65536
+    """The size (in bytes) of the buffer of the file and of the decompressed contents."""
+
+    encoding: str | None = None
+    """When given, the contents are decoded and read as text (lines are `str` instead of `bytes`)."""
+
+    def __post_init__(self):
+        self.path = os.fspath(self.path)
+        if self.path != "-":
+            try:
+                with open(self.path, "rb"):
+                    pass
+            except OSError as e:
+                message = gettext("can't open '%(filename)s': %(error)s")
+                raise ArgumentTypeError(message % {"filename": self.path, "error": e})
+        self._files: list[Any] = []
+        self._reader: Any = None
+        self._compression: str | None = None
+
+    @property
+    def closed(self) -> bool:
+        """Whether the file is not open (not accessed yet, or already closed)."""
+        return self._reader is None
+
+    @property
+    def compression(self) -> str | None:
+        """The compression detected in the file (`"gzip"`, `"bz2"` or `"xz"`), or `None` if not compressed.
+        Accessing it opens the file."""
+        self._open()
+        return self._compression
+
+    def close(self) -> None:
+        """Close the file. It is opened again, from the start, on the next access to its contents."""
+        files, self._files, self._reader = self._files, [], None
+        for file in reversed(files):
+            if self.path == "-" and self._compression is None:
+                file.detach()  # the text reader of the standard input, that is kept open
+            else:
+                file.close()
+
+    def _open(self) -> Any:
+        if self._reader is None:
+            import io
+
+            if self.path == "-":
+                raw = sys.stdin.buffer
+            else:
+                raw = open(self.path, "rb", buffering=self.buffer_size)
+                self._files.append(raw)
+            self._compression = None
+            if hasattr(raw, "peek"):  # otherwise, the contents are read as they are
+                self._compression = _get_compression(raw.peek(len(_XZ_MAGIC))[: len(_XZ_MAGIC)])
+            reader = raw
+            if self._compression is not None:
+                reader = io.BufferedReader(_open_decompressor(self._compression, raw), self.buffer_size)
+                self._files.append(reader)
+            if self.encoding is not None:
+                reader = io.TextIOWrapper(reader, encoding=self.encoding)
+                self._files.append(reader)
+            self._reader = reader
+        return self._reader
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._open(), name)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._open())
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {**vars(self), "_files": [], "_reader": None}
+
+
 @dataclass
 class ArgumentGroup:
     """Wraps `argparse`'s argument groups. Pass an `ArgumentGroup` instance to `clig.data(group=...)` to
@@ -2288,6 +4156,16 @@ class ArgumentMetaData:
     `helpmodifier` settings. `None` falls back to the command-level modifiers.
     """
 
+    parallel: bool = False
+    """Whether to call the function once for each item of this argument (a list,
+    or `*args`), in parallel, instead of once with the whole list.
+    """
+
+    delimiter: str = "\n"
+    """The delimiter of the items read by an `Iterable[T]` (or `Iterator[T]`)
+    argument. Defaults to a new line; use `"\\0"` for NUL-delimited items.
+    """
+
     dictionary: KeywordArguments = field(default_factory=KeywordArguments)
     """Additional keyword arguments forwarded verbatim to argparse's
     `add_argument()` (e.g. `action`, `nargs`, `const`, `choices`, `required`,
@@ -2325,6 +4203,8 @@ def _get_pkg_version(func: Callable[..., Any], return_pkg_name: bool = False) ->
         The version information.
         If `return_pkg_name` is `True`, returns a tuple: `pkg_name`, `pkg_vesion` and `check_distributions`.
     """
+    from importlib.metadata import PackageNotFoundError, version as pkg_metadata_version
+
     pkg_version: str = "0.0.0"
     check_distributions: bool = True
 
@@ -2344,11 +4224,10 @@ def _get_pkg_version(func: Callable[..., Any], return_pkg_name: bool = False) ->
             pass
 
     if check_distributions:
-        module_name = module_name.split(".")[0]
-        for dist in pkg_distributions():
-            if any(file.parts[0] == module_name for file in (dist.files or [])):
-                pkg_name, pkg_version = dist.name, dist.version
-                break
+        distributions = _get_packages_distributions().get(module_name.split(".")[0])
+        if distributions:
+            pkg_name = distributions[0]
+            pkg_version = pkg_metadata_version(pkg_name)
 
     if return_pkg_name and pkg_name is not None:
         return pkg_name, pkg_version, check_distributions
@@ -2356,6 +4235,788 @@ def _get_pkg_version(func: Callable[..., Any], return_pkg_name: bool = False) ->
     return pkg_version
 
 
+@lru_cache(maxsize=None)
+def _get_packages_distributions() -> Mapping[str, list[str]]:
+    """The mapping of top-level modules to the names of the distributions that provide them, built only once
+    per process."""
+    from importlib.metadata import packages_distributions
+
+    return packages_distributions()
+
+
+def _get_import_path_name(import_path: str) -> str:
+    """Returns the default command name for an import string `"package.module:function"`"""
+    return import_path.rpartition(":")[2].rpartition(".")[2].replace("_", "-")
+
+
+def _import_from_path(import_path: str) -> Callable[..., Any]:
+    """Imports the object referred by an import string `"package.module:function"`"""
+    module_name, _, qualname = import_path.partition(":")
+    if not module_name or not qualname:
+        raise ValueError(
+            f"\n\n\nInvalid import string '{import_path}'. Use the form `'package.module:function'`.\n\n"
+        )
+    obj: Any = import_module(module_name)
+    for attribute in qualname.split("."):
+        obj = getattr(obj, attribute)
+    return obj
+
+
+_RECORDS_READ_SIZE = 65536
+"""Number of characters read at a time from files of records not delimited by lines (see `_get_records`)"""
+
+
+_DAEMON_BUFFER_SIZE = 65536
+"""Number of bytes received at a time by `Command.serve`"""
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Removes the socket file left by a server that is no longer running (see `Command.serve`)."""
+    import socket
+    import stat
+
+    if not os.path.exists(path) or not stat.S_ISSOCK(os.stat(path).st_mode):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return
+    raise OSError(f"\n\n\nA server is already listening on the socket '{path}'.\n\n")
+
+
+def _reap_children() -> None:
+    """Waits for the forked processes of `Command.serve` that have already finished."""
+    try:
+        while os.waitpid(-1, os.WNOHANG)[0]:
+            pass
+    except ChildProcessError:
+        pass
+
+
+def _get_records(file: TextIO, delimiter: str) -> Iterator[str]:
+    """Yields the records of a file (a batch, see `Command.batch`, or the items of an `Iterable` argument) one
+    at a time, without reading it whole. Records are lines when `delimiter` is `"\\n"`, otherwise they are
+    split by `delimiter`."""
+    if delimiter == "\n":
+        for line in file:
+            yield line.rstrip("\r\n")
+        return
+    pending = ""
+    while chunk := file.read(_RECORDS_READ_SIZE):
+        *records, pending = (pending + chunk).split(delimiter)
+        yield from records
+    if pending:
+        yield pending
+
+
+def _close_argument_values(values: Iterable[Any]) -> None:
+    """Closes the argument values (or the items of list and tuple values) that `clig` opened lazily."""
+    for value in values:
+        if isinstance(value, (list, tuple)):
+            _close_argument_values(value)
+        elif isinstance(value, (MappedFile, CompressedFile)):
+            value.close()
+
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_BZ2_MAGIC = b"BZh"
+_XZ_MAGIC = b"\xfd7zXZ\x00"
+
+
+def _get_compression(header: bytes) -> str | None:
+    """The compression of a file (see `CompressedFile`) from its first bytes, or `None` if not compressed."""
+    for compression, magic in [("gzip", _GZIP_MAGIC), ("bz2", _BZ2_MAGIC), ("xz", _XZ_MAGIC)]:
+        if header.startswith(magic):
+            return compression
+    return None
+
+
+def _open_decompressor(compression: str, file: Any) -> Any:
+    """Opens a reader of the decompressed contents of a binary file (see `CompressedFile`)."""
+    if compression == "gzip":
+        import gzip
+
+        return gzip.GzipFile(fileobj=file, mode="rb")
+    if compression == "bz2":
+        import bz2
+
+        return bz2.BZ2File(file, mode="rb")
+    import lzma
+
+    return lzma.LZMAFile(file, mode="rb")
+
+
+_RESPONSE_FILES_EXPANDED: ContextVar[bool] = ContextVar("clig_response_files_expanded", default=False)
+"""Whether the response files of the command line being parsed are already expanded"""
+
+
+def _get_response_file_arguments(path: str) -> list[tuple[str, bool]]:
+    """The arguments in a response file (see `Command.response_files`), with whether each one is quoted.
+    Cached by path, until the file is modified."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return _read_response_file(path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=_RESPONSE_FILES_CACHE_SIZE)
+def _read_response_file(path: str, mtime_ns: int, size: int) -> list[tuple[str, bool]]:
+    """The arguments in a response file, cached by its absolute path, modification time and size (see
+    `_get_response_file_arguments`)."""
+    encoding, errors = sys.getfilesystemencoding(), sys.getfilesystemencodeerrors()
+    with open(path, encoding=encoding, errors=errors) as file:
+        return list(_get_response_file_tokens(file))
+
+
+def _get_response_file_tokens(file: TextIO) -> Iterator[tuple[str, bool]]:
+    """Yields the arguments of a response file one at a time, split as in a shell (with quotes and `#`
+    comments), without reading it whole. Each one comes with whether it starts with a quoted or escaped
+    character (e.g. `'@name'`), as such an argument is never read as a response file."""
+    import shlex
+
+    reader = _TokenStartReader(file)
+    lexer = shlex.shlex(reader, posix=True)  # type: ignore
+    lexer.whitespace_split = True
+    for token in lexer:
+        yield token, reader.start is not None and reader.start in lexer.quotes + lexer.escape
+        reader.start = None
+
+
+def _is_response_file_reference(value: Any, prefix_chars: str | None) -> bool:
+    """Whether the value is a response file given with a doubled prefix (e.g. `@@items.txt`)."""
+    if not prefix_chars or not isinstance(value, str) or len(value) < 3:
+        return False
+    return value[0] in prefix_chars and value[1] == value[0]
+
+
+def _parse_known_args_natively(
+    parser: ArgumentParser, arg_strings: list[str], namespace: Namespace
+) -> tuple[Namespace, list[str]] | None:
+    """Parse the arguments as `ArgumentParser._parse_known_args` does, taking the actions planned by
+    `_get_native_parse_plan` (see `Command.native_parsing`). Returns `None`, with nothing done, when the
+    arguments must be parsed by `argparse`."""
+    plan = _get_native_parse_plan(parser, arg_strings)
+    if plan is None:
+        return None
+    seen: set[Action] = set()
+    for action, strings, option_string in plan:
+        seen.add(action)
+        values = parser._get_values(action, strings)
+        if values is not SUPPRESS:
+            action(parser, namespace, values, option_string)
+    required: list[str] = []
+    for action in parser._actions:
+        if action in seen:
+            continue
+        if action.required:
+            required.append(_get_action_name(action) or "")
+        elif (
+            isinstance(action.default, str)
+            and hasattr(namespace, action.dest)
+            and action.default is getattr(namespace, action.dest)
+        ):
+            setattr(namespace, action.dest, parser._get_value(action, action.default))
+    if required:
+        parser.error(gettext("the following arguments are required: %s") % ", ".join(required))
+    return namespace, []
+
+
+def _get_native_parse_plan(
+    parser: ArgumentParser, arg_strings: list[str]
+) -> list[tuple[Action, list[str], str | None]] | None:
+    """The actions `argparse` takes for the arguments, in order, with their argument strings and option
+    string, found in one linear pass. Returns `None` when the parser or the arguments are out of the subset
+    handled natively, or when `argparse` would report an error or leave extra arguments."""
+    if parser._mutually_exclusive_groups:
+        return None
+    positionals: list[Action] = []
+    for action in parser._actions:
+        nargs = action.nargs
+        if getattr(action, "deprecated", False):  # warned by `argparse`, in later versions of Python
+            return None
+        if action.option_strings:
+            if not (nargs in [None, OPTIONAL, ZERO_OR_MORE, ONE_OR_MORE] or isinstance(nargs, int)):
+                return None
+        elif nargs is None or nargs == PARSER or (isinstance(nargs, int) and nargs > 0):
+            positionals.append(action)
+        else:
+            return None
+
+    # the option of each argument, as found by `argparse` before taking any action (`None` for values)
+    options: list[tuple[Action | None, str, str | None] | None] = []
+    for arg_string in arg_strings:
+        if not arg_string or arg_string[0] not in parser.prefix_chars:
+            options.append(None)
+        elif arg_string in parser._option_string_actions:
+            options.append((parser._option_string_actions[arg_string], arg_string, None))
+        elif arg_string == "--":
+            return None
+        else:
+            option = parser._parse_optional(arg_string)
+            if isinstance(option, list):  # all the matches, in later versions of Python
+                if len(option) != 1:
+                    return None
+                action, option_string, _, explicit_arg = option[0]
+                option = (action, option_string, explicit_arg)
+            options.append(option)
+
+    plan: list[tuple[Action, list[str], str | None]] = []
+    index, count = 0, len(arg_strings)
+    while index < count:
+        stop = index + 1 if options[index] else index
+        while stop < count and options[stop] is None:
+            stop += 1
+        option = options[index]
+        if option is None:  # values for the next positionals
+            while index < stop and positionals:
+                action = positionals.pop(0)
+                if action.nargs == PARSER:  # the rest of the arguments go to the subcommand
+                    plan.append((action, arg_strings[index:], None))
+                    index = stop = count
+                    break
+                nargs = 1 if action.nargs is None else action.nargs
+                if stop - index < nargs:
+                    return None
+                plan.append((action, arg_strings[index : index + nargs], None))
+                index += nargs
+            if index < stop:
+                return None
+            continue
+        action, option_string, explicit_arg = option
+        if action is None:
+            return None
+        if explicit_arg is not None:
+            if action.nargs not in [None, OPTIONAL, ZERO_OR_MORE, ONE_OR_MORE, 1]:
+                return None
+            plan.append((action, [explicit_arg], option_string))
+            index += 1
+            continue
+        available = stop - index - 1
+        if action.nargs is None:
+            nargs = 1
+        elif action.nargs == OPTIONAL:
+            nargs = min(available, 1)
+        elif action.nargs == ONE_OR_MORE:
+            nargs = available or 1
+        elif action.nargs == ZERO_OR_MORE:
+            nargs = available
+        else:
+            nargs = action.nargs
+        if nargs > available:
+            return None
+        plan.append((action, arg_strings[index + 1 : index + 1 + nargs], option_string))
+        index += 1 + nargs
+    return plan
+
+
+_COMPLETION_INDEX_FORMAT = 1
+"""Version of the format of the files written for `Command.completion_index`"""
+
+
+def _load_completion_index(path: str) -> dict[str, Any] | None:
+    """The completion index saved in the file, or `None` if it is missing, invalid or outdated."""
+    import json
+
+    try:
+        with open(path, encoding="utf-8") as file:
+            index = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(index, dict) or index.get("format") != _COMPLETION_INDEX_FORMAT:
+        return None
+    if any(_get_source_stamp(source) != tuple(stamp) for source, stamp in index["sources"].items()):
+        return None
+    return index
+
+
+def _save_completion_index(path: str, index: dict[str, Any]) -> None:
+    import json
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(index, file, separators=(",", ":"))
+        os.replace(temporary, path)
+    except OSError:
+        return
+
+
+def _add_completion_source(sources: dict[str, tuple[int, int]], module: Any) -> None:
+    source = getattr(module, "__file__", None)
+    stamp = _get_source_stamp(source) if source else None
+    if source and stamp is not None:
+        sources[source] = stamp
+
+
+def _get_completions(node: dict[str, Any], words: list[str]) -> list[str]:
+    """The completions of the last word of a command line, walking the completion index with the previous
+    words: subcommands, flags, or the choices of the option or positional argument taking the last word."""
+    position = 0  # the position of the next positional argument of the current command
+    choices: list[str] = []  # the choices of the values of the last option
+    pending: int = 0  # the number of values still taken by the last option (`-1`: any number)
+    for word in words[:-1]:
+        is_option = word[:1] != "" and word[0] in node["prefix_chars"] and word != "-"
+        if pending and not is_option:
+            if pending > 0:
+                pending -= 1
+            continue
+        pending = 0
+        if is_option:
+            flag, separator, _ = word.partition("=")
+            if flag in node["options"] and not separator:
+                choices, nargs = node["options"][flag]
+                pending = _get_completion_nargs_count(nargs)
+            continue
+        name = node["aliases"].get(word, word)
+        if name in node["subcommands"] and _get_completion_slot(node["positionals"], position)[1]:
+            node, position = node["subcommands"][name], 0
+            continue
+        position += 1
+    word = words[-1]
+    if word[:1] != "" and word[0] in node["prefix_chars"]:
+        flag, separator, _ = word.partition("=")
+        if separator:
+            candidates = [f"{flag}={choice}" for choice in node["options"].get(flag, [[]])[0]]
+        else:
+            candidates = list(node["options"])
+    elif pending:
+        candidates = choices
+    else:
+        candidates, subcommands = _get_completion_slot(node["positionals"], position)
+        if subcommands:
+            candidates = candidates + list(node["subcommands"]) + list(node["aliases"])
+    return [candidate for candidate in candidates if candidate.startswith(word)]
+
+
+def _get_completion_nargs_count(nargs: Any) -> int:
+    """The number of values taken by an option, as in `_get_completions`"""
+    if nargs is None or nargs == "?":
+        return 1
+    if isinstance(nargs, int):
+        return nargs
+    return -1
+
+
+def _get_completion_slot(positionals: list[tuple[list[str], Any]], position: int) -> tuple[list[str], bool]:
+    """The choices of the positional argument taking the word at `position`, and whether a subcommand can
+    be given there (i.e. all required positional arguments are given)."""
+    for choices, nargs in positionals:
+        count = _get_completion_nargs_count(nargs)
+        if count < 0:
+            return choices, True
+        if position < count:
+            return choices, nargs == "?"
+        position -= count
+    return [], True
+
+
+def _get_completion_paths(node: dict[str, Any], path: str = "") -> Iterator[tuple[str, dict[str, Any]]]:
+    """Yields each command of the completion index (from this node down), with the names of its subcommand
+    path joined by spaces"""
+    yield path, node
+    for name, subnode in node["subcommands"].items():
+        yield from _get_completion_paths(subnode, f"{path} {name}".lstrip())
+
+
+def _get_completion_words(node: dict[str, Any]) -> list[str]:
+    """The words completed in place of a positional argument of a command in the completion scripts: the
+    choices of all its positional arguments and the names and aliases of its subcommands"""
+    words = [choice for choices, _ in node["positionals"] for choice in choices]
+    words += list(node["subcommands"]) + list(node["aliases"])
+    return list(dict.fromkeys(words))
+
+
+def _get_completion_script_walk(node: dict[str, Any]) -> tuple[dict[str, list[str]], list[str]]:
+    """The patterns `"path:word"` of the words changing the command path in the completion scripts, by the
+    new path, and of the options taking a value (whose value must be skipped)"""
+    transitions: dict[str, list[str]] = {}
+    skips: list[str] = []
+    for path, cmdnode in _get_completion_paths(node):
+        for name in cmdnode["subcommands"]:
+            transitions[f"{path} {name}".lstrip()] = [f"{path}:{name}"]
+        for alias, name in cmdnode["aliases"].items():
+            transitions[f"{path} {name}".lstrip()].append(f"{path}:{alias}")
+        for flag, (_, nargs) in cmdnode["options"].items():
+            if _get_completion_nargs_count(nargs) != 0:
+                skips.append(f"{path}:{flag}")
+    return transitions, skips
+
+
+def _get_posix_completion_function(
+    name: str, node: dict[str, Any], words: str, index: str, first: int
+) -> str:
+    """The completion function of bash and zsh, filling the array `candidates` with the completions of the
+    word at `index` of the array `words` (the command line, with the first argument at `first`)"""
+    import shlex
+
+    def quote(values: Iterable[str]) -> str:
+        return " ".join(shlex.quote(value) for value in values)
+
+    transitions, skips = _get_completion_script_walk(node)
+    lines = [
+        f"{name}() {{",
+        f'    local command_path="" skip="" word="" current="${{{words}[{index}]}}" prefixes="" i',
+        "    local -a candidates=() flags=()",
+        f"    for ((i = {first}; i < {index}; i++)); do",
+        f'        word="${{{words}[i]}}"',
+        "        if [[ -n $skip ]]; then",
+        '            skip=""',
+        "            continue",
+        "        fi",
+        '        case "$command_path:$word" in',
+    ]
+    for path, patterns in transitions.items():
+        case = "|".join(map(shlex.quote, patterns))
+        lines.append(f"            {case}) command_path={shlex.quote(path)} ;;")
+    if skips:
+        lines.append(f"            {'|'.join(map(shlex.quote, skips))}) skip=1 ;;")
+    lines += [
+        "        esac",
+        "    done",
+        "    if [[ -n $skip ]]; then",
+        f'        case "$command_path:${{{words}[{index} - 1]}}" in',
+    ]
+    for path, cmdnode in _get_completion_paths(node):
+        for flag, (choices, nargs) in cmdnode["options"].items():
+            if choices and _get_completion_nargs_count(nargs) != 0:
+                pattern = shlex.quote(f"{path}:{flag}")
+                lines.append(f"            {pattern}) candidates=({quote(choices)}) ;;")
+    lines += [
+        "        esac",
+        "    else",
+        '        case "$command_path" in',
+    ]
+    for path, cmdnode in _get_completion_paths(node):
+        lines.append(
+            f"            {shlex.quote(path)}) prefixes={shlex.quote(cmdnode['prefix_chars'])} "
+            f"flags=({quote(cmdnode['options'])}) candidates=({quote(_get_completion_words(cmdnode))}) ;;"
+        )
+    lines += [
+        "        esac",
+        '        if [[ -n $current && $prefixes == *"${current:0:1}"* ]]; then',
+        '            candidates=("${flags[@]}")',
+        "        fi",
+        "    fi",
+    ]
+    return "\n".join(lines)
+
+
+def _get_bash_completion_script(prog: str, node: dict[str, Any]) -> str:
+    import shlex
+
+    name = f"_{re.sub(r'\W', '_', prog)}_clig_complete"
+    function = _get_posix_completion_function(name, node, "COMP_WORDS", "COMP_CWORD", 1)
+    return f"""\
+# bash completion of `{prog}`, generated by clig. Do not edit.
+
+{function}
+    COMPREPLY=()
+    local candidate
+    for candidate in "${{candidates[@]}}"; do
+        if [[ $candidate == "$current"* ]]; then
+            COMPREPLY+=("$candidate")
+        fi
+    done
+}}
+
+complete -o default -F {name} {shlex.quote(prog)}
+"""
+
+
+def _get_zsh_completion_script(prog: str, node: dict[str, Any]) -> str:
+    import shlex
+
+    name = f"_{re.sub(r'\W', '_', prog)}_clig_complete"
+    function = _get_posix_completion_function(name, node, "words", "CURRENT", 2)
+    return f"""\
+#compdef {prog}
+# zsh completion of `{prog}`, generated by clig. Do not edit.
+
+{function}
+    if (( ${{#candidates}} )); then
+        compadd -- "${{candidates[@]}}"
+    else
+        _files
+    fi
+}}
+
+if [[ $zsh_eval_context[-1] == loadautofunc ]]; then
+    {name} "$@"
+else
+    compdef {name} {shlex.quote(prog)}
+fi
+"""
+
+
+def _get_fish_completion_script(prog: str, node: dict[str, Any]) -> str:
+    import shlex
+
+    def quote(values: Iterable[str]) -> str:
+        return shlex.quote(" ".join(shlex.quote(value) for value in values))
+
+    name = f"__{re.sub(r'\W', '_', prog)}_clig_at"
+    transitions, skips = _get_completion_script_walk(node)
+    lines = [
+        f"# fish completion of `{prog}`, generated by clig. Do not edit.",
+        "",
+        f"function {name}",
+        '    set -l command_path ""',
+        "    set -l skip 0",
+        "    for word in (commandline -opc)[2..-1]",
+        "        if test $skip = 1",
+        "            set skip 0",
+        "            continue",
+        "        end",
+        '        switch "$command_path:$word"',
+    ]
+    for path, patterns in transitions.items():
+        lines.append(f"            case {' '.join(map(shlex.quote, patterns))}")
+        lines.append(f"                set command_path {shlex.quote(path)}")
+    if skips:
+        lines += [f"            case {' '.join(map(shlex.quote, skips))}", "                set skip 1"]
+    lines += [
+        "        end",
+        "    end",
+        '    test "$command_path" = "$argv[1]"',
+        "end",
+        "",
+    ]
+    for path, cmdnode in _get_completion_paths(node):
+        complete = f'complete -c {shlex.quote(prog)} -n "{name} {shlex.quote(path)}"'
+        words = _get_completion_words(cmdnode)
+        for flag, (choices, nargs) in cmdnode["options"].items():
+            if flag[:1] != "-":
+                words.append(flag)
+                continue
+            if flag[:2] == "--":
+                option = f"-l {flag[2:]}"
+            else:
+                option = f"-s {flag[1:]}" if len(flag) == 2 else f"-o {flag[1:]}"
+            if _get_completion_nargs_count(nargs) == 0:
+                lines.append(f"{complete} {option}")
+            elif choices:
+                lines.append(f"{complete} {option} -x -a {quote(choices)}")
+            else:
+                lines.append(f"{complete} {option} -r")
+        if words:
+            lines.append(f"{complete} -a {quote(words)}")
+    return "\n".join(lines) + "\n"
+
+
+_COMPLETION_SCRIPT_GENERATORS: dict[str, Callable[[str, dict[str, Any]], str]] = {
+    "bash": _get_bash_completion_script,
+    "zsh": _get_zsh_completion_script,
+    "fish": _get_fish_completion_script,
+}
+"""The generators of the completion scripts (see `Command.completion_script`), by shell"""
+
+
+_FROZEN_LINE_LENGTH = 110
+"""Maximum length of the lines with calls in a frozen module, above which the arguments are split in lines"""
+
+
+def _write_if_changed(path: str | PathLike[str], text: str) -> None:
+    """Write the text to the file, unless it already has this content (keeping its modification time)."""
+    try:
+        with open(path, encoding="utf-8") as file:
+            if file.read() == text:
+                return
+    except OSError:
+        pass
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text)
+
+
+def _get_freeze_error(cmd: Command) -> str | None:
+    """The reason why the command cannot be frozen (see `Command.freeze`), if any."""
+    if cmd.batch:
+        return "it has the `batch` option"
+    for argdata in cmd.argument_data:
+        if argdata.group is not None:
+            return f"the argument '{argdata.name.strip()}' is in an argument group"
+        if argdata.parallel:
+            return f"the argument '{argdata.name.strip()}' is `parallel`"
+        if argdata.kind in [Kind.VAR_POSITIONAL, Kind.VAR_KEYWORD]:
+            stars = "*" if argdata.kind is Kind.VAR_POSITIONAL else "**"
+            return f"the function takes `{stars}{argdata.name}`"
+        if _is_context_annotation(argdata.typeannotation):
+            return f"the parameter '{argdata.name.strip()}' is a `Context`"
+    return None
+
+
+def _get_frozen_signature(function: Callable[..., Any]) -> tuple[str, str]:
+    """The signature of the function and a digest of its docstring, compared by `_check_frozen`."""
+    import hashlib
+
+    docstring = _normalize_docstring(function.__doc__)
+    return str(inspect.signature(function)), hashlib.sha256(docstring.encode()).hexdigest()[:16]
+
+
+def _get_frozen_modules(objects: Iterable[Any]) -> dict[str, str]:
+    """The digests of the sources of the modules defining the annotations, converters and defaults of the
+    arguments of a function (see `_get_source_modules`), compared by `_check_frozen`. The modules of `clig`
+    (whose version is compared instead) and of the standard library are left out."""
+    package = __name__.partition(".")[0]
+    modules: dict[str, str] = {}
+    for name in _get_source_modules(None, objects):
+        top = name.partition(".")[0]
+        if top == package or top in sys.stdlib_module_names:
+            continue
+        digest = _get_module_digest(name)
+        if digest is not None:
+            modules[name] = digest
+    return modules
+
+
+def _get_module_digest(name: str) -> str | None:
+    """A digest of the source file of the module, or `None` if it cannot be imported or has no file."""
+    import hashlib
+
+    try:
+        with open(getattr(import_module(name), "__file__", None) or "", "rb") as file:
+            return hashlib.sha256(file.read()).hexdigest()[:16]
+    except (ImportError, OSError):
+        return None
+
+
+def _get_clig_version() -> str:
+    """The version of `clig`, written in the frozen modules (see `Command.freeze`)."""
+    from .__about__ import __version__
+
+    return __version__
+
+
+def _check_frozen(signatures: dict[str, tuple[str, str, dict[str, str]]], version: str) -> list[str]:
+    """The import strings of the functions of a frozen module whose signature or docstring changed since it
+    was generated, whose annotations are defined in a module whose source changed, or which cannot be
+    imported anymore. All of them when the module was generated by another version of `clig` (see
+    `Command.freeze`)."""
+    if version != _get_clig_version():
+        return list(signatures)
+    changed: list[str] = []
+    for import_path, (signature, docstring, modules) in signatures.items():
+        try:
+            function = _import_from_path(import_path)
+        except (ImportError, AttributeError):
+            changed.append(import_path)
+            continue
+        if _get_frozen_signature(function) != (signature, docstring) or any(
+            _get_module_digest(name) != digest for name, digest in modules.items()
+        ):
+            changed.append(import_path)
+    return changed
+
+
+def _run_frozen(parser: ArgumentParser, command: _FrozenCommand, args: Sequence[str] | None = None) -> Any:
+    """Parse the arguments with the parser of a frozen module and invoke the functions of the selected
+    commands in order, returning the result of the last one (see `Command.freeze`)."""
+    namespace = parser.parse_args(args)
+    runner: Runner | None = None
+    result = None
+    cmd: _FrozenCommand | None = command
+    try:
+        while cmd is not None:
+            for name, converter in cmd.conversion_plan:
+                setattr(namespace, name, converter(getattr(namespace, name)))
+            result = None
+            if cmd.function is not None:
+                positional, keywords = cmd.binder.bind(namespace, None, [], {})
+                try:
+                    result = _import_from_path(cmd.function)(*positional, **keywords)
+                    if inspect.iscoroutine(result):
+                        if runner is None:
+                            import asyncio
+
+                            runner = asyncio.Runner()
+                        result = runner.run(result)
+                finally:
+                    _close_argument_values([*positional, *keywords.values()])
+            name = getattr(namespace, cmd.subparsers_dest, None) if cmd.subparsers_dest else None
+            cmd = cmd.subcommands.get(name) if name is not None else None
+    finally:
+        if runner is not None:
+            runner.close()
+    return result
+
+
+_SPEC_CACHE_FORMAT = 4
+"""Version of the format of the files written by `_SpecCache`"""
+
+_SPEC_CACHES: dict[str, _SpecCache] = {}
+"""The spec caches already loaded in this process, by absolute path"""
+
+
+def _get_spec_cache(path: str | PathLike[str]) -> _SpecCache:
+    path = os.path.abspath(path)
+    if path not in _SPEC_CACHES:
+        _SPEC_CACHES[path] = _SpecCache.load(path)
+    return _SPEC_CACHES[path]
+
+
+def _get_spec_cache_header() -> tuple[int, int]:
+    return _SPEC_CACHE_FORMAT, sys.hexversion
+
+
+def _get_source_stamp(source: str) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(source)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _get_function_key(func: Callable[..., Any], template: str | None) -> tuple[str, str, str | None] | None:
+    """The key of a function in the spec cache. Functions that cannot be found by name are not cached."""
+    module, qualname = getattr(func, "__module__", None), getattr(func, "__qualname__", None)
+    if not module or not qualname or "<locals>" in qualname or "<lambda>" in qualname:
+        return None
+    return module, qualname, str(template) if template is not None else None
+
+
+def _get_source_modules(func: Callable[..., Any] | None, objects: Iterable[Any]) -> list[str]:
+    """The names of the modules whose sources the specification of a function depends on: the module of the
+    function (if given), first, and the modules defining the given annotations, converters, choices and
+    defaults (e.g. the `Enum` whose members are the choices of an argument), searched in the arguments of
+    generic types and in the items of sequences."""
+    modules: dict[str, None] = {func.__module__: None} if func is not None else {}
+    pending, seen = list(objects), set()
+    while pending:
+        obj = pending.pop()
+        if obj is None or obj is Parameter.empty or isinstance(obj, str) or id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, (list, tuple, set, frozenset)):
+            pending.extend(obj)
+            continue
+        if isinstance(obj, Enum):
+            obj = type(obj)
+        pending.extend(get_args(obj))
+        module = getattr(obj, "__module__", None)
+        if isinstance(module, str):
+            modules.setdefault(module)
+    return list(modules)
+
+
+def _get_argument_objects(argument_data: Iterable[_ArgumentData]) -> list[Any]:
+    """The annotations, defaults and `add_argument()` values (converters, choices...) of the arguments, whose
+    modules are searched by `_get_source_modules`."""
+    return [
+        value
+        for argdata in argument_data
+        for value in [argdata.typeannotation, argdata.default, *argdata.kwargs.values()]
+    ]
+
+
+def _get_spec_repr(value: Any) -> str:
+    """A representation of a setting of `Command` that is stable between runs"""
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_get_spec_repr(item) for item in value) + "]"
+    if callable(value) and hasattr(value, "__qualname__"):
+        return f"{getattr(value, "__module__", "")}.{value.__qualname__}"
+    return repr(value)
+
+
 def _is_context_annotation(annotation: Any) -> bool:
     if isinstance(annotation, type):
         return issubclass(annotation, Context)
@@ -2399,6 +5060,243 @@ def _normalize_docstring(docstring: str | None) -> str:
     return "\n".join(lines)
 
 
+def _match_docstring_template(
+    docstring: str, template: str | None, parameter_number: int
+) -> _DocstringData | None:
+    """Collects docstring data by matching the normalized docstring against the regex compiled from a
+    (custom) template."""
+    compiled = _compile_docstring_template(template, parameter_number)
+    if compiled is None:
+        return None
+    if not compiled.parameter_section_length:
+        docstring = docstring.rstrip() + f"\n{_DOCSTRING_SEPARATOR}"
+    match = compiled.pattern.match(docstring + "\n")
+    if match:
+        matches: tuple[str, ...] = match.groups()
+        place_holders = compiled.place_holders
+        description = matches[place_holders["description"][0]] if place_holders["description"] else None
+        epilog = matches[place_holders["epilog"][0]] if place_holders["epilog"] else None
+        docstring_data = _DocstringData(description=description, epilog=epilog)
+        for i in range(parameter_number):
+            docstring_data.helps[
+                matches[place_holders["parameter_name"][0] + compiled.parameter_section_length * i]
+            ] = _normalize_docstring(
+                matches[
+                    place_holders["parameter_description"][0] + compiled.parameter_section_length * i
+                ].strip()
+            )
+        return docstring_data
+    return None
+
+
+def _parse_builtin_docstring(
+    docstring: str, with_epilog: bool, style: str | None, parameter_number: int
+) -> _DocstringData | None:
+    """Collects docstring data as one of the built-in templates (see `_BUILTIN_DOCSTRING_FORMATS`) would.
+
+    This is a line oriented parser that walks the docstring lines only once, so it runs in linear time even
+    for long docstrings that almost match a template (where the regex of `_match_docstring_template`
+    backtracks heavily). As the regex, it takes the first parameters section (after the description and
+    the epilog) whose entries document all the parameters.
+    """
+    if docstring.startswith(" "):
+        return None
+    if style is None:
+        if parameter_number > 0:
+            return None
+        docstring = docstring.rstrip()
+        if not with_epilog:
+            return _DocstringData(description=docstring, epilog=None)
+        parts = _split_description_and_epilog(docstring)
+        return _DocstringData(*parts) if parts else None
+    lines = docstring.split("\n")
+    header = _DOCSTRING_SECTION_HEADERS[style]
+    for start in _find_docstring_parameters_sections(lines, header):
+        head = "\n".join(lines[: start - 1])
+        description, epilog = head, None
+        if with_epilog:
+            parts = _split_description_and_epilog(head)
+            if parts is None:
+                continue
+            description, epilog = parts
+        helps = _parse_docstring_entries(lines, start + len(header), style, parameter_number)
+        if helps is not None:
+            return _DocstringData(description=description, epilog=epilog, helps=helps)
+    return None
+
+
+def _parse_docstring_entries(
+    lines: list[str], index: int, style: str, parameter_number: int
+) -> dict[str, str] | None:
+    """Parses the parameter entries starting at `lines[index]`. Returns the descriptions of the parameters,
+    or `None` if there are less entries than parameters."""
+    helps: dict[str, str] = {}
+    # Templates with a parameters section always require at least one entry
+    entries_number = max(parameter_number, 1)
+    for number in range(entries_number):
+        entry = _parse_docstring_entry(lines, index, style, last=number == entries_number - 1)
+        if entry is None:
+            return None
+        name, text, index = entry
+        if number < parameter_number:
+            helps[name] = _normalize_docstring(text.strip())
+    return helps
+
+
+def _split_description_and_epilog(text: str) -> tuple[str, str] | None:
+    """Splits the text in the first blank line not followed by an indented line"""
+    start = 0
+    while (index := text.find("\n\n", start)) >= 0:
+        if not text.startswith(" ", index + 2):
+            return text[:index], text[index + 2 :]
+        start = index + 1
+    return None
+
+
+def _find_docstring_parameters_sections(lines: list[str], header: list[str]) -> Iterator[int]:
+    """Yields the indexes of the first lines of the candidate parameters sections, which come after the
+    description and a blank line"""
+    for index in range(2, len(lines)):
+        if lines[index - 1]:
+            continue
+        if header and lines[index] == header[0] and lines[index : index + len(header)] == header:
+            if index + len(header) < len(lines):
+                yield index
+        if not header and lines[index].startswith(":param "):
+            yield index
+
+
+def _parse_docstring_entry_header(line: str, style: str) -> tuple[str, str | None] | None:
+    """Parses the first line of a parameter entry. Returns the parameter name and the beginning of its
+    description (or `None` when the description starts in the next indented line)."""
+    name, text = "", None
+    if style in ["numpy", "numpy_notypes", "clig"]:
+        if style == "numpy":
+            name, sep, kind = line.partition(" : ")
+        elif style == "clig":
+            name, sep, kind = line.removeprefix("- `").partition("` ")
+            sep = sep if line.startswith("- `") else ""
+        else:
+            name, sep, kind = line, line, "-"
+        if not sep or kind.startswith(" "):
+            return None
+    elif style in ["google", "google_notypes"]:
+        if not line.startswith("    ") or line.startswith("     "):
+            return None
+        if style == "google":
+            name, sep, rest = line[4:].partition(" (")
+            kind, sep2, text = rest.partition("): ")
+        else:
+            name, sep, text = line[4:].partition(": ")
+            kind, sep2 = "-", sep
+        if not sep or not sep2 or kind.startswith(" "):
+            return None
+    elif style == "clig_short":
+        name, sep, rest = line.removeprefix("- `").partition("` ")
+        kind, sep2, text = rest.partition(": ")
+        if not line.startswith("- `") or not sep or not sep2 or kind.startswith(" "):
+            return None
+    else:
+        name, sep, text = line.removeprefix(":param ").partition(": ")
+        if not line.startswith(":param ") or not sep:
+            return None
+    if not name or name.startswith(" ") or (text is not None and text.startswith(" ")):
+        return None
+    return name, text
+
+
+def _parse_docstring_entry(
+    lines: list[str], index: int, style: str, last: bool
+) -> tuple[str, str, int] | None:
+    """Parses the parameter entry starting at `lines[index]`. Returns the parameter name, its description
+    and the index of the line after the entry. The description of the `last` entry spans only the following
+    blank or indented lines, as the rest of the docstring (e.g. a "Returns" section) is ignored."""
+    if index >= len(lines):
+        return None
+    header = _parse_docstring_entry_header(lines[index], style)
+    if header is None:
+        return None
+    name, first_line = header
+    index += 1
+    if first_line is None:
+        if index >= len(lines) or not lines[index].startswith("    ") or lines[index].startswith("     "):
+            return None
+        first_line = lines[index][4:]
+        index += 1
+    text = [first_line]
+    if style == "sphinx":
+        while index < len(lines) and not lines[index].startswith(":type "):
+            text.append(lines[index])
+            index += 1
+        if index >= len(lines):
+            return None
+        kind = lines[index].removeprefix(":type ").partition(": ")[2]
+        if not kind or kind.startswith(" "):
+            return None
+        index += 1
+        while index < len(lines) and _is_docstring_entry_continuation(lines[index], style, last):
+            index += 1
+        return name, "\n".join(text), index
+    while index < len(lines) and _is_docstring_entry_continuation(lines[index], style, last):
+        text.append(lines[index])
+        index += 1
+    return name, "\n".join(text), index
+
+
+def _is_docstring_entry_continuation(line: str, style: str, last: bool) -> bool:
+    if last:
+        return not line or line.startswith(" ")
+    return _parse_docstring_entry_header(line, style) is None
+
+
+@lru_cache(maxsize=_DOCSTRING_TEMPLATES_CACHE_SIZE)
+def _compile_docstring_template(
+    template: str | None, parameter_number: int
+) -> _CompiledDocstringTemplate | None:
+    """Builds the regex that matches a docstring written with `template`, repeating the parameter section
+    `parameter_number` times. Returns `None` if the template can not document that number of parameters.
+    The result is cached by (template, parameter number), so each regex is built only once.
+    """
+    # escape for regex match, but not "{" and "}"
+    template = re.escape(_normalize_docstring(template) + "\n").replace(r"\{", "{").replace(r"\}", "}")
+    place_holders: dict[str, list[int]] = {
+        "description": [],
+        "epilog": [],
+        "parameter_name": [],
+        "parameter_type": [],
+        "parameter_description": [],
+    }
+    detected_place_holders: list[str] = re.findall(r"{{.*?}}", template)
+    order_counter = 0
+    for word in detected_place_holders:
+        word = word.removeprefix("{{").removesuffix("}}")
+        if word in place_holders:
+            place_holders[word].append(order_counter)
+            order_counter += 1
+    parameter_section_init_index: int = 0
+    for i, line in enumerate(template.splitlines()):
+        if any([f"{{{{{key}}}}}" in line for key in place_holders if key.startswith("parameter")]):
+            parameter_section_init_index = i
+            break
+    parameter_section_length = sum(
+        [template.count(f"{{{{{key}}}}}") for key in place_holders if key.startswith("parameter")]
+    )
+    if parameter_number > 0 and not parameter_section_length:
+        return None
+    if parameter_section_length:
+        parameter_section = "\n".join(template.splitlines()[parameter_section_init_index:])
+        for _ in range(parameter_number - 1):
+            template += f"{parameter_section}\n"
+    else:
+        template = template.rstrip() + f"\n{re.escape(_DOCSTRING_SEPARATOR)}\n"
+    for place_holder in place_holders:
+        template = template.replace(f"{{{{{place_holder}}}}}", "(?! )(.*?)")
+    template += "(?!\\s)(.*?)"
+    return _CompiledDocstringTemplate(
+        re.compile(template, re.DOTALL), place_holders, parameter_section_length
+    )
+
+
 def _get_argument_data_from_parameter(parameter: Parameter) -> _ArgumentData:
     """Helper function to get data from a `inspect.Parameter` object and generetes a proxy object
     Ref: https://docs.python.org/3/library/inspect.html#inspect.Parameter
@@ -2419,6 +5317,8 @@ def _get_argument_data_from_parameter(parameter: Parameter) -> _ArgumentData:
                     argdata.make_flag = metadata.make_flag
                     argdata.group = metadata.group
                     argdata.helpmodifier = metadata.helpmodifier
+                    argdata.parallel = metadata.parallel
+                    argdata.delimiter = metadata.delimiter
                     argdata.kwargs = metadata.dictionary.copy()
                     break
     if all([parameter.annotation is EMPTY, parameter.default is not EMPTY, parameter.default is not None]):
@@ -2441,7 +5341,7 @@ def _get_data_from_typeannotation(
         types = get_args(annotation)
         if origin in [Union, UnionType]:
             types = [t for t in get_args(annotation) if t is not type(None)]
-            argtype = __create_union_converter(types)
+            argtype = _create_union_converter(types)
             inner_origin = get_origin(types[0])
             if inner_origin is tuple:
                 inner_types = get_args(types[0])
@@ -2459,6 +5359,9 @@ def _get_data_from_typeannotation(
             nargs = "*" if action != "append" else None
             argtype = types[0]
             nargs = "+" if (nargs == "*" and default is EMPTY) else nargs
+        elif origin in [Iterable, Iterator]:
+            nargs = "?"  # the file to read the items from (by default, the standard input)
+            argtype = str
         elif origin is Literal:
             choices = [t.name if isinstance(t, Enum) else t for t in types]
             argtype = None  # create_literal_converter(types)
@@ -2472,7 +5375,154 @@ def _get_data_from_typeannotation(
     return action, nargs, argtype, choices
 
 
-def __create_union_converter(types):
+def _make_invocation_binder(argument_data: list[_ArgumentData]) -> _InvocationBinder:
+    binder = _InvocationBinder(positional=[], keyword=[])
+    positional = True
+    for argdata in argument_data:
+        dest = None if _is_context_annotation(argdata.typeannotation) else argdata.name
+        positional = positional and argdata.kind in [Kind.POSITIONAL_OR_KEYWORD, Kind.POSITIONAL_ONLY]
+        if argdata.parallel and binder.parallel is not None:
+            raise ValueError(
+                f"\n\n\nOnly one argument can be `parallel`. Found '{argdata.name.strip()}' after "
+                f"'{binder.parallel}'.\n\n"
+            )
+        if argdata.parallel:
+            binder.parallel = (
+                "*"
+                if argdata.kind is Kind.VAR_POSITIONAL
+                else len(binder.positional) if positional else argdata.name.strip()
+            )
+        if positional:
+            binder.positional.append(dest)
+        if argdata.kind is Kind.KEYWORD_ONLY:
+            binder.keyword.append((argdata.name.strip(), dest))
+        if argdata.kind is Kind.VAR_POSITIONAL and callable(argdata.typeannotation):
+            binder.varargs_type = argdata.typeannotation
+        if argdata.kind is Kind.VAR_KEYWORD and callable(argdata.typeannotation):
+            binder.varkwargs_type = argdata.typeannotation
+    return binder
+
+
+def _get_argument_converter(
+    argdata: _ArgumentData, response_file_prefix_chars: str | None = None
+) -> Callable[[Any], Any] | None:
+    """Returns the function converting the parsed value of the argument after parsing (to Enum members,
+    from Enum names, to tuple, or to the items of an `Iterable`), or `None` when the parsed value is used as
+    is. The `Iterable` arguments given with a doubled `response_file_prefix_chars` read a response file."""
+    annotation = argdata.typeannotation
+    if get_origin(annotation) in [Union, UnionType]:
+        annotation = [t for t in get_args(annotation) if t is not type(None)][0]
+    steps: list[Callable[[Any], Any]] = []
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        steps.append(annotation.__getitem__)
+    if get_origin(annotation) is Literal:
+        enum_types = list(dict.fromkeys(type(t) for t in get_args(annotation) if isinstance(t, Enum)))
+        if enum_types:
+            steps.append(_create_literal_enum_converter(enum_types))
+    if get_origin(annotation) is tuple or (isinstance(annotation, type) and issubclass(annotation, tuple)):
+        steps.append(_create_tuple_converter(argdata.kwargs.get("default")))
+    if get_origin(argdata.typeannotation) in [Iterable, Iterator]:
+        item_type = (get_args(argdata.typeannotation) or [str])[0]
+        steps.append(
+            _create_stream_converter(
+                item_type, argdata.name.strip(), argdata.delimiter, response_file_prefix_chars
+            )
+        )
+    if not steps:
+        return None
+    if len(steps) == 1:
+        return steps[0]
+    return _create_chained_converter(steps)
+
+
+def _set_recipe[F: Callable[..., Any]](function: F, factory: Callable[..., Any], *args: Any) -> F:
+    """Record the factory (of this module) and the arguments that made the function, so it can be made again
+    by a frozen module (see `Command.freeze`)."""
+    function._clig_recipe = (factory, args)  # type: ignore
+    return function
+
+
+def _create_chained_converter(steps: list[Callable[[Any], Any]]) -> Callable[[Any], Any]:
+    def converter(value: Any) -> Any:
+        for step in steps:
+            value = step(value)
+        return value
+
+    return _set_recipe(converter, _create_chained_converter, steps)
+
+
+def _create_literal_enum_converter(enum_types: list[type[Enum]]) -> Callable[[Any], Any]:
+    def converter(value: Any) -> Any:
+        for enum_type in enum_types:
+            try:
+                value = enum_type[value]
+            except Exception:
+                continue
+        return value
+
+    return _set_recipe(converter, _create_literal_enum_converter, enum_types)
+
+
+def _create_stream_converter(
+    item_type: Any, name: str, delimiter: str, response_file_prefix_chars: str | None = None
+) -> Callable[[Any], Any]:
+    """Returns the function converting the file given to an `Iterable` argument (`None` or `"-"` for the
+    standard input, or a response file with a doubled prefix) into a generator of its items, read lazily and
+    converted as `list[item_type]` would be."""
+    _, _, argtype, choices = _get_data_from_typeannotation(item_type)
+    post_converter = _get_argument_converter(_ArgumentData(name, typeannotation=item_type))
+
+    def convert_item(value: str, number: int) -> Any:
+        try:
+            item: Any = argtype(value) if argtype is not None else value
+        except (TypeError, ValueError) as e:
+            raise ValueError(
+                f"\n\n\nInvalid value {value!r} (item {number}) of the argument '{name}'.\n\n"
+            ) from e
+        if choices is not None and item not in choices:
+            raise ValueError(
+                f"\n\n\nInvalid choice {value!r} (item {number}) of the argument '{name}'. "
+                f"Choose from {', '.join(map(repr, choices))}.\n\n"
+            )
+        return post_converter(item) if post_converter is not None else item
+
+    def read_items(source: str | None) -> Iterator[Any]:
+        response_file = _is_response_file_reference(source, response_file_prefix_chars)
+        if response_file:
+            source = source[2:]  # type: ignore
+        file = sys.stdin if source in [None, "-"] else open(source)  # type: ignore
+        try:
+            if response_file:
+                values = (token for token, _ in _get_response_file_tokens(file))
+            else:
+                values = _get_records(file, delimiter)
+            for number, value in enumerate(values, start=1):
+                yield convert_item(value, number)
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+    def converter(source: Any) -> Any:
+        return read_items(source) if source is None or isinstance(source, str) else source
+
+    return _set_recipe(
+        converter, _create_stream_converter, item_type, name, delimiter, response_file_prefix_chars
+    )
+
+
+def _create_tuple_converter(default: Any) -> Callable[[Any], Any]:
+    def converter(value: Any) -> Any:
+        if default is not EMPTY and default == value:
+            return value
+        try:
+            return tuple(value)
+        except TypeError:
+            return value
+
+    return _set_recipe(converter, _create_tuple_converter, default)
+
+
+def _create_union_converter(types):
 
     try:
         if len(types) == 1 and issubclass(types[0], Enum):
@@ -2497,7 +5547,7 @@ def __create_union_converter(types):
                 continue  # Ignore and try the next type
         raise ValueError("ERROR in conversion")
 
-    return converter
+    return _set_recipe(converter, _create_union_converter, types)
 
 
 ##############################################################################################################
@@ -2568,7 +5618,7 @@ def command(
 
 
 def subcommand(
-    func: Function | None = None,
+    func: Function | str | None = None,
     parent: Command | Callable | str | None = None,
     *args: Any,
     **kwargs: Unpack[CompleteCommandArguments],
@@ -2583,10 +5633,11 @@ def subcommand(
 
     Parameters
     ----------
-    - `func` (`Function = Callable[..., Any] | None`, optional): Defaults to `None`.
-        The function to register as a subcommand. When `None`, the decorator is
-        called with parentheses and `func` is supplied by the outer decorator
-        machinery.
+    - `func` (`Function = Callable[..., Any] | str | None`, optional): Defaults to `None`.
+        The function to register as a subcommand, or its import string
+        `"package.module:function"` (see `Command.new_subcommand`). When `None`, the
+        decorator is called with parentheses and `func` is supplied by the outer
+        decorator machinery.
 
     - `parent` (`Command | Callable | str | None`, optional): Defaults to `None`.
         The command under which this subcommand will be nested. Accepts a
@@ -2636,7 +5687,7 @@ def subcommand(
 
     assert isinstance(parent, Command), "\n\n\nThe `parent` argument must be a `Command`\n\n"
 
-    def wrap(func: Callable):
+    def wrap(func: Callable | str):
         parent.add_subcommand(func, *args, **kwargs)
         return func
 
@@ -2678,6 +5729,8 @@ def data(
     make_flag: bool | None = None,
     group: ArgumentGroup | MutuallyExclusiveGroup | None = None,
     helpmodifier: Callable[[str], str] | None | None = None,
+    parallel: bool = False,
+    delimiter: str = "\n",
     **kwargs: Unpack[KeywordArguments],
 ) -> ArgumentMetaData:
     """Build per-argument metadata to be used inside an `Arg` (i.e. `Annotated`) type hint.
@@ -2710,6 +5763,17 @@ def data(
         the command-level `opthelpmodifier`, `poshelpmodifier`, and `helpmodifier`
         settings. `None` falls back to the command-level modifiers.
 
+    - `parallel` (`bool`, optional): Defaults to `False`.
+        Whether to call the function once for each item of this argument (a list, or `*args`), in parallel,
+        instead of once with the whole list. The parameter receives one item in each call (`*args` receives a
+        tuple with one item), and the list of results is returned. See the `parallel_executor` and
+        `parallel_ordered` options of `Command`.
+
+    - `delimiter` (`str`, optional): Defaults to `"\\n"`.
+        The delimiter of the items of an argument annotated with `Iterable[T]` (or `Iterator[T]`), read lazily
+        from the file given in the command line (or from the standard input, by default or with `-`). Use
+        `"\\0"` for NUL-delimited items.
+
     - `**kwargs` (`KeywordArguments`):
         Any additional keyword arguments accepted by argparse's `add_argument()` method
         (e.g. `action`, `nargs`, `const`, `choices`, `required`, `help`, `metavar`,
@@ -2725,6 +5789,8 @@ def data(
         make_flag=make_flag,
         group=group,
         helpmodifier=helpmodifier,
+        parallel=parallel,
+        delimiter=delimiter,
         dictionary=kwargs,
     )
 
@@ -2769,5 +5835,51 @@ def run[ReturnType](
     return Command(func, **kwargs).run(args)
 
 
+def run_client(socket_path: str | PathLike[str], args: Sequence[str] | None = None) -> int:
+    """Invoke a command served by `Command.serve` and wait for it to finish.
+
+    Sends the argument list, the current working directory, the environment variables and the standard
+    streams of this process to the server listening on `socket_path`. The command reads and writes the
+    streams directly, as if it was run by this process. Only available on Unix.
+
+    Parameters
+    ----------
+    - `socket_path` (`str | PathLike[str]`):
+        The path of the socket file of the server.
+
+    - `args` (`Sequence[str] | None`, optional): Defaults to `None`.
+        The argument list to parse. When `None`, defaults to `sys.argv[1:]`.
+
+    Raises
+    ------
+    `ConnectionError`:
+        If the server closes the connection without sending the exit status.
+
+    Returns
+    -------
+    `int`:
+        The exit status of the invocation, to be passed to `sys.exit()`.
+    """
+    import json
+    import socket
+
+    args = sys.argv[1:] if args is None else list(args)
+    request = json.dumps({"argv": args, "cwd": os.getcwd(), "env": dict(os.environ)}).encode()
+    message = len(request).to_bytes(4) + request
+    sys.stdout.flush()
+    sys.stderr.flush()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(os.fspath(socket_path))
+        sent = socket.send_fds(client, [message], [0, 1, 2])
+        client.sendall(message[sent:])
+        status = b""
+        while len(status) < 4:
+            chunk = client.recv(4 - len(status))
+            if not chunk:
+                raise ConnectionError("\n\n\nThe server closed the connection without an exit status.\n\n")
+            status += chunk
+    return int.from_bytes(status, signed=True)
+
+
 # TODO: Namespace unpack to better object
 # TODO: Helper funcions to use as help modifier/metada modifier
@@ -0,0 +1,306 @@
+"""Startup and dispatch benchmark of `clig`.
+
+Generates synthetic command trees and measures, for each phase of a command line invocation, the time spent
+by `clig`. The results are emitted as JSON, to track performance regressions between releases.
+
+Run with `task bench`, against the installed `clig` (e.g. `pip install -e .`). Run
+`python benchmark.py --help` from the `tests` folder to see the options.
+"""
+
+import json
+import time
+import types
+import platform
+import statistics
+from pathlib import Path
+from argparse import ArgumentParser
+from typing import Any, Callable
+
+import clig
+from clig import clig as _clig  # protected functions
+
+DOCSTRING_NAMES: dict[str, str] = {member.value: member.name for member in clig.DocStr}
+"""The names of the built-in docstring templates (the members of `DocStr`)"""
+
+PARAMETER_TYPES: list[tuple[type, Any]] = [(int, 0), (str, "x"), (float, 0.0), (bool, False)]
+"""The annotation and default value of the generated parameters with defaults, in cycle"""
+
+REQUIRED_PARAMETERS = 2
+"""Number of positional (required) parameters of each generated function"""
+
+PHASES = ["construct", "add_parsers", "parse_args", "post_parse", "run", "argparse", "overhead"]
+
+
+def render_docstring(template: str, name: str, parameters: list[tuple[str, type]]) -> str:
+    """Fill a docstring template with the description, epilog and parameters of a generated function"""
+    lines = [line.rstrip() for line in _clig._normalize_docstring(template).split("\n")]
+    start = next((i for i, line in enumerate(lines) if "{{parameter_name}}" in line), len(lines))
+    head, block = "\n".join(lines[:start]), "\n".join(lines[start:])
+    docstring = head.replace("{{description}}", f"The {name} command.")
+    docstring = docstring.replace("{{epilog}}", f"Epilog of the {name} command.")
+    for parameter_name, parameter_type in parameters if block else []:
+        docstring += "\n" + block.replace("{{parameter_name}}", parameter_name).replace(
+            "{{parameter_type}}", parameter_type.__name__
+        ).replace("{{parameter_description}}", f"The help of {parameter_name}.")
+    return docstring
+
+
+def make_function_factory(parameter_number: int, prefix: str) -> Callable[[str, str], Callable[..., Any]]:
+    """Compile a function with the given number of parameters once, and return a factory of copies of it with
+    other names and docstrings"""
+    parameters: list[str] = []
+    for i in range(parameter_number):
+        if i < REQUIRED_PARAMETERS:
+            parameters.append(f"{prefix}p{i}: {PARAMETER_TYPES[i][0].__name__}")
+        else:
+            kind, default = PARAMETER_TYPES[i % len(PARAMETER_TYPES)]
+            parameters.append(f"{prefix}p{i}: {kind.__name__} = {default!r}")
+    namespace: dict[str, Any] = {}
+    exec(f"def function({', '.join(parameters)}):\n    return None\n", namespace)
+    function = namespace["function"]
+    annotations = [(name, kind) for name, kind in function.__annotations__.items()]
+
+    def factory(name: str, template: str) -> Callable[..., Any]:
+        copy = types.FunctionType(function.__code__, function.__globals__, name, function.__defaults__)
+        copy.__qualname__ = name
+        copy.__annotations__ = dict(function.__annotations__)
+        copy.__doc__ = render_docstring(template, name, annotations)
+        return copy
+
+    return factory
+
+
+def make_functions(parents: list[int | None], parameters: int, template: str) -> list[Callable[..., Any]]:
+    """The functions of the commands. The parameters are prefixed by the depth of the command, as `clig`
+    renames (with spaces) the parameters with the same name of the parent command's"""
+    factories: dict[int, Callable[[str, str], Callable[..., Any]]] = {}
+    functions = []
+    for i, depth in enumerate(get_depths(parents)):
+        if depth not in factories:
+            factories[depth] = make_function_factory(parameters, f"d{depth}_")
+        functions.append(factories[depth](f"command_{i}", template))
+    return functions
+
+
+def get_depths(parents: list[int | None]) -> list[int]:
+    depths: list[int] = []
+    for parent in parents:
+        depths.append(0 if parent is None else depths[parent] + 1)
+    return depths
+
+
+def get_parents(commands: int, shape: str, fanout: int) -> list[int | None]:
+    """The index of the parent of each command: all under the first one (`shallow`) or a tree where each
+    command has `fanout` subcommands (`deep`)"""
+    if shape == "shallow":
+        return [None] + [0] * (commands - 1)
+    return [None] + [(i - 1) // fanout for i in range(1, commands)]
+
+
+def build_tree(functions: list[Callable[..., Any]], parents: list[int | None]) -> list[clig.Command]:
+    cmds: list[clig.Command] = []
+    for function, parent in zip(functions, parents):
+        cmds.append(clig.Command(function) if parent is None else cmds[parent].new_subcommand(function))
+    return cmds
+
+
+def get_path(parents: list[int | None]) -> list[int]:
+    """The indexes of the commands from the root to the last command"""
+    path = [len(parents) - 1]
+    while (parent := parents[path[0]]) is not None:
+        path.insert(0, parent)
+    return path
+
+
+def get_argv(functions: list[Callable[..., Any]], path: list[int]) -> list[str]:
+    """The command line invoking the last command, with all required arguments and one option"""
+    argv: list[str] = []
+    for position, index in enumerate(path):
+        if position > 0:
+            argv.append(functions[index].__name__.replace("_", "-"))
+        parameters = list(functions[index].__annotations__)
+        argv.extend(["1", "a"][: len(parameters)])
+    if len(parameters) > REQUIRED_PARAMETERS:
+        argv.extend([f"--{parameters[REQUIRED_PARAMETERS]}".replace("_", "-"), "2"])
+    return argv
+
+
+def build_argparse(functions: list[Callable[..., Any]], path: list[int]) -> ArgumentParser:
+    """The equivalent hand-written `argparse` parser for the invoked commands"""
+    parser = root = ArgumentParser(prog=functions[path[0]].__name__)
+    for position, index in enumerate(path):
+        function = functions[index]
+        if position > 0:
+            parser = subparsers.add_parser(function.__name__.replace("_", "-"))  # type: ignore
+        parser.set_defaults(function=function)
+        defaults = function.__defaults__ or ()
+        names = list(function.__annotations__)
+        for i, name in enumerate(names):
+            kind = function.__annotations__[name]
+            if i < len(names) - len(defaults):
+                parser.add_argument(name, type=kind)
+            elif kind is bool:
+                parser.add_argument(f"--{name}".replace("_", "-"), action="store_true")
+            else:
+                default = defaults[i - len(names) + len(defaults)]
+                parser.add_argument(f"--{name}".replace("_", "-"), type=kind, default=default)
+        if position < len(path) - 1:
+            subparsers = parser.add_subparsers(dest=f"subcommand_{position}")
+    return root
+
+
+def run_argparse(parser: ArgumentParser, argv: list[str]) -> Any:
+    namespace = vars(parser.parse_args(argv))
+    function = namespace.pop("function")
+    return function(**{name: namespace[name] for name in function.__annotations__})
+
+
+def timed(function: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def measure_scenario(
+    commands: int, shape: str, parameters: int, template: str, repeat: int, fanout: int
+) -> dict[str, Any]:
+    parents = get_parents(commands, shape, fanout)
+    functions = make_functions(parents, parameters, template)
+    path = get_path(parents)
+    argv = get_argv(functions, path)
+    times: dict[str, list[float]] = {phase: [] for phase in PHASES}
+    for _ in range(repeat):
+        _clig._compile_docstring_template.cache_clear()
+        cmds: list[clig.Command] = []
+        times["construct"].append(timed(lambda: cmds.extend(build_tree(functions, parents))))
+        root = cmds[0]
+        times["add_parsers"].append(timed(root._add_parsers))
+        assert root.parser is not None
+        times["parse_args"].append(timed(lambda: root.parser.parse_args(argv)))  # type: ignore
+
+        parse_times: list[float] = []
+        running: list[bool] = []
+        for index in path:
+            parser = cmds[index].parser
+            assert parser is not None
+            for method in ["parse_args", "parse_known_args"]:
+                setattr(parser, method, _timed_method(getattr(parser, method), parse_times, running))
+        run_time = timed(lambda: root.run(argv))
+        times["run"].append(run_time)
+        times["post_parse"].append(run_time - sum(parse_times))
+
+        parser = build_argparse(functions, path)
+        times["argparse"].append(timed(lambda: run_argparse(parser, argv)))
+        times["overhead"].append(run_time - times["argparse"][-1])
+    return {
+        "commands": commands,
+        "shape": shape,
+        "depth": len(path),
+        "parameters": parameters,
+        "docstring": DOCSTRING_NAMES[template],
+        "phases": {
+            phase: {"min": min(values), "mean": statistics.mean(values)} for phase, values in times.items()
+        },
+    }
+
+
+def _timed_method(method: Callable[..., Any], times: list[float], running: list[bool]) -> Callable[..., Any]:
+    """Wrap a parsing method to accumulate its time in `times`, except when called by another parsing method
+    (e.g. `parse_args` calling `parse_known_args` or a parser calling the parser of a subcommand)"""
+
+    def wrapper(*args, **kwargs):
+        if running:
+            return method(*args, **kwargs)
+        running.append(True)
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            times.append(time.perf_counter() - start)
+            running.clear()
+
+    return wrapper
+
+
+def get_clig_version() -> str:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("clig")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def benchmark(
+    commands: list[int] = [1, 50, 500, 5000],
+    shapes: list[str] = ["shallow", "deep"],
+    parameters: list[int] = [1, 20, 200],
+    docstrings: list[str] = list(DOCSTRING_NAMES.values()),
+    repeat: int = 3,
+    fanout: int = 4,
+    max_arguments: int = 100_000,
+    output: str = "-",
+) -> dict[str, Any]:
+    """Measure the time spent by `clig` in each phase of a command line invocation.
+
+    For each combination of the options, generates a synthetic command tree and measures, in seconds, the
+    phases: `construct` (creation of the `Command` objects), `add_parsers`, `parse_args` (of the whole command
+    line by the main parser), `post_parse` (conversions and function calls in `Command.run`), `run` (the whole
+    dispatch), `argparse` (parsing and calling with an equivalent hand-written `argparse` parser) and
+    `overhead` (`run` minus `argparse`). Results are written as JSON.
+
+    Parameters
+    ----------
+    - `commands` (`list[int]`, optional): Defaults to `[1, 50, 500, 5000]`.
+        Number of commands of the trees.
+
+    - `shapes` (`list[str]`, optional): Defaults to `["shallow", "deep"]`.
+        Shapes of the trees: all subcommands under the main command (`shallow`) or each command with
+        `fanout` subcommands (`deep`).
+
+    - `parameters` (`list[int]`, optional): Defaults to `[1, 20, 200]`.
+        Number of parameters of each command.
+
+    - `docstrings` (`list[str]`, optional): Defaults to all names of `DocStr`.
+        Docstring templates used to document the commands.
+
+    - `repeat` (`int`, optional): Defaults to `3`.
+        Number of measures of each scenario.
+
+    - `fanout` (`int`, optional): Defaults to `4`.
+        Number of subcommands of each command in `deep` trees.
+
+    - `max_arguments` (`int`, optional): Defaults to `100_000`.
+        Scenarios with more arguments in total (commands times parameters) are skipped.
+
+    - `output` (`str`, optional): Defaults to `"-"`.
+        The file to write the JSON results. Use `-` for the standard output.
+    """
+    results = []
+    for template in [template for template, name in DOCSTRING_NAMES.items() if name in docstrings]:
+        for shape in shapes:
+            for command_number in commands:
+                for parameter_number in parameters:
+                    if command_number * parameter_number > max_arguments:
+                        continue
+                    results.append(
+                        measure_scenario(command_number, shape, parameter_number, template, repeat, fanout)
+                    )
+    report = {
+        "clig": get_clig_version(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if output == "-":
+        print(text)
+    else:
+        Path(output).write_text(text + "\n")
+    return report
+
+
+if __name__ == "__main__":
+    clig.run(benchmark)
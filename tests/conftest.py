@@ -16,3 +16,18 @@ def reset_singleton():
     yield
     # Clean up the instance after the test completes
     clig.clig._main_command = None
+
+
+def pytest_addoption(parser: pytest.Parser):
+    parser.addoption(
+        "--native-parsing",
+        action="store_true",
+        help="Parse the command lines of all tests with the native engine (see `Command.native_parsing`)",
+    )
+
+
+@pytest.fixture(autouse=True)
+def native_parsing(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch):
+    """Makes all commands use the native parsing engine, with the `--native-parsing` option of pytest."""
+    if request.config.getoption("--native-parsing"):
+        monkeypatch.setattr(clig.clig.Command, "_uses_native_parsing", lambda self: True)
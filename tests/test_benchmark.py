@@ -0,0 +1,51 @@
+import json
+from pathlib import Path
+import benchmark
+from clig import Command
+
+
+def test_benchmark_emits_json_with_all_phases(tmp_path: Path):
+    output = tmp_path / "benchmark.json"
+    report = benchmark.benchmark(
+        commands=[1, 6],
+        parameters=[1, 5],
+        docstrings=["NUMPY_DOCSTRING"],
+        repeat=1,
+        fanout=2,
+        output=str(output),
+    )
+    assert json.loads(output.read_text()) == report
+    assert len(report["results"]) == 8
+    for result in report["results"]:
+        assert list(result["phases"]) == benchmark.PHASES
+        assert all(phase["min"] <= phase["mean"] for phase in result["phases"].values())
+    assert {(r["shape"], r["commands"], r["depth"]) for r in report["results"]} == {
+        ("shallow", 1, 1),
+        ("deep", 1, 1),
+        ("shallow", 6, 2),
+        ("deep", 6, 3),
+    }
+
+
+def test_benchmark_skips_scenarios_above_max_arguments(tmp_path: Path):
+    report = benchmark.benchmark(
+        commands=[2, 10],
+        parameters=[3],
+        shapes=["shallow"],
+        repeat=1,
+        max_arguments=10,
+        output=str(tmp_path / "b"),
+    )
+    assert {r["commands"] for r in report["results"]} == {2}
+    assert {r["docstring"] for r in report["results"]} == set(benchmark.DOCSTRING_NAMES.values())
+
+
+def test_benchmark_generated_docstrings_are_parsed():
+    for template, name in benchmark.DOCSTRING_NAMES.items():
+        function = benchmark.make_function_factory(3, "d0_")("command", template)
+        if "{{parameter_name}}" not in template:
+            assert Command(function).description.startswith("The command command."), name  # type: ignore
+            continue
+        cmd = Command(function, docstring_template=template)
+        assert cmd.description == "The command command.", name
+        assert [arg.help for arg in cmd.argument_data] == [f"The help of d0_p{i}." for i in range(3)], name
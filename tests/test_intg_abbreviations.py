@@ -0,0 +1,106 @@
+import pytest
+from argparse import ArgumentParser
+from typing import Literal
+from resources import CapSys
+from clig import Command, Arg, data
+from clig import clig  # protected classes
+
+
+def main(*, color: Literal["red", "green"] = "red", colour: str = "", level: Arg[int, data("-l")] = 1):
+    return locals()
+
+
+def build(mode: str, *, jobs: int = 1):
+    return locals()
+
+
+def bench(rounds: int):
+    return locals()
+
+
+def clean(what: str):
+    return locals()
+
+
+def build_tree(**kwargs) -> Command:
+    cmd = Command(main, **kwargs)
+    cmd.new_subcommand(build, aliases=["make"]).new_subcommand(clean)
+    cmd.add_subcommand(bench)
+    return cmd
+
+
+def test_prefix_trie_words_and_closest():
+    trie = clig._PrefixTrie.from_words(["build", "bench", "build-all", "make"])
+    assert trie.get_words("bu") == ["build", "build-all"]
+    assert trie.get_words("b") == ["build", "bench", "build-all"]
+    assert trie.get_words("x") == []
+    assert trie.get_closest("biuld", 2) == "build"
+    assert trie.get_closest("bulid-all", 2) == "build-all"
+    assert trie.get_closest("mak", 1) == "make"
+    assert trie.get_closest("zzzzz", 2) is None
+    assert clig._PrefixTrie.from_words(["ab", "ba"]).get_closest("aa", 1) == "ab"
+
+
+@pytest.mark.parametrize("option", ["--col", "--colo", "--color=green", "--le", "-l2", "-l=2", "--x", "-z"])
+def test_option_abbreviations_equal_argparse(option: str):
+    parser = clig._ArgumentParser(prog="main")
+    expected = ArgumentParser(prog="main")
+    for p in [parser, expected]:
+        p.add_argument("--color")
+        p.add_argument("--colour")
+        p.add_argument("-l", "--level")
+    assert str(parser._get_option_tuples(option)) == str(expected._get_option_tuples(option))
+
+
+def test_option_abbreviations_in_command(capsys: CapSys):
+    assert build_tree().run(["--colou", "x", "--lev", "3"]) == {"color": "red", "colour": "x", "level": 3}
+    with pytest.raises(SystemExit):
+        build_tree().run(["--col", "red"])
+    assert "ambiguous option: --col could match --color, --colour" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("single_pass", [False, True])
+def test_subcommand_abbreviations(single_pass: bool):
+    cmd = build_tree(allow_subcommand_abbrev=True, single_pass=single_pass)
+    assert cmd.run(["bui", "slow", "--jobs", "2"]) == {"mode": "slow", "jobs": 2}
+    cmd = build_tree(allow_subcommand_abbrev=True, single_pass=single_pass)
+    assert cmd.run(["ma", "slow", "cl", "cache"]) == {"what": "cache"}
+    cmd = build_tree(allow_subcommand_abbrev=True, single_pass=single_pass)
+    assert cmd.run(["ben", "3"]) == {"rounds": 3}
+
+
+def test_subcommand_abbreviations_are_opt_in_and_unambiguous(capsys: CapSys):
+    with pytest.raises(SystemExit):
+        build_tree().run(["bui"])
+    assert "invalid choice: 'bui' (choose from " in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        build_tree(allow_subcommand_abbrev=True).run(["b"])
+    assert "ambiguous choice: 'b' could match 'build', 'bench'\n" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("single_pass", [False, True])
+def test_ambiguous_subcommand_abbreviations(single_pass: bool, capsys: CapSys):
+    def bundle(path: str):
+        return locals()
+
+    cmd = build_tree(allow_subcommand_abbrev=True, single_pass=single_pass)
+    cmd.add_subcommand(bundle)
+    with pytest.raises(SystemExit):
+        cmd.run(["bu", "x"])
+    error = capsys.readouterr().err
+    assert "{build,bench,bundle}: ambiguous choice: 'bu' could match 'build', 'bundle'\n" in error
+    cmd = build_tree(allow_subcommand_abbrev=True, single_pass=single_pass)
+    cmd.add_subcommand(bundle)
+    assert cmd.run(["bun", "x"]) == {"path": "x"}
+
+
+def test_subcommand_suggestions(capsys: CapSys):
+    with pytest.raises(SystemExit):
+        build_tree().run(["biuld"])
+    assert "invalid choice: 'biuld', maybe you meant 'build'?\n" in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        build_tree().run(["make", "fast", "claen"])
+    assert "invalid choice: 'claen', maybe you meant 'clean'?\n" in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        build_tree().run(["deploy"])
+    assert "invalid choice: 'deploy' (choose from " in capsys.readouterr().err
@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+from clig import Command
+
+loops: list[asyncio.AbstractEventLoop] = []
+
+
+async def main(count: int = 1):
+    """The main command"""
+    loops.append(asyncio.get_running_loop())
+    await asyncio.sleep(0)
+    return {"count": count}
+
+
+async def child(name: str):
+    """An async subcommand"""
+    loops.append(asyncio.get_running_loop())
+    return {"name": name}
+
+
+def sync_child(value: int):
+    """A sync subcommand"""
+    return {"value": value}
+
+
+@pytest.fixture(autouse=True)
+def clear_loops():
+    loops.clear()
+    yield
+    loops.clear()
+
+
+def test_async_function_is_awaited():
+    assert Command(main).run(["--count", "3"]) == {"count": 3}
+    assert len(loops) == 1
+    assert loops[0].is_closed()
+
+
+def test_chained_async_commands_share_the_loop():
+    cmd = Command(main)
+    cmd.new_subcommand(child).new_subcommand(sync_child)
+    assert cmd.run(["child", "x"]) == {"name": "x"}
+    assert len(loops) == 2
+    assert loops[0] is loops[1]
+    assert cmd._runner is None
+    assert loops[0].is_closed()
+    assert cmd.run(["child", "y", "sync-child", "4"]) == {"value": 4}
+    assert loops[2] is loops[3] and loops[2] is not loops[0]
+
+
+def test_async_subcommand_of_sync_command():
+    def sync_main():
+        return "main"
+
+    cmd = Command(sync_main)
+    cmd.new_subcommand(child)
+    assert cmd.run(["child", "z"]) == {"name": "z"}
+    assert loops[0].is_closed()
+
+
+def test_single_pass_async_commands_share_the_loop():
+    cmd = Command(main, single_pass=True)
+    cmd.new_subcommand(child)
+    assert cmd.run(["--count", "2", "child", "x"]) == {"name": "x"}
+    assert len(loops) == 2 and loops[0] is loops[1]
+
+
+def test_loop_factory_inherited_by_subcommands():
+    created: list[asyncio.AbstractEventLoop] = []
+
+    def loop_factory():
+        created.append(asyncio.new_event_loop())
+        return created[-1]
+
+    cmd = Command(main, loop_factory=loop_factory)
+    cmd.new_subcommand(child)
+    cmd.run(["child", "x"])
+    assert len(created) == 1
+    assert loops == [created[0], created[0]]
+
+
+def test_run_many_shares_the_loop_between_runs():
+    results = Command(main).run_many([["--count", "1"], ["--count", "x"], ["--count", "2"]])
+    assert [item.result for item in results] == [{"count": 1}, None, {"count": 2}]
+    assert len(loops) == 2 and loops[0] is loops[1]
+    assert loops[0].is_closed()
+
+
+def test_async_exception_closes_the_loop():
+    async def failing():
+        loops.append(asyncio.get_running_loop())
+        raise ValueError("failed")
+
+    cmd = Command(failing)
+    with pytest.raises(ValueError):
+        cmd.run([])
+    assert cmd._runner is None
+    assert loops[0].is_closed()
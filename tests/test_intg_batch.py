@@ -0,0 +1,114 @@
+import io
+import sys
+import pytest
+from pathlib import Path
+from resources import CapSys
+from clig import BatchResult, Command
+
+
+def main(count: int, name: str = "x"):
+    """The main command"""
+    if count < 0:
+        raise ValueError("negative count")
+    return {"count": count, "name": name}
+
+
+def sub(value: float):
+    """A subcommand"""
+    return {"value": value}
+
+
+def test_run_many_reports_each_run(capsys: CapSys):
+    results = Command(main).run_many([["1"], ["2", "--name", "y"], ["z"], ["-1"], ["-h"]])
+    assert [item.args for item in results] == [["1"], ["2", "--name", "y"], ["z"], ["-1"], ["-h"]]
+    assert [item.result for item in results][:2] == [{"count": 1, "name": "x"}, {"count": 2, "name": "y"}]
+    assert [item.result for item in results][2:] == [None, None, None]
+    assert [item.exit_code for item in results] == [0, 0, 2, 1, 0]
+    assert isinstance(results[2].error, SystemExit)
+    assert isinstance(results[3].error, ValueError)
+    assert results[0].error is None and results[4].error is None
+    output = capsys.readouterr()
+    assert "invalid int value: 'z'" in output.err
+    assert "usage: main [-h] [--name NAME] count" in output.out
+
+
+def test_run_many_reuses_the_parser():
+    cmd = Command(main)
+    cmd.new_subcommand(sub)
+    assert cmd.run_many([]) == []
+    parser = cmd.parser
+    results = cmd.run_many([["1", "sub", "2.5"], ["3"]])
+    assert cmd.parser is parser
+    assert results == [
+        BatchResult(["1", "sub", "2.5"], {"value": 2.5}),
+        BatchResult(["3"], {"count": 3, "name": "x"}),
+    ]
+
+
+def test_run_many_exit_code_of_function():
+    def exits(code: str):
+        sys.exit(None if code == "none" else int(code) if code.isdigit() else code)
+
+    results = Command(exits).run_many([["none"], ["3"], ["message"]])
+    assert [item.exit_code for item in results] == [0, 3, 1]
+
+
+def test_batch_options_in_help(capsys: CapSys):
+    with pytest.raises(SystemExit):
+        Command(main, batch=True).run(["-h"])
+    output = capsys.readouterr().out
+    assert "usage: main [-h] [--batch FILE] [--batch0 FILE] [--name NAME] count" in output
+    assert "run the command once for each shell-quoted line of FILE" in output
+    with pytest.raises(SystemExit):
+        Command(main).run(["-h"])
+    assert "--batch" not in capsys.readouterr().out
+
+
+def test_batch_file_lines(tmp_path: Path):
+    batch = tmp_path / "batch.txt"
+    batch.write_text('1\n# a comment\n\n2 --name "a b"\n')
+    results = Command(main, batch=True).run(["--batch", str(batch)])
+    assert results == [
+        BatchResult(["1"], {"count": 1, "name": "x"}),
+        BatchResult(["2", "--name", "a b"], {"count": 2, "name": "a b"}),
+    ]
+
+
+def test_batch_stdin_nul_delimited(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(sys, "stdin", io.StringIO('1\0002 --name "a\nb"\0'))
+    results = Command(main, batch=True).run(["--batch0=-"])
+    assert [item.result for item in results] == [{"count": 1, "name": "x"}, {"count": 2, "name": "a\nb"}]
+
+
+def test_batch_continues_after_errors_and_exits_with_failure(tmp_path: Path, capsys: CapSys):
+    batch = tmp_path / "batch.txt"
+    batch.write_text("-1\nz\n'unbalanced\n4\n")
+    cmd = Command(main, batch=True)
+    cmd.func = lambda count, name: print(main(count, name))  # type: ignore
+    with pytest.raises(SystemExit) as e:
+        cmd.run(["--batch", str(batch)])
+    assert e.value.code == 1
+    output = capsys.readouterr()
+    assert output.out == "{'count': 4, 'name': 'x'}\n"
+    assert "main: record 1: ValueError('negative count')" in output.err
+    assert "invalid int value: 'z'" in output.err
+    assert "main: record 3: ValueError('No closing quotation')" in output.err
+
+
+def test_batch_option_must_be_first(capsys: CapSys):
+    with pytest.raises(SystemExit) as e:
+        Command(main, batch=True).run(["1", "--batch", "file"])
+    assert e.value.code == 2
+    assert "argument --batch: must be the first argument" in capsys.readouterr().err
+    with pytest.raises(SystemExit) as e:
+        Command(main, batch=True).run(["--batch", "file", "extra"])
+    assert "unrecognized arguments: extra" in capsys.readouterr().err
+
+
+def test_batch_records_cannot_start_batches(tmp_path: Path, capsys: CapSys):
+    batch = tmp_path / "batch.txt"
+    batch.write_text(f"--batch {batch}\n")
+    with pytest.raises(SystemExit) as e:
+        Command(main, batch=True).run(["--batch", str(batch)])
+    assert e.value.code == 1
+    assert "argument --batch: must be the first argument" in capsys.readouterr().err
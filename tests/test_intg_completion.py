@@ -0,0 +1,139 @@
+import os
+import sys
+import json
+import pytest
+from enum import Enum
+from pathlib import Path
+from typing import Literal
+from resources import CapSys
+from clig import Command
+
+HEAVY_MODULE = '''
+def heavy(count: int, *, level: str = "low", dry_run: bool = False):
+    """Heavy command"""
+    return {"count": count, "level": level}
+'''
+
+
+@pytest.fixture
+def heavy_module(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    (tmp_path / "clig_completion_heavy.py").write_text(HEAVY_MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "clig_completion_heavy"
+    sys.modules.pop("clig_completion_heavy", None)
+
+
+@pytest.fixture(autouse=True)
+def complete(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("CLIG_COMPLETE", "1")
+
+
+class Mode(Enum):
+    fast = 1
+    slow = 2
+
+
+def main(name: str, *, verbose: bool = False, color: Literal["red", "green"] = "red"):
+    return locals()
+
+
+def build(mode: Mode, *, jobs: int = 1, tags: list[str] = []):
+    return locals()
+
+
+def build_tree(**kwargs) -> Command:
+    cmd = Command(main, **kwargs)
+    cmd.add_subcommand(build, aliases=["b"])
+    return cmd
+
+
+def get_completions(cmd: Command, words: list[str], capsys: CapSys) -> list[str]:
+    with pytest.raises(SystemExit) as e:
+        cmd.run(words)
+    assert e.value.code == 0
+    return capsys.readouterr().out.splitlines()
+
+
+def test_complete_flags_and_subcommands(capsys: CapSys):
+    assert get_completions(build_tree(), ["--"], capsys) == ["--help", "--verbose", "--color"]
+    assert get_completions(build_tree(), ["--v"], capsys) == ["--verbose"]
+    assert get_completions(build_tree(), [""], capsys) == []
+    assert get_completions(build_tree(), ["x", ""], capsys) == ["build", "b"]
+    assert get_completions(build_tree(), ["x", "bu"], capsys) == ["build"]
+    assert get_completions(build_tree(), ["x", "b", "--"], capsys) == ["--help", "--jobs", "--tags"]
+
+
+def test_complete_literal_and_enum_choices(capsys: CapSys):
+    assert get_completions(build_tree(), ["x", "--color", ""], capsys) == ["red", "green"]
+    assert get_completions(build_tree(), ["x", "--color=g"], capsys) == ["--color=green"]
+    assert get_completions(build_tree(), ["x", "--color", "red", ""], capsys) == ["build", "b"]
+    assert get_completions(build_tree(), ["x", "build", "s"], capsys) == ["slow"]
+    assert get_completions(build_tree(), ["x", "build", "--jobs", "2", ""], capsys) == ["fast", "slow"]
+
+
+def test_complete_without_environment_variable_runs(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("CLIG_COMPLETE")
+    assert build_tree().run(["x", "b", "fast"]) == {"mode": Mode.fast, "jobs": 1, "tags": []}
+
+
+def test_completion_index_skips_imports_and_parsers(
+    heavy_module: str, tmp_path: Path, capsys: CapSys, monkeypatch: pytest.MonkeyPatch
+):
+    index = tmp_path / "completion.json"
+    cmd = build_tree(completion_index=index)
+    cmd.new_subcommand(f"{heavy_module}:heavy", help="A heavy command")
+    assert get_completions(cmd, ["x", "heavy", "--"], capsys) == ["--help", "--level", "--dry-run"]
+    assert heavy_module in sys.modules
+    assert os.path.join(str(tmp_path), f"{heavy_module}.py") in json.loads(index.read_text())["sources"]
+
+    sys.modules.pop(heavy_module)
+    cmd = build_tree(completion_index=index)
+    lazy = cmd.new_subcommand(f"{heavy_module}:heavy", help="A heavy command")
+    assert get_completions(cmd, ["x", "he"], capsys) == ["heavy"]
+    assert get_completions(cmd, ["x", "heavy", "1", "--d"], capsys) == ["--dry-run"]
+    assert heavy_module not in sys.modules
+    assert cmd.parser is None and lazy.parser is None
+
+    monkeypatch.delenv("CLIG_COMPLETE")
+    assert cmd.run(["x", "heavy", "2", "--level", "high"]) == {"count": 2, "level": "high"}
+
+
+def test_completion_index_remade_when_source_changes(heavy_module: str, tmp_path: Path, capsys: CapSys):
+    index = tmp_path / "completion.json"
+    cmd = Command(main, completion_index=index)
+    cmd.new_subcommand(f"{heavy_module}:heavy")
+    assert get_completions(cmd, ["x", "heavy", "--l"], capsys) == ["--level"]
+
+    sys.modules.pop(heavy_module)
+    (tmp_path / f"{heavy_module}.py").write_text(HEAVY_MODULE.replace("level", "stage_level"))
+    cmd = Command(main, completion_index=index)
+    cmd.new_subcommand(f"{heavy_module}:heavy")
+    assert get_completions(cmd, ["x", "heavy", "--l"], capsys) == []
+    assert get_completions(cmd, ["x", "heavy", "--s"], capsys) == ["--stage-level"]
+    assert heavy_module in sys.modules
+
+
+def test_completion_index_remade_when_annotation_module_changes(
+    tmp_path: Path, capsys: CapSys, monkeypatch: pytest.MonkeyPatch
+):
+    index = tmp_path / "completion.json"
+    colors = tmp_path / "clig_completion_colors.py"
+    colors.write_text("from enum import Enum\n\n\nclass Color(Enum):\n    red = 1\n")
+    (tmp_path / "clig_completion_paint.py").write_text(
+        "from clig_completion_colors import Color\n\n\ndef paint(color: Color):\n    return color\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    cmd = Command(main, completion_index=index)
+    cmd.new_subcommand("clig_completion_paint:paint")
+    assert get_completions(cmd, ["x", "paint", ""], capsys) == ["red"]
+
+    colors.write_text("from enum import Enum\n\n\nclass Color(Enum):\n    red = 1\n    blue = 2\n")
+    stat = os.stat(colors)
+    os.utime(colors, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    for name in ["clig_completion_colors", "clig_completion_paint"]:
+        sys.modules.pop(name)
+    cmd = Command(main, completion_index=index)
+    cmd.new_subcommand("clig_completion_paint:paint")
+    assert get_completions(cmd, ["x", "paint", ""], capsys) == ["red", "blue"]
+    for name in ["clig_completion_colors", "clig_completion_paint"]:
+        sys.modules.pop(name)
@@ -0,0 +1,104 @@
+import os
+import shutil
+import subprocess
+import pytest
+from enum import Enum
+from pathlib import Path
+from typing import Literal
+from clig import Command
+
+
+class Mode(Enum):
+    fast = 1
+    slow = 2
+
+
+def main(name: str, *, verbose: bool = False, color: Literal["red", "green"] = "red"):
+    return locals()
+
+
+def build(mode: Mode, *, jobs: int = 1, tags: list[str] = []):
+    return locals()
+
+
+def clean(what: Literal["all", "cache"]):
+    return locals()
+
+
+def build_tree(**kwargs) -> Command:
+    cmd = Command(main, **kwargs)
+    cmd.new_subcommand(build, aliases=["b"]).new_subcommand(clean)
+    return cmd
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash is not available")
+@pytest.mark.parametrize(
+    "words, completions",
+    [
+        (["main", ""], "build b"),
+        (["main", "x", "--c"], "--color"),
+        (["main", "x", "--color", ""], "red green"),
+        (["main", "x", "--color", "g"], "green"),
+        (["main", "x", "--color", "red", "b"], "build b"),
+        (["main", "x", "b", "f"], "fast"),
+        (["main", "x", "build", "--jobs", "2", ""], "fast slow clean"),
+        (["main", "x", "build", "--jobs", ""], ""),
+        (["main", "x", "build", "fast", "clean", ""], "all cache"),
+    ],
+)
+def test_bash_completion_script(words: list[str], completions: str, tmp_path: Path):
+    script = tmp_path / "main.bash"
+    build_tree().completion_script("bash", script)
+    test = f'source {script}; COMP_WORDS=("$@"); COMP_CWORD=$(($# - 1)); _main_clig_complete'
+    test += '; echo "${COMPREPLY[*]}"'
+    output = subprocess.run(["bash", "-c", test, "bash", *words], capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == completions
+
+
+def test_fish_completion_script():
+    script = build_tree().completion_script("fish")
+    assert "function __main_clig_at\n" in script
+    assert "            case :build :b\n                set command_path build\n" in script
+    assert "complete -c main -n \"__main_clig_at ''\" -l color -x -a 'red green'\n" in script
+    assert 'complete -c main -n "__main_clig_at build" -l jobs -r\n' in script
+    assert "complete -c main -n \"__main_clig_at 'build clean'\" -a 'all cache'\n" in script
+
+
+def test_zsh_completion_script():
+    script = build_tree().completion_script("zsh")
+    assert script.startswith("#compdef main\n")
+    assert '    local command_path="" skip="" word="" current="${words[CURRENT]}" prefixes="" i\n' in script
+    assert "            'build clean') prefixes=- flags=(-h --help) candidates=(all cache) ;;\n" in script
+    assert "    compdef _main_clig_complete main\n" in script
+
+
+def test_completion_scripts_are_deterministic():
+    for shell in ["bash", "zsh", "fish"]:
+        assert build_tree().completion_script(shell) == build_tree().completion_script(shell)  # type: ignore
+
+
+def test_completion_script_written_only_when_changed(tmp_path: Path):
+    path = tmp_path / "main.fish"
+    script = build_tree().completion_script("fish", path)
+    assert path.read_text() == script
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    build_tree().completion_script("fish", path)
+    assert path.stat().st_mtime_ns == 1_000_000_000
+    cmd = build_tree()
+    cmd.new_subcommand(clean, name="wipe")
+    assert "wipe" in cmd.completion_script("fish", path)
+    assert path.stat().st_mtime_ns != 1_000_000_000
+
+
+def test_completion_script_from_completion_index(tmp_path: Path):
+    index = tmp_path / "completion.json"
+    script = build_tree(completion_index=index).completion_script("bash")
+    cmd = build_tree(completion_index=index)
+    assert cmd.completion_script("bash") == script
+    assert cmd.parser is None
+
+
+def test_completion_script_unsupported_shell():
+    with pytest.raises(ValueError) as e:
+        build_tree().completion_script("powershell")  # type: ignore
+    assert "Unsupported shell 'powershell'" in e.value.args[0]
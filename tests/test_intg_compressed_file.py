@@ -0,0 +1,93 @@
+import io
+import sys
+import bz2
+import gzip
+import lzma
+import pickle
+import pytest
+from pathlib import Path
+from resources import CapSys
+from clig import Arg, Command, CompressedFile, data
+
+LINES = b"".join(f"line {i}\n".encode() for i in range(1000))
+
+received: list[CompressedFile] = []
+
+
+def count(log: CompressedFile):
+    """Count the lines of a log"""
+    received.append(log)
+    assert log.closed
+    return sum(1 for _ in log), log.compression
+
+
+@pytest.fixture(autouse=True)
+def clear():
+    received.clear()
+
+
+@pytest.mark.parametrize(
+    "compression, compress",
+    [("gzip", gzip.compress), ("bz2", bz2.compress), ("xz", lzma.compress), (None, lambda data: data)],
+)
+def test_compression_detected_by_magic_bytes(tmp_path: Path, compression, compress):
+    path = tmp_path / "log.data"  # the extension is not used
+    path.write_bytes(compress(LINES))
+    assert Command(count).run([str(path)]) == (1000, compression)
+    assert received[0].closed
+
+
+def test_compressed_file_text_and_buffer_size(tmp_path: Path):
+    path = tmp_path / "log.gz"
+    path.write_bytes(gzip.compress("açaí\nok\n".encode("latin-1")))
+
+    def factory(path: str) -> CompressedFile:
+        return CompressedFile(path, encoding="latin-1", buffer_size=16)
+
+    def first(log: Arg[CompressedFile, data(type=factory)]):
+        received.append(log)
+        return log.readline()
+
+    assert Command(first).run([str(path)]) == "açaí\n"
+    assert received[0].closed
+    assert received[0].buffer_size == 16
+
+
+def test_compressed_file_from_stdin(monkeypatch: pytest.MonkeyPatch):
+    stdin = io.TextIOWrapper(io.BufferedReader(io.BytesIO(bz2.compress(LINES))))
+    monkeypatch.setattr(sys, "stdin", stdin)
+    assert Command(count).run(["-"]) == (1000, "bz2")
+    assert not stdin.closed
+
+    def lines(log: Arg[CompressedFile, data(type=lambda path: CompressedFile(path, encoding="utf-8"))]):
+        return list(log)
+
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BufferedReader(io.BytesIO(b"x\ny\n"))))
+    assert Command(lines).run(["-"]) == ["x\n", "y\n"]
+    assert not sys.stdin.closed
+
+
+def test_compressed_file_validated_while_parsing(tmp_path: Path, capsys: CapSys):
+    with pytest.raises(SystemExit) as e:
+        Command(count).run([str(tmp_path / "missing.gz")])
+    assert e.value.code == 2
+    assert "argument log: can't open" in capsys.readouterr().err
+    assert received == []
+
+
+def test_compressed_file_list_closed_and_picklable(tmp_path: Path):
+    (tmp_path / "a.xz").write_bytes(lzma.compress(b"a\n"))
+    (tmp_path / "b").write_bytes(b"b\nb\n")
+
+    def read_all(logs: list[CompressedFile]):
+        received.extend(logs)
+        return [log.read() for log in logs]
+
+    assert Command(read_all).run([str(tmp_path / "a.xz"), str(tmp_path / "b")]) == [b"a\n", b"b\nb\n"]
+    assert all(log.closed for log in received)
+    with CompressedFile(str(tmp_path / "a.xz")) as log:
+        assert log.read(1) == b"a"
+        copy = pickle.loads(pickle.dumps(log))
+    assert log.closed and copy.closed
+    assert copy.read() == b"a\n"
+    copy.close()
@@ -0,0 +1,137 @@
+import os
+import sys
+import time
+import socket
+import subprocess
+import pytest
+from pathlib import Path
+
+import clig
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "send_fds"), reason="Unix domain sockets with fd passing")
+
+SRC_DIR = str(Path(clig.__file__).parent.parent)
+
+HEAVY_MODULE = '''
+import os
+from pathlib import Path
+
+with open(Path(__file__).parent / "imports.log", "a") as log:
+    log.write(f"{os.getpid()}\\n")
+
+
+def heavy(count: int):
+    """Heavy command"""
+    print("heavy", count)
+'''
+
+SERVER_SCRIPT = '''
+import os
+import sys
+import clig
+
+
+def main(name: str, code: int = 0):
+    """The main command"""
+    print(name, os.getcwd(), os.environ.get("CLIG_TEST_VALUE"), sys.stdin.read().strip(), os.getpid(), sep="|")
+    if code < 0:
+        raise ValueError("negative code")
+    if code:
+        sys.exit(code)
+
+
+cmd = clig.Command(main, lazy_parsers=True, batch=True)
+cmd.new_subcommand("clig_daemon_heavy:heavy")
+cmd.serve(sys.argv[1])
+'''
+
+CLIENT_SCRIPT = "import sys, clig; sys.exit(clig.run_client(sys.argv[1], sys.argv[2:]))"
+
+
+@pytest.fixture
+def server(tmp_path: Path):
+    (tmp_path / "clig_daemon_heavy.py").write_text(HEAVY_MODULE)
+    (tmp_path / "server.py").write_text(SERVER_SCRIPT)
+    socket_path = tmp_path / "clig.sock"
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([SRC_DIR, str(tmp_path)])}
+    process = subprocess.Popen([sys.executable, str(tmp_path / "server.py"), str(socket_path)], env=env)
+    for _ in range(500):
+        if socket_path.exists():
+            break
+        time.sleep(0.01)
+    yield socket_path, process
+    process.terminate()
+    process.wait()
+
+
+def call(
+    socket_path: Path, *args: str, cwd: Path, input: str = "", **environ: str
+) -> subprocess.CompletedProcess[str]:
+    env = {**os.environ, "PYTHONPATH": SRC_DIR, "CLIG_TEST_VALUE": "from-client", **environ}
+    command = [sys.executable, "-c", CLIENT_SCRIPT, str(socket_path), *args]
+    return subprocess.run(command, cwd=cwd, env=env, input=input, capture_output=True, text=True)
+
+
+def test_daemon_forwards_args_cwd_env_and_stdio(server, tmp_path: Path):
+    socket_path, process = server
+    workdir = tmp_path / "work"
+    workdir.mkdir()
+    result = call(socket_path, "alice", cwd=workdir, input="from stdin\n")
+    assert result.returncode == 0
+    name, cwd, value, stdin, pid = result.stdout.strip().split("|")
+    assert [name, cwd, value, stdin] == ["alice", str(workdir), "from-client", "from stdin"]
+    assert int(pid) != process.pid
+    assert oct(socket_path.stat().st_mode & 0o777) == oct(0o600)
+
+
+def test_daemon_returns_exit_status_and_errors(server, tmp_path: Path):
+    socket_path, _ = server
+    assert call(socket_path, "bob", "--code", "3", cwd=tmp_path).returncode == 3
+    result = call(socket_path, "bob", "--code", "x", cwd=tmp_path)
+    assert result.returncode == 2
+    assert "invalid int value: 'x'" in result.stderr
+    result = call(socket_path, "bob", "--code", "-1", cwd=tmp_path)
+    assert result.returncode == 1
+    assert "ValueError: negative code" in result.stderr
+
+
+def test_daemon_imports_the_command_tree_once(server, tmp_path: Path):
+    socket_path, process = server
+    for count in ["1", "2"]:
+        result = call(socket_path, "carol", "heavy", count, cwd=tmp_path)
+        assert result.returncode == 0
+        assert result.stdout.endswith(f"heavy {count}\n")
+    assert (tmp_path / "imports.log").read_text() == f"{process.pid}\n"
+
+
+def test_daemon_runs_batch_files(server, tmp_path: Path):
+    socket_path, _ = server
+    (tmp_path / "records.txt").write_text("dave\neve --code 4\nfrank\n")
+    result = call(socket_path, "--batch", "records.txt", cwd=tmp_path)
+    assert result.returncode == 1
+    assert [line.split("|")[0] for line in result.stdout.splitlines()] == ["dave", "eve", "frank"]
+    result = call(socket_path, "--batch", "-", cwd=tmp_path, input="grace\n")
+    assert result.returncode == 0
+    assert result.stdout.startswith("grace|")
+
+
+def test_daemon_prints_completions(server, tmp_path: Path):
+    socket_path, _ = server
+    result = call(socket_path, "--ba", cwd=tmp_path, CLIG_COMPLETE="1")
+    assert result.returncode == 0
+    assert result.stdout.split() == ["--batch", "--batch0"]
+    result = call(socket_path, "carol", "he", cwd=tmp_path, CLIG_COMPLETE="1")
+    assert result.stdout.split() == ["heavy"]
+
+
+def test_daemon_replaces_stale_socket_and_refuses_running_one(server, tmp_path: Path):
+    socket_path, _ = server
+    with pytest.raises(OSError) as e:
+        clig.Command(lambda: None).serve(socket_path)
+    assert "A server is already listening" in e.value.args[0]
+    stale_path = tmp_path / "stale.sock"
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(stale_path))
+    stale.close()
+    clig.clig._remove_stale_socket(str(stale_path))
+    assert not stale_path.exists()
@@ -0,0 +1,181 @@
+import os
+import ast
+import sys
+import pytest
+import importlib
+from pathlib import Path
+from resources import CapSys
+from clig import Command, Arg, data
+from clig import clig  # protected functions
+from clig.__about__ import __version__
+
+COMMANDS_MODULE = '''
+from enum import Enum
+from typing import Literal
+
+
+class Mode(Enum):
+    fast = 1
+    slow = 2
+
+
+def main(name: str, *, verbose: bool = False, color: Literal["red", "green"] = "red"):
+    """The main command.
+
+    Parameters
+    ----------
+    - `name` (`str`):
+        The name to use.
+    """
+    return {"name": name, "verbose": verbose, "color": color}
+
+
+def build(mode: Mode, *, jobs: int = 1, tags: list[str] = [], size: tuple[int, int] = (1, 2)):
+    """Build the project."""
+    return {"mode": mode, "jobs": jobs, "tags": tags, "size": size}
+
+
+async def clean(what: Literal["all", "cache"], name: str = "x"):
+    return {"what": what, "name": name}
+'''
+
+
+@pytest.fixture
+def commands(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    (tmp_path / "clig_freeze_commands.py").write_text(COMMANDS_MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield importlib.import_module("clig_freeze_commands")
+    for name in ["clig_freeze_commands", "clig_freeze_frozen"]:
+        sys.modules.pop(name, None)
+
+
+def build_tree(commands) -> Command:
+    cmd = Command(commands.main)
+    cmd.new_subcommand(commands.build, aliases=["b"]).new_subcommand(commands.clean)
+    return cmd
+
+
+def freeze(cmd: Command, tmp_path: Path):
+    cmd.freeze(tmp_path / "clig_freeze_frozen.py")
+    sys.modules.pop("clig_freeze_frozen", None)
+    return importlib.import_module("clig_freeze_frozen")
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["x"],
+        ["x", "--verbose", "--color", "green"],
+        ["x", "b", "slow", "--jobs", "3", "--size", "3", "4"],
+        ["x", "build", "fast", "--tags", "a", "b"],
+        ["x", "build", "fast", "clean", "all", "--name", "y"],
+    ],
+)
+def test_frozen_run_equals_command_run(args: list[str], commands, tmp_path: Path):
+    frozen = freeze(build_tree(commands), tmp_path)
+    assert frozen.run(args) == build_tree(commands).run(args)
+
+
+def test_frozen_help_equals_command_help(commands, tmp_path: Path, capsys: CapSys):
+    for args in [["--help"], ["x", "build", "--help"], ["x", "b", "fast", "clean", "--help"]]:
+        with pytest.raises(SystemExit):
+            build_tree(commands).run(args)
+        expected = capsys.readouterr().out
+        with pytest.raises(SystemExit):
+            freeze(build_tree(commands), tmp_path).run(args)
+        assert capsys.readouterr().out == expected
+
+
+def test_frozen_run_does_not_inspect(commands, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    frozen = freeze(build_tree(commands), tmp_path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("inspected")
+
+    monkeypatch.setattr("inspect.signature", fail)
+    monkeypatch.setattr("clig.clig._normalize_docstring", fail)
+    assert frozen.run(["x", "b", "slow"])["mode"] is commands.Mode.slow
+
+
+def test_frozen_module_is_deterministic_and_written_when_changed(commands, tmp_path: Path):
+    path = tmp_path / "frozen.py"
+    source = build_tree(commands).freeze(path)
+    assert build_tree(commands).freeze() == source
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    build_tree(commands).freeze(path)
+    assert path.stat().st_mtime_ns == 1_000_000_000
+    cmd = build_tree(commands)
+    cmd.new_subcommand(commands.clean, name="wipe")
+    assert "'wipe'" in cmd.freeze(path)
+    assert path.stat().st_mtime_ns != 1_000_000_000
+
+
+def test_frozen_module_makes_converters_by_factory_name(commands):
+    source = build_tree(commands).freeze()
+    assert "_clig_clig._create_tuple_converter(" in source
+    assert "__create_" not in source and "_BatchResult" not in source
+
+
+def test_frozen_module_lines_fit_the_line_length(commands):
+    source = build_tree(commands).freeze()
+    assert "        binder=_clig_clig._InvocationBinder(\n            positional=['mode'],\n" in source
+    for line in source.splitlines():
+        # only a string too long by itself (e.g. a long signature) is left on a longer line
+        if len(line) > 110:
+            assert isinstance(ast.literal_eval(line.strip().rstrip(",")), str), line
+
+
+def test_frozen_check_finds_changed_functions(commands, tmp_path: Path):
+    frozen = freeze(build_tree(commands), tmp_path)
+    assert frozen.check() == []
+    changed = COMMANDS_MODULE.replace("jobs: int = 1", "jobs: int = 10")
+    (tmp_path / "clig_freeze_commands.py").write_text(changed)
+    sys.modules.pop("clig_freeze_commands")
+    assert frozen.check() == ["clig_freeze_commands:build"]
+
+
+def test_frozen_check_finds_changed_annotation_modules(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    colors = tmp_path / "clig_freeze_colors.py"
+    colors.write_text("from enum import Enum\n\n\nclass Color(Enum):\n    red = 1\n")
+    (tmp_path / "clig_freeze_paint.py").write_text(
+        "from clig_freeze_colors import Color\n\n\ndef paint(color: Color):\n    return color\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    paint = importlib.import_module("clig_freeze_paint")
+    frozen = freeze(Command(paint.paint), tmp_path)
+    assert frozen.check() == []
+    colors.write_text("from enum import Enum\n\n\nclass Color(Enum):\n    red = 1\n    blue = 2\n")
+    assert frozen.check() == ["clig_freeze_paint:paint"]
+    for name in ["clig_freeze_colors", "clig_freeze_paint", "clig_freeze_frozen"]:
+        sys.modules.pop(name, None)
+
+
+def test_frozen_check_finds_changed_clig_version(commands, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    frozen = freeze(build_tree(commands), tmp_path)
+    assert frozen.__clig_version__ == __version__
+    monkeypatch.setattr(clig, "_get_clig_version", lambda: "0.0.0")
+    assert sorted(frozen.check()) == [f"clig_freeze_commands:{name}" for name in ["build", "clean", "main"]]
+
+
+def local_function(values: list[int]):
+    return values
+
+
+def test_freeze_refuses_unsupported_commands():
+    with pytest.raises(ValueError) as e:
+        Command(local_function, batch=True).freeze()
+    assert "cannot be frozen: it has the `batch` option" in e.value.args[0]
+
+    def parallel_function(values: Arg[list[int], data(parallel=True)]):
+        return values
+
+    with pytest.raises(ValueError) as e:
+        Command(parallel_function).freeze()
+    assert "cannot be frozen: the argument 'values' is `parallel`" in e.value.args[0]
+
+    def nested(value: int):
+        return value
+
+    with pytest.raises(ValueError) as e:
+        Command(nested).freeze()
+    assert "it is not importable by name" in e.value.args[0]
@@ -0,0 +1,39 @@
+import sys
+import subprocess
+
+IMPORT_TIME_BUDGET_US = 300_000
+"""Generous budget (in microseconds) for the cumulative time of `import clig`, measured by
+`python -X importtime`, that catches a new heavy import at module level."""
+
+DEFERRED_MODULES = [
+    *["importlib.metadata", "email", "zipfile", "csv", "pathlib", "pickle", "asyncio", "socket"],
+    *["gzip", "bz2", "lzma"],
+]
+"""Modules used only by rarely used features, that must not be imported with `clig`."""
+
+
+def measure_import_time() -> dict[str, int]:
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import clig"], capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line.removeprefix("import time:").split("|")
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_does_not_load_deferred_modules():
+    code = "import sys; before = set(sys.modules); import clig; print(*(set(sys.modules) - before))"
+    process = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    imported = process.stdout.split()
+    assert "clig.clig" in imported
+    for module in DEFERRED_MODULES:
+        assert module not in imported
+
+
+def test_import_time_budget():
+    times = min((measure_import_time() for _ in range(3)), key=lambda times: times["clig"])
+    assert "importlib.metadata" not in times
+    assert times["clig"] < IMPORT_TIME_BUDGET_US
@@ -0,0 +1,67 @@
+import io
+import sys
+import pytest
+from enum import Enum
+from pathlib import Path
+from typing import Iterable, Iterator
+from resources import CapSys
+from clig import Arg, Command, data
+
+
+class Color(Enum):
+    red = 1
+    blue = 2
+
+
+def total(numbers: Iterable[int], *, scale: int = 1):
+    """Sum the numbers"""
+    return sum(numbers) * scale
+
+
+def test_iterable_from_stdin_by_default(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(sys, "stdin", io.StringIO("1\n2\n3\n"))
+    assert Command(total).run([]) == 6
+    monkeypatch.setattr(sys, "stdin", io.StringIO("4\n5\n"))
+    assert Command(total).run(["-", "--scale", "2"]) == 18
+
+
+def test_iterable_from_file_is_lazy(tmp_path: Path):
+    path = tmp_path / "numbers.txt"
+    path.write_text("1\n2\nx\n")
+    consumed: list[int] = []
+
+    def first_two(numbers: Iterator[int]):
+        for number in numbers:
+            consumed.append(number)
+            if len(consumed) == 2:
+                return consumed
+
+    assert Command(first_two).run([str(path)]) == [1, 2]
+    with pytest.raises(ValueError) as e:
+        Command(total).run([str(path)])
+    assert "Invalid value 'x' (item 3) of the argument 'numbers'" in e.value.args[0]
+
+
+def test_iterable_nul_delimited_and_enum_items(tmp_path: Path):
+    def colors(values: Arg[Iterable[Color], data(delimiter="\0")]):
+        return list(values)
+
+    path = tmp_path / "colors"
+    path.write_text("red\0blue\nish\0blue")
+    with pytest.raises(ValueError) as e:
+        Command(colors).run([str(path)])
+    assert "Invalid choice 'blue\\nish' (item 2)" in e.value.args[0]
+    path.write_text("red\0blue\0")
+    assert Command(colors).run([str(path)]) == [Color.red, Color.blue]
+
+
+def test_iterable_option_keeps_non_file_default(monkeypatch: pytest.MonkeyPatch, capsys: CapSys):
+    def names(prefix: str, items: Iterable[str] = ()):
+        return [prefix + item for item in items]
+
+    assert Command(names).run(["p"]) == []
+    monkeypatch.setattr(sys, "stdin", io.StringIO("a\nb\n"))
+    assert Command(names).run(["p", "--items"]) == ["pa", "pb"]
+    with pytest.raises(SystemExit):
+        Command(names).run(["-h"])
+    assert "usage: names [-h] [--items [ITEMS]] prefix" in capsys.readouterr().out
@@ -0,0 +1,81 @@
+import pytest
+from resources import CapSys
+from clig import Command
+
+
+def main(verbose: bool = False):
+    """The main command"""
+    return locals()
+
+
+def first(a: int):
+    """The first subcommand"""
+    return locals()
+
+
+def second(b: str, c: float = 1.0):
+    """The second subcommand"""
+    return locals()
+
+
+def nested(d: int):
+    """A nested subcommand"""
+    return locals()
+
+
+def build_tree(**kwargs) -> Command:
+    cmd = Command(main, **kwargs)
+    cmd.new_subcommand(first)
+    cmd.new_subcommand(second).new_subcommand(nested)
+    return cmd
+
+
+def test_lazy_parsers_only_selected_path_is_built():
+    cmd = build_tree(lazy_parsers=True)
+    assert cmd.run(["first", "3"]) == {"a": 3}
+    second = cmd.subcommands["second"]
+    assert second.parser is not None
+    assert [action.dest for action in second.parser._actions] == ["help"]
+    assert second.subcommands["nested"].parser is None
+
+
+def test_lazy_parsers_nested_path():
+    cmd = build_tree(lazy_parsers=True)
+    assert cmd.run(["second", "x", "--c", "2.5", "nested", "7"]) == {"d": 7}
+    assert [action.dest for action in cmd.subcommands["first"].parser._actions] == ["help"]
+
+
+def test_lazy_parsers_same_results_as_eager():
+    for args in [["first", "1"], ["--verbose", "second", "y"], ["second", "y", "nested", "2"], []]:
+        assert build_tree(lazy_parsers=True).run(args) == build_tree().run(args)
+
+
+def test_lazy_parsers_help_lists_subcommands(capsys: CapSys):
+    with pytest.raises(SystemExit) as e:
+        build_tree().run(["-h"])
+    assert e.value.code == 0
+    eager_help = capsys.readouterr().out
+
+    cmd = build_tree(lazy_parsers=True)
+    with pytest.raises(SystemExit) as e:
+        cmd.run(["-h"])
+    assert e.value.code == 0
+    assert capsys.readouterr().out == eager_help
+    assert "first         The first subcommand" in eager_help
+    assert cmd.subcommands["second"].subcommands["nested"].parser is None
+
+
+def test_lazy_parsers_subcommand_help(capsys: CapSys):
+    with pytest.raises(SystemExit) as e:
+        build_tree(lazy_parsers=True).run(["second", "-h"])
+    assert e.value.code == 0
+    output = capsys.readouterr().out
+    assert "usage: main second [-h] [--c C] b {nested} ..." in output
+    assert "nested    A nested subcommand" in output
+
+
+def test_lazy_parsers_print_help_of_subcommand(capsys: CapSys):
+    cmd = build_tree(lazy_parsers=True)
+    cmd.subcommands["second"].subcommands["nested"].print_help()
+    output = capsys.readouterr().out
+    assert "usage: main second b nested [-h] d" in output
@@ -0,0 +1,100 @@
+import sys
+import pytest
+from pathlib import Path
+from resources import CapSys
+from clig import Command
+
+HEAVY_MODULE = '''
+IMPORTED = True
+
+
+def heavy(count: int, name: str = "x"):
+    """Heavy command
+
+    Parameters
+    ----------
+    - `count` (`int`):
+        How many times.
+
+    - `name` (`str`, optional): Defaults to `"x"`.
+        The name.
+    """
+    return {"count": count, "name": name}
+'''
+
+
+@pytest.fixture
+def heavy_module(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    (tmp_path / "clig_lazy_heavy.py").write_text(HEAVY_MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "clig_lazy_heavy"
+    sys.modules.pop("clig_lazy_heavy", None)
+
+
+def main():
+    return "main"
+
+
+def light(value: int):
+    """Light command"""
+    return {"value": value}
+
+
+def test_lazy_subcommand_not_imported_when_other_subcommand_runs(heavy_module: str):
+    cmd = Command(main)
+    cmd.new_subcommand(light)
+    cmd.new_subcommand(f"{heavy_module}:heavy", help="A heavy command")
+    assert heavy_module not in sys.modules
+    assert cmd.run(["light", "3"]) == {"value": 3}
+    assert heavy_module not in sys.modules
+
+
+def test_lazy_subcommand_imported_when_dispatched(heavy_module: str):
+    cmd = Command(main)
+    cmd.new_subcommand(light)
+    lazy = cmd.new_subcommand(f"{heavy_module}:heavy", help="A heavy command")
+    assert lazy.name == "heavy"
+    assert lazy.func is None
+    assert cmd.run(["heavy", "5", "--name", "y"]) == {"count": 5, "name": "y"}
+    assert heavy_module in sys.modules
+    assert lazy.description == "Heavy command"
+
+
+def test_lazy_subcommand_listed_in_help_without_import(heavy_module: str, capsys: CapSys):
+    cmd = Command(main)
+    cmd.add_subcommand(light).add_subcommand(f"{heavy_module}:heavy", name="big", help="A heavy command")
+    with pytest.raises(SystemExit) as e:
+        cmd.run(["-h"])
+    assert e.value.code == 0
+    output = capsys.readouterr().out
+    assert "big        A heavy command" in output
+    assert heavy_module not in sys.modules
+
+
+def test_lazy_subcommand_help(heavy_module: str, capsys: CapSys):
+    cmd = Command(main)
+    cmd.new_subcommand(f"{heavy_module}:heavy", help="A heavy command")
+    with pytest.raises(SystemExit) as e:
+        cmd.run(["heavy", "-h"])
+    assert e.value.code == 0
+    output = capsys.readouterr().out
+    assert "Heavy command" in output
+    assert "How many times." in output
+    assert "--name NAME" in output
+
+
+def test_lazy_subcommand_sanitize_names_with_parent(heavy_module: str):
+    def parent(count: int):
+        return {"parent_count": count}
+
+    cmd = Command(parent)
+    cmd.new_subcommand(f"{heavy_module}:heavy")
+    assert cmd.run(["1", "heavy", "2"]) == {"count": 2, "name": "x"}
+
+
+def test_lazy_subcommand_invalid_import_string():
+    cmd = Command(main)
+    cmd.new_subcommand("no_module_separator", help="Invalid")
+    with pytest.raises(ValueError) as e:
+        cmd.run(["no-module-separator"])
+    assert "Invalid import string 'no_module_separator'" in e.value.args[0]
@@ -0,0 +1,73 @@
+import re
+import pickle
+import pytest
+from pathlib import Path
+from resources import CapSys
+from clig import Command, MappedFile
+
+received: list[MappedFile] = []
+
+
+def count(data: MappedFile, word: str = "b"):
+    """Count a word in a file"""
+    received.append(data)
+    assert data.closed
+    return len(re.findall(word.encode(), data)), data.closed
+
+
+@pytest.fixture(autouse=True)
+def clear():
+    received.clear()
+
+
+def test_mapped_file_opened_on_access_and_closed_after_return(tmp_path: Path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"abcabc" * 1000)
+    assert Command(count).run([str(path)]) == (2000, False)
+    assert received[0].closed
+    assert received[0].path == str(path)
+
+
+def test_mapped_file_mmap_methods_and_slices(tmp_path: Path):
+    path = tmp_path / "lines.txt"
+    path.write_bytes(b"first\nsecond\n")
+
+    def head(files: list[MappedFile]):
+        return [(file.readline(), file[:3], len(file), bytes(memoryview(file)[-2:])) for file in files]
+
+    cmd = Command(head)
+    assert cmd.run([str(path), str(path)]) == [(b"first\n", b"fir", 13, b"d\n")] * 2
+
+
+def test_mapped_file_validated_while_parsing(tmp_path: Path, capsys: CapSys):
+    with pytest.raises(SystemExit) as e:
+        Command(count).run([str(tmp_path / "missing.bin")])
+    assert e.value.code == 2
+    assert f"argument data: can't open '{tmp_path / 'missing.bin'}'" in capsys.readouterr().err
+    assert received == []
+
+
+def test_mapped_file_empty_and_picklable(tmp_path: Path):
+    path = tmp_path / "empty"
+    path.write_bytes(b"")
+    with MappedFile(str(path)) as mapped:
+        assert len(mapped) == 0
+        assert bytes(mapped) == b""
+        assert not mapped.closed
+        copy = pickle.loads(pickle.dumps(mapped))
+    assert mapped.closed
+    assert copy.closed and copy.path == str(path)
+
+
+def test_mapped_file_closed_when_function_raises(tmp_path: Path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"abc")
+
+    def fail(data: MappedFile):
+        received.append(data)
+        data.find(b"c")
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        Command(fail).run([str(path)])
+    assert received[0].closed
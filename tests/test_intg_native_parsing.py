@@ -0,0 +1,107 @@
+import pytest
+from argparse import ArgumentParser
+from typing import Literal
+from resources import CapSys
+from clig import Command, Arg, data
+
+
+def main(
+    name: str,
+    size: tuple[int, int],
+    *,
+    verbose: Arg[bool, data("-v")] = False,
+    quiet: Arg[bool, data("-q")] = False,
+    color: Literal["red", "green"] = "red",
+    level: Arg[int, data("-l")] = 1,
+    tags: list[str] = [],
+    items: Arg[list[int], data(nargs="+")] = [0],
+):
+    return locals()
+
+
+def build(mode: Literal["fast", "slow"], *, jobs: int = 1):
+    return locals()
+
+
+def build_tree(native_parsing: bool) -> Command:
+    cmd = Command(main, native_parsing=native_parsing, single_pass=True)
+    cmd.add_subcommand(build, aliases=["b"])
+    return cmd
+
+
+COMMAND_LINES = [
+    ["x", "1", "2"],
+    ["-v", "x", "1", "2", "--color", "green"],
+    ["x", "1", "2", "--color=green", "-l", "3", "--tags", "a", "b"],
+    ["x", "--tags", "a", "b", "--items", "4", "5", "--", "1", "2"],
+    ["x", "1", "2", "--tags", "--items", "4", "5"],
+    ["x", "1", "2", "--items", "4", "-v", "b", "fast", "--jobs", "2"],
+    ["x", "1", "2", "-l3", "--col", "red", "build", "slow"],
+    ["x", "1", "2", "-vq"],
+    ["x", "-1", "2"],
+]
+
+
+@pytest.mark.parametrize("args", COMMAND_LINES)
+def test_native_parsing_equals_argparse(args: list[str]):
+    assert build_tree(True).run(args) == build_tree(False).run(args)
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["x", "1"],
+        ["x", "1", "2", "--color", "cyan"],
+        ["x", "1", "2", "--level"],
+        ["x", "1", "2", "--level", "one"],
+        ["x", "1", "2", "--unknown"],
+        ["x", "1", "2", "extra"],
+        ["x", "1", "2", "-1"],
+        ["x", "1", "2", "--items"],
+        ["x", "1", "2", "-v=yes"],
+        ["x", "1", "2", "build"],
+        ["x", "1", "2", "b", "fast", "--jobs"],
+        ["x", "1", "2", "-h"],
+        ["x", "1", "2", "b", "-h", "--jobs"],
+    ],
+)
+def test_native_parsing_errors_equal_argparse(args: list[str], capsys: CapSys):
+    with pytest.raises(SystemExit) as native:
+        build_tree(True).run(args)
+    native_output = capsys.readouterr()
+    with pytest.raises(SystemExit) as argparse:
+        build_tree(False).run(args)
+    assert native.value.code == argparse.value.code
+    assert native_output == capsys.readouterr()
+
+
+def test_native_parsing_does_not_match_patterns(monkeypatch: pytest.MonkeyPatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("parsed by argparse")
+
+    monkeypatch.setattr(ArgumentParser, "_match_argument", fail)
+    monkeypatch.setattr(ArgumentParser, "_match_arguments_partial", fail)
+    args = ["-v", "x", "1", "2", "--color=green", "--tags", "a", "-l", "2", "b", "slow", "--jobs", "2"]
+    assert build_tree(True).run(args) == {"mode": "slow", "jobs": 2}
+
+
+def test_native_parsing_falls_back_to_argparse(monkeypatch: pytest.MonkeyPatch):
+    calls: list[list[str]] = []
+    parse_known_args = ArgumentParser._parse_known_args
+
+    def spy(self, arg_strings, *args, **kwargs):
+        calls.append(list(arg_strings))
+        return parse_known_args(self, arg_strings, *args, **kwargs)
+
+    monkeypatch.setattr(ArgumentParser, "_parse_known_args", spy)
+    build_tree(True).run(["x", "1", "2", "--color", "red"])
+    assert calls == []
+    build_tree(True).run(["x", "1", "2", "-vq"])
+    assert calls == [["x", "1", "2", "-vq"]]
+
+
+def test_native_parsing_applies_to_subcommands():
+    cmd = build_tree(True)
+    cmd._add_parsers()
+    assert cmd.parser.native_parsing  # type: ignore
+    assert cmd.subcommands["build"].parser.native_parsing  # type: ignore
@@ -0,0 +1,87 @@
+import os
+import time
+import threading
+import pytest
+from pathlib import Path
+from resources import CapSys
+from clig import Arg, Command, data
+
+
+def square(numbers: Arg[list[int], data(parallel=True)], offset: int = 0):
+    """Square one number"""
+    return numbers * numbers + offset, os.getpid()
+
+
+def count_lines(*paths: Arg[Path, data(parallel=True)]):
+    """Count the lines of one file"""
+    (path,) = paths
+    return path.name, len(path.read_text().splitlines())
+
+
+def wait(delays: Arg[list[float], data(parallel=True)], *, label: str = "x"):
+    """Sleep and report the thread"""
+    time.sleep(delays)
+    return label, delays, threading.get_ident()
+
+
+def test_parallel_list_argument_in_processes():
+    results = Command(square).run(["1", "2", "3", "4", "--offset", "1", "--jobs", "2"])
+    assert [value for value, _ in results] == [2, 5, 10, 17]
+    assert os.getpid() not in {pid for _, pid in results}
+
+
+def test_parallel_with_one_job_runs_in_this_process():
+    results = Command(square).run(["1", "2", "--jobs", "1"])
+    assert results == [(1, os.getpid()), (4, os.getpid())]
+
+
+def test_parallel_varargs_in_threads(tmp_path: Path):
+    for name, lines in [("a.txt", 1), ("b.txt", 3)]:
+        (tmp_path / name).write_text("line\n" * lines)
+    cmd = Command(count_lines, parallel_executor="thread")
+    assert cmd.run([str(tmp_path / "a.txt"), str(tmp_path / "b.txt")]) == [("a.txt", 1), ("b.txt", 3)]
+    assert cmd.run([]) == []
+
+
+def test_parallel_unordered_results():
+    cmd = Command(wait, parallel_executor="thread", parallel_ordered=False)
+    results = cmd.run(["0.2", "0.0", "--label", "y", "--jobs", "2"])
+    assert [(label, delay) for label, delay, _ in results] == [("y", 0.0), ("y", 0.2)]
+    assert results[0][2] != results[1][2]
+    ordered = Command(wait, parallel_executor="thread").run(["0.2", "0.0", "--jobs", "2"])
+    assert [delay for _, delay, _ in ordered] == [0.2, 0.0]
+
+
+def test_parallel_jobs_option_in_help(capsys: CapSys):
+    with pytest.raises(SystemExit):
+        Command(square).run(["-h"])
+    assert "--jobs N" in capsys.readouterr().out
+    with pytest.raises(SystemExit) as e:
+        Command(square).run(["1", "2", "--jobs", "0"])
+    assert e.value.code == 2
+    assert "argument --jobs: must be a positive integer" in capsys.readouterr().err
+
+
+def test_parallel_exception_is_raised():
+    def fail(values: Arg[list[int], data(parallel=True)]):
+        if values == 2:
+            raise ValueError("two")
+        return values
+
+    with pytest.raises(ValueError, match="two"):
+        Command(fail, parallel_executor="thread").run(["1", "2", "3"])
+
+
+def test_parallel_argument_must_be_a_list():
+    def single(value: Arg[int, data(parallel=True)]):
+        return value
+
+    def double(a: Arg[list[int], data(parallel=True)], *b: Arg[int, data(parallel=True)]):
+        return a
+
+    with pytest.raises(ValueError) as e:
+        Command(single).run(["1"])
+    assert "The `parallel` argument 'value' must take a list of values" in e.value.args[0]
+    with pytest.raises(ValueError) as e:
+        Command(double).run(["1"])
+    assert "Only one argument can be `parallel`" in e.value.args[0]
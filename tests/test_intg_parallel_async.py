@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from resources import CapSys
+from clig import Arg, Command, data
+
+running: list[int] = []
+peak: list[int] = []
+
+
+async def fetch(ids: Arg[list[int], data(parallel=True)], *, prefix: str = "id"):
+    """Fetch one id"""
+    running.append(ids)
+    peak.append(len(running))
+    await asyncio.sleep(0.01 * (ids % 3))
+    running.remove(ids)
+    return f"{prefix}-{ids}"
+
+
+@pytest.fixture(autouse=True)
+def clear():
+    running.clear()
+    peak.clear()
+
+
+def test_async_parallel_is_bounded_by_concurrency():
+    results = Command(fetch).run([str(i) for i in range(12)] + ["--concurrency", "3"])
+    assert results == [f"id-{i}" for i in range(12)]
+    assert max(peak) == 3
+
+
+def test_async_parallel_default_concurrency(capsys: CapSys):
+    Command(fetch).run([str(i) for i in range(150)])
+    assert max(peak) == 100
+    with pytest.raises(SystemExit):
+        Command(fetch).run(["-h"])
+    output = capsys.readouterr().out
+    assert "--concurrency N" in output
+    assert "--jobs" not in output
+
+
+def test_async_parallel_streams_results_in_completion_order():
+    streamed: list[str] = []
+    cmd = Command(fetch, parallel_ordered=False, on_result=streamed.append)
+    results = cmd.run(["2", "1", "0", "--prefix", "x"])
+    assert results == streamed == ["x-0", "x-1", "x-2"]
+
+
+def test_async_parallel_error_cancels_the_others():
+    finished: list[int] = []
+
+    async def fail(values: Arg[list[int], data(parallel=True)]):
+        if values == 0:
+            raise ValueError("zero")
+        await asyncio.sleep(1)
+        finished.append(values)
+
+    with pytest.raises(ValueError, match="zero"):
+        Command(fail).run(["1", "2", "0", "3"])
+    assert finished == []
+
+
+def test_on_result_with_thread_pool():
+    def double(values: Arg[list[int], data(parallel=True)]):
+        return values * 2
+
+    streamed: list[int] = []
+    cmd = Command(double, parallel_executor="thread", on_result=streamed.append)
+    assert cmd.run(["1", "2", "3"]) == [2, 4, 6]
+    assert sorted(streamed) == [2, 4, 6]
+    streamed.clear()
+    assert cmd.run(["4", "5", "--jobs", "1"]) == streamed == [8, 10]
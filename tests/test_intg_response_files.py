@@ -0,0 +1,104 @@
+import os
+import pytest
+from pathlib import Path
+from typing import Iterable
+from resources import CapSys
+from clig import Command
+from clig import clig  # protected functions
+
+
+def main(name: str, *, tags: list[str] = []):
+    """The main command"""
+    return {"name": name, "tags": tags}
+
+
+def sub(count: int, *, verbose: bool = False):
+    """A subcommand"""
+    return {"count": count, "verbose": verbose}
+
+
+def total(numbers: Iterable[int]):
+    """Sum the numbers"""
+    return sum(numbers)
+
+
+@pytest.fixture(autouse=True)
+def chdir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(tmp_path)
+    clig._read_response_file.cache_clear()
+
+
+def test_response_file_with_quotes_and_comments(tmp_path: Path):
+    Path("args.rsp").write_text("# the name\n\"John Smith\"  # with a space\n--tags a 'b c'\n")
+    cmd = Command(main, fromfile_prefix_chars="@", response_files=True)
+    assert cmd.run(["@args.rsp"]) == {"name": "John Smith", "tags": ["a", "b c"]}
+
+
+@pytest.mark.parametrize("single_pass", [False, True])
+def test_quoted_arguments_not_read_as_response_files(single_pass: bool):
+    Path("literal").write_text("--tags=file")
+    Path("args.rsp").write_text("'@literal' sub @count.rsp")
+    Path("count.rsp").write_text("'3'")
+    cmd = Command(main, fromfile_prefix_chars="@", response_files=True, single_pass=single_pass)
+    cmd.new_subcommand(sub)
+    assert cmd.run(["@args.rsp"]) == {"count": 3, "verbose": False}
+    assert cmd.context.namespace.name == "@literal"
+    Path("tags.rsp").write_text('x --tags "@literal" \\@literal')
+    cmd = Command(main, fromfile_prefix_chars="@", response_files=True, single_pass=single_pass)
+    assert cmd.run(["@tags.rsp"]) == {"name": "x", "tags": ["@literal", "@literal"]}
+
+
+def test_argparse_format_without_response_files():
+    Path("args.txt").write_text("John Smith\n")
+    assert Command(main, fromfile_prefix_chars="@").run(["@args.txt"]) == {"name": "John Smith", "tags": []}
+
+
+def test_response_file_read_once_for_chained_commands(monkeypatch: pytest.MonkeyPatch):
+    Path("args.rsp").write_text("x @nested.rsp sub 3 --verbose")
+    Path("nested.rsp").write_text("--tags=t")
+    reads: list[str] = []
+    get_tokens = clig._get_response_file_tokens
+
+    def counted_get_tokens(file):
+        reads.append(file.name)
+        return get_tokens(file)
+
+    monkeypatch.setattr(clig, "_get_response_file_tokens", counted_get_tokens)
+    cmd = Command(main, fromfile_prefix_chars="@", response_files=True)
+    cmd.new_subcommand(sub)
+    assert cmd.run(["@args.rsp"]) == {"count": 3, "verbose": True}
+    assert cmd.context.namespace.tags == ["t"]
+    assert [os.path.basename(name) for name in reads] == ["args.rsp", "nested.rsp"]
+    cmd.run(["@args.rsp"])
+    assert len(reads) == 2
+    Path("nested.rsp").write_text("--tags=uv")
+    cmd.run(["@args.rsp"])
+    assert [os.path.basename(name) for name in reads] == ["args.rsp", "nested.rsp", "nested.rsp"]
+    assert cmd.context.namespace.tags == ["uv"]
+
+
+def test_response_file_feeds_iterable_lazily():
+    Path("numbers.rsp").write_text("1 2 # comment\n'3'\n")
+    Path("args.rsp").write_text("@@numbers.rsp")
+    cmd = Command(total, fromfile_prefix_chars="@", response_files=True)
+    assert cmd.run(["@@numbers.rsp"]) == 6
+    assert cmd.run(["@args.rsp"]) == 6
+    assert clig._read_response_file.cache_info().currsize == 1  # only "args.rsp"
+
+
+def test_response_files_cache_is_bounded():
+    cmd = Command(main, fromfile_prefix_chars="@", response_files=True)
+    for number in range(clig._RESPONSE_FILES_CACHE_SIZE + 10):
+        Path(f"args{number}.rsp").write_text(f"name{number}")
+        assert cmd.run([f"@args{number}.rsp"]) == {"name": f"name{number}", "tags": []}
+    info = clig._read_response_file.cache_info()
+    assert info.currsize == clig._RESPONSE_FILES_CACHE_SIZE
+    assert cmd.run(["@args0.rsp"]) == {"name": "name0", "tags": []}
+    assert clig._read_response_file.cache_info().misses == info.misses + 1
+
+
+def test_missing_response_file(capsys: CapSys):
+    with pytest.raises(SystemExit) as e:
+        Command(main, fromfile_prefix_chars="@", response_files=True).run(["@missing.rsp"])
+    assert e.value.code == 2
+    assert "No such file or directory" in capsys.readouterr().err
@@ -0,0 +1,100 @@
+import pytest
+from argparse import ArgumentParser
+from resources import CapSys
+from clig import Command, Context
+
+
+def build_tree(calls: list, **kwargs) -> Command:
+    def main(word: str, verbose: bool = False):
+        calls.append(("main", word, verbose))
+
+    def copy(source: str, count: int = 1):
+        calls.append(("copy", source, count))
+        return "copied"
+
+    def nested(a: int, *rest: int):
+        calls.append(("nested", a, rest))
+        return "nested"
+
+    cmd = Command(main, **kwargs)
+    cmd.new_subcommand(copy).new_subcommand(nested)
+    return cmd
+
+
+def test_single_pass_value_equal_to_subcommand_name():
+    calls = []
+    assert build_tree(calls, single_pass=True).run(["copy", "copy", "copy", "--count", "2"]) == "copied"
+    assert calls == [("main", "copy", False), ("copy", "copy", 2)]
+
+
+def test_single_pass_same_results_as_chained_dispatch():
+    for args in [["w"], ["w", "--verbose", "copy", "s"], ["w", "copy", "s", "--count", "3", "nested", "3"]]:
+        chained_calls, single_calls = [], []
+        assert build_tree(single_calls, single_pass=True).run(args) == build_tree(chained_calls).run(args)
+        assert single_calls == chained_calls
+
+
+def test_single_pass_parses_once(monkeypatch: pytest.MonkeyPatch):
+    parsed = []
+    parse_known_args = ArgumentParser.parse_known_args
+
+    def counted(parser, args=None, namespace=None):
+        parsed.append(parser.prog)
+        return parse_known_args(parser, args, namespace)
+
+    monkeypatch.setattr(ArgumentParser, "parse_known_args", counted)
+    calls = []
+    build_tree(calls, single_pass=True).run(["w", "copy", "s", "nested", "3"])
+    assert parsed == ["main", "main word copy", "main word copy source nested"]
+    assert [call[0] for call in calls] == ["main", "copy", "nested"]
+
+
+def test_single_pass_keeps_values_of_each_command_apart():
+    def main(a: int):
+        return {"main": a}
+
+    def middle(b: int):
+        return {"middle": b}
+
+    def leaf(a: int):
+        return {"leaf": a}
+
+    cmd = Command(main, single_pass=True)
+    cmd.new_subcommand(middle).new_subcommand(leaf)
+    results = []
+    for cmd_ in [cmd, cmd.subcommands["middle"], cmd.subcommands["middle"].subcommands["leaf"]]:
+        cmd_.func = (lambda f: lambda *args: results.append(f(*args)))(cmd_.func)
+    cmd.run(["1", "middle", "2", "leaf", "3"])
+    assert results == [{"main": 1}, {"middle": 2}, {"leaf": 3}]
+
+
+def test_single_pass_extra_arguments_to_variadic_command():
+    calls = []
+    build_tree(calls, single_pass=True).run(["w", "copy", "s", "nested", "3", "4", "5"])
+    assert calls[-1] == ("nested", 3, (4, 5))
+
+
+def test_single_pass_unrecognized_arguments(capsys: CapSys):
+    calls = []
+    with pytest.raises(SystemExit) as e:
+        build_tree(calls, single_pass=True).run(["w", "copy", "s", "--other"])
+    assert e.value.code == 2
+    assert "main: error: unrecognized arguments: --other" in capsys.readouterr().err
+    assert calls == []
+
+
+def test_single_pass_context_has_values_of_all_commands():
+    contexts = []
+
+    def main(a: int, ctx: Context):
+        contexts.append(ctx)
+
+    def sub(b: str, ctx: Context):
+        contexts.append(ctx)
+
+    cmd = Command(main, single_pass=True)
+    cmd.new_subcommand(sub)
+    cmd.run(["1", "sub", "x"])
+    assert contexts[0] is contexts[1]
+    assert contexts[0].namespace.a == 1
+    assert contexts[0].namespace.b == "x"
@@ -0,0 +1,136 @@
+import os
+import sys
+import pytest
+from pathlib import Path
+from resources import CapSys
+from clig import Command, clig
+
+
+def main(name: str, count: int = 1, flag: bool = False):
+    """The main command
+
+    Parameters
+    ----------
+    - `name` (`str`):
+        The name.
+
+    - `count` (`int`, optional): Defaults to `1`.
+        How many.
+
+    - `flag` (`bool`, optional): Defaults to `False`.
+        A flag.
+    """
+    return locals()
+
+
+def sub(value: float, *, other: str = "x"):
+    """A subcommand"""
+    return locals()
+
+
+def not_introspected(*args, **kwargs):
+    raise AssertionError("function introspected despite the spec cache")
+
+
+def build_tree(cache: Path) -> Command:
+    cmd = Command(main, spec_cache=cache)
+    cmd.new_subcommand(sub)
+    return cmd
+
+
+@pytest.fixture
+def cache(tmp_path: Path):
+    clig._SPEC_CACHES.clear()
+    yield tmp_path / "spec.cache"
+    clig._SPEC_CACHES.clear()
+
+
+def test_spec_cache_reused_in_later_runs(cache: Path, monkeypatch: pytest.MonkeyPatch):
+    expected = build_tree(cache).run(["a", "--count", "2", "sub", "1.5", "--other", "y"])
+    assert expected == {"value": 1.5, "other": "y"}
+    assert cache.exists()
+    clig._SPEC_CACHES.clear()  # as in a new process
+    monkeypatch.setattr(Command, "_get_data_from_docstring", not_introspected)
+    monkeypatch.setattr(Command, "_generate_args_for_add_argument", not_introspected)
+    cmd = build_tree(cache)
+    assert cmd.run(["a", "--count", "2", "sub", "1.5", "--other", "y"]) == expected
+    assert cmd.parameters == {}
+
+
+def test_spec_cache_same_help(cache: Path, capsys: CapSys):
+    outputs = []
+    for _ in range(2):
+        clig._SPEC_CACHES.clear()
+        with pytest.raises(SystemExit):
+            build_tree(cache).run(["-h"])
+        outputs.append(capsys.readouterr().out)
+    assert outputs[0] == outputs[1]
+    assert "How many." in outputs[0]
+
+
+def test_spec_cache_invalidated_when_source_changes(
+    cache: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    module = tmp_path / "clig_spec_module.py"
+    module.write_text("def cmd(a: int):\n    return a\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import clig_spec_module
+
+    assert Command(clig_spec_module.cmd, spec_cache=cache).run(["1"]) == 1
+    module.write_text("def cmd(a: str, b: str = 'b'):\n    return a + b\n")
+    stat = os.stat(module)
+    os.utime(module, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    sys.modules.pop("clig_spec_module")
+    import clig_spec_module
+
+    clig._SPEC_CACHES.clear()
+    assert Command(clig_spec_module.cmd, spec_cache=cache).run(["1", "--b", "2"]) == "12"
+    sys.modules.pop("clig_spec_module")
+
+
+def test_spec_cache_invalidated_when_annotation_module_changes(
+    cache: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: CapSys
+):
+    colors = tmp_path / "clig_spec_colors.py"
+    colors.write_text("from enum import Enum\n\n\nclass Color(Enum):\n    red = 1\n")
+    (tmp_path / "clig_spec_paint.py").write_text(
+        "from clig_spec_colors import Color\n\n\ndef paint(color: Color):\n    return color.name\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import clig_spec_paint
+
+    assert Command(clig_spec_paint.paint, spec_cache=cache).run(["red"]) == "red"
+    colors.write_text("from enum import Enum\n\n\nclass Color(Enum):\n    red = 1\n    blue = 2\n")
+    stat = os.stat(colors)
+    os.utime(colors, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    for name in ["clig_spec_colors", "clig_spec_paint"]:
+        sys.modules.pop(name)
+    import clig_spec_paint
+
+    clig._SPEC_CACHES.clear()
+    assert Command(clig_spec_paint.paint, spec_cache=cache).run(["blue"]) == "blue"
+    for name in ["clig_spec_colors", "clig_spec_paint"]:
+        sys.modules.pop(name)
+
+
+def test_spec_cache_unpicklable_entries_built_normally(cache: Path):
+    def local(value: int):
+        return value
+
+    for _ in range(2):
+        clig._SPEC_CACHES.clear()
+        assert Command(local, spec_cache=cache).run(["3"]) == 3
+    assert not cache.exists()
+
+
+def test_spec_cache_corrupted_file_ignored(cache: Path):
+    cache.write_bytes(b"not a pickle")
+    assert Command(main, spec_cache=cache).run(["a"]) == {"name": "a", "count": 1, "flag": False}
+    clig._SPEC_CACHES.clear()
+    assert Command(main, spec_cache=cache).run(["b", "--flag"]) == {"name": "b", "count": 1, "flag": True}
+
+
+def test_spec_cache_settings_changes_not_reused(cache: Path):
+    assert Command(main, spec_cache=cache).run(["a", "--count", "3"])["count"] == 3
+    clig._SPEC_CACHES.clear()
+    assert Command(main, spec_cache=cache, make_shorts=True).run(["a", "-c", "4"])["count"] == 4
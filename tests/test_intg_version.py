@@ -27,3 +27,34 @@ def test_version_with_version_msg(capsys: CapSys):
     assert e.value.code == 0
     output = capsys.readouterr().out
     assert "This is my version." in output
+
+
+def main_package_version() -> int:
+    return 2
+
+
+def test_package_version_searched_only_when_requested(monkeypatch: pytest.MonkeyPatch, capsys: CapSys):
+    searched = []
+    monkeypatch.setattr(clig.clig, "_get_pkg_version", lambda func: searched.append(func) or "4.5.6")
+    assert clig.run(main_package_version, [], version=True) == 2
+    assert searched == []
+
+    with pytest.raises(SystemExit) as e:
+        clig.run(main_package_version, ["--version"], version=True, versionmodifier=lambda v: f"v{v}")
+    assert e.value.code == 0
+    assert searched == [main_package_version]
+    assert "v4.5.6" in capsys.readouterr().out
+
+
+def test_package_version_saved_in_spec_cache(monkeypatch: pytest.MonkeyPatch, tmp_path, capsys: CapSys):
+    clig.clig._SPEC_CACHES.clear()
+    cache = tmp_path / "spec.cache"
+    monkeypatch.setattr(clig.clig, "_get_pkg_version", lambda func: "7.8.9")
+    with pytest.raises(SystemExit):
+        clig.run(main_package_version, ["--version"], version=True, spec_cache=cache)
+    clig.clig._SPEC_CACHES.clear()
+    monkeypatch.setattr(clig.clig, "_get_pkg_version", lambda func: "not cached")
+    with pytest.raises(SystemExit):
+        clig.run(main_package_version, ["--version"], version=True, spec_cache=cache)
+    assert capsys.readouterr().out == "7.8.9\n7.8.9\n"
+    clig.clig._SPEC_CACHES.clear()
@@ -0,0 +1,73 @@
+# cSpell: disable
+from clig import clig  # protected functions
+import functions as fun
+
+
+def test_compiled_template_is_cached_by_template_and_parameter_number():
+    clig._compile_docstring_template.cache_clear()
+    first = clig._compile_docstring_template(clig.NUMPY_DOCSTRING, 3)
+    second = clig._compile_docstring_template(clig.NUMPY_DOCSTRING, 3)
+    other = clig._compile_docstring_template(clig.NUMPY_DOCSTRING, 2)
+    assert first is second
+    assert first is not other
+    info = clig._compile_docstring_template.cache_info()
+    assert info.hits == 1
+    assert info.misses == 2
+
+
+def test_compiled_template_shared_between_str_and_docstr():
+    clig._compile_docstring_template.cache_clear()
+    first = clig._compile_docstring_template(clig.GOOGLE_DOCSTRING, 1)
+    second = clig._compile_docstring_template(clig.DocStr.GOOGLE_DOCSTRING, 1)
+    assert first is second
+
+
+def test_compiled_template_without_parameter_section():
+    assert clig._compile_docstring_template(clig.DESCRIPTION_DOCSTRING, 2) is None
+    compiled = clig._compile_docstring_template(clig.DESCRIPTION_DOCSTRING, 0)
+    assert compiled is not None
+    assert compiled.parameter_section_length == 0
+
+
+def test_compiled_template_cache_is_bounded():
+    clig._compile_docstring_template.cache_clear()
+    for number in range(clig._DOCSTRING_TEMPLATES_CACHE_SIZE + 10):
+        clig._compile_docstring_template(clig.SPHINX_DOCSTRING, number)
+    info = clig._compile_docstring_template.cache_info()
+    assert info.currsize == clig._DOCSTRING_TEMPLATES_CACHE_SIZE
+
+
+CUSTOM_DOCSTRING = """
+{{description}}
+
+Arguments:
+    {{parameter_name}}: {{parameter_description}}
+"""
+
+
+def custom_documented(first: int, second: str = "x"):
+    """Do something.
+
+    Arguments:
+        first: The first one.
+        second: The second one.
+    """
+
+
+def test_templates_compiled_once_for_many_commands():
+    clig._compile_docstring_template.cache_clear()
+    for _ in range(10):
+        cmd = clig.Command(custom_documented, docstring_template=CUSTOM_DOCSTRING)
+        assert [arg.help for arg in cmd.argument_data] == ["The first one.", "The second one."]
+    info = clig._compile_docstring_template.cache_info()
+    assert info.misses == 1
+    assert info.hits == 9
+
+
+def test_collect_docstring_data_with_given_normalized_docstring():
+    cmd = clig.Command(fun.ptc_kti_ktb_cligDocMutiline)
+    docstring = clig._normalize_docstring(fun.ptc_kti_ktb_cligDocMutiline.__doc__)
+    data = cmd._collect_docstring_data_using_template(clig.CLIG_DOCSTRING_WITH_EPILOG, docstring)
+    assert data == cmd._collect_docstring_data_using_template(clig.CLIG_DOCSTRING_WITH_EPILOG)
+    assert data is not None
+    assert data.helps["a"] == "Dicta et optio dicta."
@@ -0,0 +1,73 @@
+# cSpell: disable
+from enum import Enum
+from argparse import Namespace
+from typing import Literal
+import pytest
+from clig import Command, clig
+from clig.clig import _get_argument_converter, _ArgumentData, EMPTY
+
+
+class Color(Enum):
+    red = 1
+    blue = 2
+
+
+class Size(Enum):
+    small = "s"
+    large = "l"
+
+
+def test_no_converter_for_plain_types():
+    for annotation in [None, int, str, float, bool, list[int], Literal["a", "b"], int | None]:
+        assert _get_argument_converter(_ArgumentData(name="a", typeannotation=annotation)) is None
+
+
+def test_enum_converter():
+    converter = _get_argument_converter(_ArgumentData(name="a", typeannotation=Color))
+    assert converter is not None
+    assert converter("blue") is Color.blue
+    optional = _get_argument_converter(_ArgumentData(name="a", typeannotation=Color | None))  # type: ignore
+    assert optional is not None
+    assert optional("red") is Color.red
+
+
+def test_literal_with_enum_converter():
+    annotation = Literal[Color.red, Size.large, "other"]
+    converter = _get_argument_converter(_ArgumentData(name="a", typeannotation=annotation))  # type: ignore
+    assert converter is not None
+    assert converter("red") is Color.red
+    assert converter("large") is Size.large
+    assert converter("other") == "other"
+
+
+def test_tuple_converter():
+    converter = _get_argument_converter(_ArgumentData(name="a", typeannotation=tuple[int, ...]))  # type: ignore
+    assert converter is not None
+    assert converter([1, 2]) == (1, 2)
+    assert converter(None) is None
+    default = [3]
+    data = _ArgumentData(name="a", typeannotation=tuple[int, ...], kwargs={"default": default})  # type: ignore
+    converter = _get_argument_converter(data)
+    assert converter is not None
+    assert converter(default) is default
+    data = _ArgumentData(name="a", typeannotation=tuple[int, ...], kwargs={"default": EMPTY})  # type: ignore
+    assert _get_argument_converter(data)([4]) == (4,)  # type: ignore
+
+
+def test_conversion_plan_made_once(monkeypatch: pytest.MonkeyPatch):
+    def main(color: Color, sizes: tuple[str, ...], count: int = 1):
+        return color, sizes, count
+
+    cmd = Command(main)
+    assert cmd.run(["red", "a", "b"]) == (Color.red, ("a", "b"), 1)
+    assert [name for name, _ in cmd._conversion_plan] == ["color", "sizes"]
+
+    def not_called(*args):
+        raise AssertionError("conversion decided again after parsing")
+
+    monkeypatch.setattr(clig, "get_origin", not_called)
+    monkeypatch.setattr(clig, "_get_argument_converter", not_called)
+    for _ in range(3):
+        namespace = Namespace(color="blue", sizes=["c"], count=2)
+        cmd._convert_namespace(namespace)
+        assert namespace == Namespace(color=Color.blue, sizes=("c",), count=2)
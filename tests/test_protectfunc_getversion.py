@@ -1,4 +1,4 @@
-from clig.clig import _get_pkg_version
+from clig.clig import _get_pkg_version, _get_packages_distributions
 
 
 import git
@@ -33,3 +33,10 @@ def test_get_pytestl_version():
     assert deep_search == True
     assert pkg == "pytest"
     assert ver == pytest.__version__
+
+
+def test_packages_distributions_built_once():
+    _get_packages_distributions.cache_clear()
+    _get_pkg_version(func=git.refresh, return_pkg_name=True)
+    _get_pkg_version(func=yaml.add_constructor, return_pkg_name=True)
+    assert _get_packages_distributions.cache_info().misses == 1
@@ -0,0 +1,67 @@
+# cSpell: disable
+import inspect
+from argparse import Namespace
+import pytest
+from clig import Command, Context, clig
+from clig.clig import _make_invocation_binder, _get_argument_data_from_parameter
+
+
+def get_binder(function):
+    parameters = inspect.signature(function).parameters.values()
+    return _make_invocation_binder([_get_argument_data_from_parameter(parameter) for parameter in parameters])
+
+
+def test_binder_positional_keyword_and_context():
+    def foo(a: int, ctx: Context, b: str = "x", *, c: float, kctx: Context[Namespace]):
+        pass
+
+    binder = get_binder(foo)
+    assert binder.positional == ["a", None, "b"]
+    assert binder.keyword == [("c", "c"), ("kctx", None)]
+    args, kwargs = binder.bind(Namespace(a=1, b="y", c=2.5), "context", [], {})
+    assert args == [1, "context", "y"]
+    assert kwargs == {"c": 2.5, "kctx": "context"}
+
+
+def test_binder_variadic_converters():
+    def foo(a: int, *rest: int, **options: float):
+        pass
+
+    binder = get_binder(foo)
+    assert binder.positional == ["a"]
+    args, kwargs = binder.bind(Namespace(a=1), None, ["2", "3"], {"x": "1.5", "y": ["1", "2"]})
+    assert args == [1, 2, 3]
+    assert kwargs == {"x": 1.5, "y": [1.0, 2.0]}
+
+
+def test_binder_untyped_variadic():
+    def foo(*rest, **options):
+        pass
+
+    args, kwargs = get_binder(foo).bind(Namespace(), None, ["2"], {"x": "1"})
+    assert args == ["2"]
+    assert kwargs == {"x": "1"}
+
+
+def test_binder_dest_with_spaces():
+    def foo(a: int):
+        pass
+
+    args, _ = get_binder(foo).bind(Namespace(**{"a ": 3}), None, [], {})
+    assert args == [3]
+
+
+def test_binder_made_once(monkeypatch: pytest.MonkeyPatch):
+    def main(a: int, ctx: Context, *, b: str = "b"):
+        return a, ctx.command.name, b
+
+    cmd = Command(main)
+    assert cmd.run(["1"]) == (1, "main", "b")
+
+    def not_called(*args):
+        raise AssertionError("parameters inspected again after parsing")
+
+    monkeypatch.setattr(clig, "_is_context_annotation", not_called)
+    monkeypatch.setattr(clig, "_make_invocation_binder", not_called)
+    for i in range(3):
+        assert cmd.run([str(i), "--b", "c"]) == (i, "main", "c")
@@ -0,0 +1,107 @@
+# cSpell: disable
+import pytest
+import inspect
+from clig import clig  # protected functions
+import functions as fun
+
+
+def _strip_keys(data: clig._DocstringData | None) -> clig._DocstringData | None:
+    # the regex keeps the blank line before an entry in its name when entries are separated by blank lines
+    if data is not None:
+        data.helps = {key.strip(): value for key, value in data.helps.items()}
+    return data
+
+
+def test_parse_builtin_docstring_agrees_with_templates_regex():
+    functions = [f for f in vars(fun).values() if inspect.isfunction(f) and f.__doc__]
+    assert len(functions) > 10
+    for function in functions:
+        docstring = clig._normalize_docstring(function.__doc__)
+        parameter_number = len(inspect.signature(function).parameters)
+        for template, builtin_format in clig._BUILTIN_DOCSTRING_FORMATS.items():
+            expected = _strip_keys(clig._match_docstring_template(docstring, template, parameter_number))
+            result = clig._parse_builtin_docstring(docstring, *builtin_format, parameter_number)
+            assert result == expected, (function.__name__, builtin_format)
+
+
+def test_parse_builtin_docstring_blank_lines_between_entries():
+    docstring = "Desc\n\nParameters\n----------\na : int\n    desc a\n\nb : str\n    desc b"
+    data = clig._parse_builtin_docstring(docstring, False, "numpy", 2)
+    assert data == clig._DocstringData(description="Desc", epilog=None, helps={"a": "desc a", "b": "desc b"})
+
+
+def test_parse_builtin_docstring_ignores_sections_after_last_parameter():
+    docstring = "Desc\n\nArgs:\n    a (int): desc a\n        more a\n\nReturns:\n    int: value"
+    data = clig._parse_builtin_docstring(docstring, False, "google", 1)
+    assert data == clig._DocstringData(description="Desc", epilog=None, helps={"a": "desc a\nmore a"})
+
+
+def test_parse_builtin_docstring_missing_parameters():
+    docstring = "Desc\n\nParameters\n----------\na : int\n    desc a"
+    assert clig._parse_builtin_docstring(docstring, False, "numpy", 2) is None
+    assert clig._parse_builtin_docstring(docstring, False, "google", 1) is None
+
+
+PARITY_DOCSTRINGS = [
+    # the first "Args:" header is not followed by the parameters
+    ("Desc\n\nArgs:\n\nArgs:\n    a (int): desc a", "google", 1),
+    ("Desc\n\nArgs:\nnot indented\n\nArgs:\n    a: desc a", "google_notypes", 1),
+    (
+        "Desc\n\nParameters\n----------\n    indented\n\nParameters\n----------\na : int\n    desc a",
+        "numpy",
+        1,
+    ),
+    # a blank line in the epilog before a later ":param"
+    ("Desc\n\n:param a: in epilog\n\n:param a: desc a", "sphinx_notypes", 1),
+    ("Desc\n\nEpilog\n\n:param a: in epilog\n\nMore epilog\n\n:param a: desc a", "sphinx_notypes", 1),
+    ("\n\n:param a: da\n\n:param a: da", "sphinx_notypes", 0),
+    ("Desc\n\n:param a: no type\n\n:param a: desc a\n:type a: int", "sphinx", 1),
+    # docstrings starting with a space or with an empty description
+    (" indented\nDesc", None, 0),
+    (" indented\n\nArgs:\n    a (int): desc a", "google", 1),
+    ("\n:param a: desc a\n:type a: int", "sphinx", 0),
+    ("\n\n", None, 0),
+    ("Desc\n\nEpilog\n\n", None, 0),
+]
+
+
+@pytest.mark.parametrize("docstring,style,parameter_number", PARITY_DOCSTRINGS)
+def test_parse_builtin_docstring_parity_with_templates_regex(docstring, style, parameter_number):
+    for template, builtin_format in clig._BUILTIN_DOCSTRING_FORMATS.items():
+        if builtin_format[1] != style:
+            continue
+        expected = _strip_keys(clig._match_docstring_template(docstring, template, parameter_number))
+        result = clig._parse_builtin_docstring(docstring, *builtin_format, parameter_number)
+        assert result == expected, builtin_format
+
+
+def test_parse_builtin_docstring_later_parameters_section():
+    docstring = "Desc\n\n:param a: in epilog\n\n:param a: desc a"
+    data = clig._parse_builtin_docstring(docstring, True, "sphinx_notypes", 1)
+    assert data == clig._DocstringData(
+        description="Desc", epilog=":param a: in epilog", helps={"a": "desc a"}
+    )
+
+
+def test_parse_builtin_docstring_fields_do_not_span_lines():
+    # unlike the regex, which would take "x\n:type a" as the parameter name
+    docstring = "Desc\n\n:param x\n:type a: int\n:type a: int"
+    assert clig._parse_builtin_docstring(docstring, False, "sphinx", 1) is None
+
+
+def test_parse_builtin_docstring_linear_steps_on_near_miss(monkeypatch):
+    entries = "\n".join(f"- `p{i}` (`int`):\n    Help {i}" for i in range(3000))
+    docstring = "Desc\n\nEpilog\n\nParameters\n----------\n" + entries + "\n- `broken`"
+    calls = 0
+    parse_docstring_entry = clig._parse_docstring_entry
+
+    def counted_parse_docstring_entry(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return parse_docstring_entry(*args, **kwargs)
+
+    monkeypatch.setattr(clig, "_parse_docstring_entry", counted_parse_docstring_entry)
+    for builtin_format in clig._BUILTIN_DOCSTRING_FORMATS.values():
+        assert clig._parse_builtin_docstring(docstring, *builtin_format, 3001) is None
+    # each entry is parsed once, by the formats whose header is found
+    assert calls <= 3001 * len(clig._BUILTIN_DOCSTRING_FORMATS)